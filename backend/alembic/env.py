@@ -8,6 +8,7 @@ import sys
 # Dodaj backend direktorij u Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from app.core.config import settings
 from app.core.database import Base
 from app.models import *  # Import svih modela
 
@@ -15,10 +16,14 @@ from app.models import *  # Import svih modela
 # access to the values within the .ini file in use.
 config = context.config
 
+# URL baze iz postavki aplikacije (DATABASE_URL), ne iz alembic.ini
+config.set_main_option("sqlalchemy.url", settings.database_url.replace("%", "%%"))
+
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
-if config.config_file_name is not None:
-    fileConfig(config.config_file_name)
+# Kod pokretanja iz aplikacije (app.core.startup) logging je već postavljen.
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
 
 # add your model's MetaData object here
 # for 'autogenerate' support
@@ -61,6 +66,17 @@ def run_migrations_online() -> None:
     and associate a connection with the context.
 
     """
+    # Konekcija koju prosljeđuje app.core.startup (migracije pod advisory lockom)
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        context.configure(
+            connection=connection, target_metadata=target_metadata
+        )
+
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+
     connectable = engine_from_config(
         config.get_section(config.config_ini_section, {}),
         prefix="sqlalchemy.",
@@ -0,0 +1,52 @@
+"""Add materialized stock balance table
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('stock_balances',
+    sa.Column('material_id', sa.Integer(), nullable=False),
+    sa.Column('received_quantity', sa.Float(), server_default='0', nullable=False),
+    sa.Column('consumed_quantity', sa.Float(), server_default='0', nullable=False),
+    sa.Column('last_receipt_date', sa.DateTime(), nullable=True),
+    sa.Column('last_consumption_date', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['material_id'], ['materials.id'], ),
+    sa.PrimaryKeyConstraint('material_id')
+    )
+    
+    # Početno punjenje salda iz postojećih prijema i utrošaka
+    op.execute("""
+        INSERT INTO stock_balances (material_id, received_quantity, consumed_quantity, last_receipt_date, last_consumption_date)
+        SELECT m.id,
+               COALESCE(r.quantity, 0),
+               COALESCE(c.quantity, 0),
+               r.last_date,
+               c.last_date
+        FROM materials m
+        LEFT JOIN (
+            SELECT material_id, SUM(quantity) AS quantity, MAX(receipt_date) AS last_date
+            FROM receipts GROUP BY material_id
+        ) r ON r.material_id = m.id
+        LEFT JOIN (
+            SELECT material_id, SUM(quantity) AS quantity, MAX(consumption_date) AS last_date
+            FROM consumptions GROUP BY material_id
+        ) c ON c.material_id = m.id
+    """)
+
+
+def downgrade():
+    op.drop_table('stock_balances')
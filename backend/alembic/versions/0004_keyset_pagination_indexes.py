@@ -0,0 +1,27 @@
+"""Add composite (date, id) indexes for keyset pagination
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('idx_receipt_date_id', 'receipts', ['receipt_date', 'id'], unique=False)
+    op.create_index('idx_consumption_date_id', 'consumptions', ['consumption_date', 'id'], unique=False)
+    op.create_index('idx_po_date_id', 'purchase_orders', ['order_date', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('idx_po_date_id', table_name='purchase_orders')
+    op.drop_index('idx_consumption_date_id', table_name='consumptions')
+    op.drop_index('idx_receipt_date_id', table_name='receipts')
@@ -0,0 +1,31 @@
+"""Add full-text and substring search for materials
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+from app.models.material import MATERIAL_SEARCH_DDL
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # DDL je definiran uz model (isti se izvodi i za baze kreirane kroz create_all)
+    for statement in MATERIAL_SEARCH_DDL:
+        op.execute(statement)
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS idx_material_search_trgm")
+    op.execute("DROP INDEX IF EXISTS idx_material_code_prefix")
+    op.execute("DROP INDEX IF EXISTS idx_material_search_vector")
+    op.drop_column('materials', 'search_text')
+    op.drop_column('materials', 'search_vector')
+    op.execute("DROP FUNCTION IF EXISTS zc_fold(text)")
@@ -0,0 +1,43 @@
+"""Add daily stock snapshots
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('stock_snapshots',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('snapshot_date', sa.Date(), nullable=False),
+    sa.Column('material_id', sa.Integer(), nullable=False),
+    sa.Column('received_quantity', sa.Float(), nullable=False),
+    sa.Column('consumed_quantity', sa.Float(), nullable=False),
+    sa.Column('current_stock', sa.Float(), nullable=False),
+    sa.Column('safety_stock', sa.Float(), nullable=True),
+    sa.Column('recommended_po', sa.Float(), nullable=False),
+    sa.Column('stock_status', sa.String(), nullable=False),
+    sa.Column('computed_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['material_id'], ['materials.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('snapshot_date', 'material_id', name='uq_snapshot_date_material')
+    )
+    op.create_index(op.f('ix_stock_snapshots_id'), 'stock_snapshots', ['id'], unique=False)
+    op.create_index('idx_snapshot_material_date', 'stock_snapshots', ['material_id', 'snapshot_date'], unique=False)
+
+
+def downgrade():
+    op.drop_index('idx_snapshot_material_date', table_name='stock_snapshots')
+    op.drop_index(op.f('ix_stock_snapshots_id'), table_name='stock_snapshots')
+    op.drop_table('stock_snapshots')
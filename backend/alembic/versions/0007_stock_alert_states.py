@@ -0,0 +1,31 @@
+"""Add stock alert state for low-stock notifications
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('stock_alert_states',
+    sa.Column('material_id', sa.Integer(), nullable=False),
+    sa.Column('stock_status', sa.String(), nullable=False),
+    sa.Column('current_stock', sa.Float(), nullable=True),
+    sa.Column('notified_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['material_id'], ['materials.id'], ),
+    sa.PrimaryKeyConstraint('material_id')
+    )
+
+
+def downgrade():
+    op.drop_table('stock_alert_states')
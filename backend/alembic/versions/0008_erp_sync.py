@@ -0,0 +1,42 @@
+"""Add ERP sync state and record hashes
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('erp_sync_state',
+    sa.Column('feed', sa.String(), nullable=False),
+    sa.Column('watermark', sa.String(), nullable=True),
+    sa.Column('last_status', sa.String(), nullable=True),
+    sa.Column('rows_seen', sa.Integer(), nullable=True),
+    sa.Column('rows_changed', sa.Integer(), nullable=True),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('feed')
+    )
+    op.create_table('erp_record_hashes',
+    sa.Column('entity', sa.String(), nullable=False),
+    sa.Column('code', sa.String(), nullable=False),
+    sa.Column('hash', sa.String(length=32), nullable=False),
+    sa.Column('synced_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('entity', 'code')
+    )
+
+
+def downgrade():
+    op.drop_table('erp_record_hashes')
+    op.drop_table('erp_sync_state')
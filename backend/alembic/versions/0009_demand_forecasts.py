@@ -0,0 +1,35 @@
+"""Add demand forecasts
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('demand_forecasts',
+    sa.Column('material_id', sa.Integer(), nullable=False),
+    sa.Column('method', sa.String(), nullable=False),
+    sa.Column('forecast', sa.Float(), nullable=False),
+    sa.Column('mae', sa.Float(), nullable=True),
+    sa.Column('rmse', sa.Float(), nullable=True),
+    sa.Column('history_months', sa.Integer(), nullable=False),
+    sa.Column('selected', sa.Boolean(), nullable=False),
+    sa.Column('computed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['material_id'], ['materials.id'], ),
+    sa.PrimaryKeyConstraint('material_id', 'method')
+    )
+
+
+def downgrade():
+    op.drop_table('demand_forecasts')
@@ -0,0 +1,68 @@
+"""Add daily ledger rollups per material and per category
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0010'
+down_revision = '0009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('ledger_daily_rollups',
+    sa.Column('material_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('received_quantity', sa.Float(), server_default='0', nullable=False),
+    sa.Column('received_value', sa.Float(), server_default='0', nullable=False),
+    sa.Column('consumed_quantity', sa.Float(), server_default='0', nullable=False),
+    sa.Column('consumed_value', sa.Float(), server_default='0', nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['material_id'], ['materials.id'], ),
+    sa.PrimaryKeyConstraint('material_id', 'day')
+    )
+    op.create_index('idx_ledger_rollup_day', 'ledger_daily_rollups', ['day'], unique=False)
+    op.create_table('ledger_category_rollups',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('category', sa.String(), nullable=False),
+    sa.Column('received_quantity', sa.Float(), server_default='0', nullable=False),
+    sa.Column('received_value', sa.Float(), server_default='0', nullable=False),
+    sa.Column('consumed_quantity', sa.Float(), server_default='0', nullable=False),
+    sa.Column('consumed_value', sa.Float(), server_default='0', nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('day', 'category')
+    )
+    
+    # Početno punjenje iz postojećih prijema i utrošaka
+    op.execute("""
+        INSERT INTO ledger_daily_rollups (material_id, day, received_quantity, received_value, consumed_quantity, consumed_value)
+        SELECT material_id, day, SUM(received_quantity), SUM(received_value), SUM(consumed_quantity), SUM(consumed_value)
+        FROM (
+            SELECT material_id, DATE(receipt_date) AS day, quantity AS received_quantity, total_amount AS received_value,
+                   0 AS consumed_quantity, 0 AS consumed_value
+            FROM receipts
+            UNION ALL
+            SELECT c.material_id, DATE(c.consumption_date), 0, 0, c.quantity, c.quantity * COALESCE(m.unit_price, 0)
+            FROM consumptions c JOIN materials m ON m.id = c.material_id
+        ) ledger
+        GROUP BY material_id, day
+    """)
+    op.execute("""
+        INSERT INTO ledger_category_rollups (day, category, received_quantity, received_value, consumed_quantity, consumed_value)
+        SELECT r.day, m.category::text, SUM(r.received_quantity), SUM(r.received_value), SUM(r.consumed_quantity), SUM(r.consumed_value)
+        FROM ledger_daily_rollups r JOIN materials m ON m.id = r.material_id
+        GROUP BY r.day, m.category
+    """)
+
+
+def downgrade():
+    op.drop_table('ledger_category_rollups')
+    op.drop_index('idx_ledger_rollup_day', table_name='ledger_daily_rollups')
+    op.drop_table('ledger_daily_rollups')
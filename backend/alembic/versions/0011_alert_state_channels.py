@@ -0,0 +1,36 @@
+"""Track notified stock status per notification channel
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0011'
+down_revision = '0010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('stock_alert_states', sa.Column('channel', sa.String(), nullable=True))
+    op.drop_constraint('stock_alert_states_pkey', 'stock_alert_states', type_='primary')
+    # Dosadašnje stanje vrijedilo je za sve kanale: kopija za Slack, original postaje email
+    op.execute("""
+        INSERT INTO stock_alert_states (material_id, channel, stock_status, current_stock, notified_at)
+        SELECT material_id, 'slack', stock_status, current_stock, notified_at FROM stock_alert_states
+    """)
+    op.execute("UPDATE stock_alert_states SET channel = 'email' WHERE channel IS NULL")
+    op.alter_column('stock_alert_states', 'channel', nullable=False)
+    op.create_primary_key('stock_alert_states_pkey', 'stock_alert_states', ['material_id', 'channel'])
+
+
+def downgrade():
+    op.execute("DELETE FROM stock_alert_states WHERE channel <> 'email'")
+    op.drop_constraint('stock_alert_states_pkey', 'stock_alert_states', type_='primary')
+    op.create_primary_key('stock_alert_states_pkey', 'stock_alert_states', ['material_id'])
+    op.drop_column('stock_alert_states', 'channel')
@@ -0,0 +1,29 @@
+"""Store the posted value on consumptions
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0012'
+down_revision = '0011'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('consumptions', sa.Column('total_value', sa.Float(), nullable=True))
+    # Postojeći utrošci vrednuju se trenutnom cijenom, kao pri početnom punjenju zbrojeva (0010)
+    op.execute("""
+        UPDATE consumptions c SET total_value = c.quantity * COALESCE(m.unit_price, 0)
+        FROM materials m WHERE m.id = c.material_id
+    """)
+
+
+def downgrade():
+    op.drop_column('consumptions', 'total_value')
@@ -6,6 +6,8 @@ from .purchase_orders import router as purchase_orders_router
 from .receipts import router as receipts_router
 from .consumptions import router as consumptions_router
 from .dashboard import router as dashboard_router
+from .monitoring import router as monitoring_router
+from .reports import router as reports_router
 
 __all__ = [
     "auth_router",
@@ -15,5 +17,7 @@ __all__ = [
     "purchase_orders_router",
     "receipts_router",
     "consumptions_router",
-    "dashboard_router"
+    "dashboard_router",
+    "monitoring_router",
+    "reports_router"
 ] 
\ No newline at end of file
@@ -1,12 +1,15 @@
 from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..core.database import get_db
-from ..core.auth import authenticate_user, create_access_token, get_password_hash, get_current_active_user
+from ..core.auth import authenticate_user, create_access_token, get_current_active_user, require_role
 from ..core.config import settings
+from ..core.passwords import password_hasher
+from ..core.principals import principal_cache
 from ..models.user import User
-from ..schemas.user import UserCreate, UserResponse, Token
+from ..schemas.user import UserCreate, UserUpdate, UserResponse, Token
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
@@ -14,9 +17,9 @@ router = APIRouter(prefix="/auth", tags=["authentication"])
 @router.post("/token", response_model=Token)
 async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = await authenticate_user(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -31,11 +34,11 @@ async def login_for_access_token(
 
 
 @router.post("/register", response_model=UserResponse)
-async def register_user(user: UserCreate, db: Session = Depends(get_db)):
+async def register_user(user: UserCreate, db: AsyncSession = Depends(get_db)):
     # Provjeri postoji li korisnik
-    existing_user = db.query(User).filter(
+    existing_user = await db.scalar(select(User).where(
         (User.username == user.username) | (User.email == user.email)
-    ).first()
+    ))
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -43,7 +46,7 @@ async def register_user(user: UserCreate, db: Session = Depends(get_db)):
         )
     
     # Kreiraj novog korisnika
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await password_hasher.hash(user.password)
     db_user = User(
         username=user.username,
         email=user.email,
@@ -52,11 +55,38 @@ async def register_user(user: UserCreate, db: Session = Depends(get_db)):
         hashed_password=hashed_password
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     return db_user
 
 
 @router.get("/me", response_model=UserResponse)
 async def read_users_me(current_user: User = Depends(get_current_active_user)):
-    return current_user 
\ No newline at end of file
+    return current_user
+
+
+@router.put("/users/{user_id}", response_model=UserResponse)
+async def update_user(
+    user_id: int,
+    user_update: UserUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role("admin"))
+):
+    """Ažuriraj korisnika (uloga, aktivnost, podaci)"""
+    db_user = await db.scalar(select(User).where(User.id == user_id))
+    if db_user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    previous_username = db_user.username
+    update_data = user_update.dict(exclude_unset=True)
+    password = update_data.pop("password", None)
+    if password:
+        db_user.hashed_password = await password_hasher.hash(password)
+    for field, value in update_data.items():
+        setattr(db_user, field, value)
+    
+    await db.commit()
+    # Deaktivacija ili promjena uloge mora vrijediti odmah, ne tek nakon isteka cachea
+    await principal_cache.invalidate(previous_username, db_user.username)
+    await db.refresh(db_user)
+    return db_user
@@ -1,35 +1,49 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..core.cache import response_cache, TAG_STOCK
 from ..core.database import get_db
+from ..core.expand import expand_options, expand_param
+from ..core.pagination import PageParams, paginate
 from ..core.auth import get_current_active_user
 from ..models.user import User
 from ..models.consumption import Consumption
+from ..services.import_service import LedgerImportService, detect_format
+from ..services.ledger_rollup_service import LedgerRollupService
+from ..services.stock_balance_service import StockBalanceService, consumption_entry
 from ..schemas.consumption import ConsumptionCreate, ConsumptionUpdate, ConsumptionResponse
+from ..schemas.material import MaterialSummary
+from ..schemas.user import UserSummary
+from ..schemas.ledger_import import ImportResult
 
 router = APIRouter(prefix="/consumptions", tags=["consumptions"])
 
+# Relacije dostupne kroz ?expand=
+CONSUMPTION_EXPANDS = {"material": MaterialSummary, "user": UserSummary}
+
 
 @router.get("/", response_model=List[ConsumptionResponse])
 async def get_consumptions(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
+    page: PageParams = Depends(),
+    expand: set[str] = Depends(expand_param(CONSUMPTION_EXPANDS)),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    consumptions = db.query(Consumption).offset(skip).limit(limit).all()
+    query = select(Consumption).options(*expand_options(Consumption, expand, CONSUMPTION_EXPANDS))
+    consumptions = await paginate(db, query, page, Consumption, {"date": (Consumption.consumption_date,)})
     return consumptions
 
 
 @router.post("/", response_model=ConsumptionResponse)
 async def create_consumption(
     consumption: ConsumptionCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    existing_consumption = db.query(Consumption).filter(
+    existing_consumption = await db.scalar(select(Consumption).where(
         Consumption.consumption_number == consumption.consumption_number
-    ).first()
+    ))
     if existing_consumption:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -38,18 +52,44 @@ async def create_consumption(
     
     db_consumption = Consumption(**consumption.dict(), created_by=current_user.id)
     db.add(db_consumption)
-    db.commit()
-    db.refresh(db_consumption)
+    await db.run_sync(LedgerRollupService.post_value, db_consumption)
+    await db.run_sync(StockBalanceService.apply, "consumption", added=consumption_entry(db_consumption))
+    await db.commit()
+    await response_cache.invalidate(TAG_STOCK)
+    await db.refresh(db_consumption)
     return db_consumption
 
 
+@router.post("/import", response_model=ImportResult)
+async def import_consumptions(
+    file: UploadFile = File(...),
+    format: Optional[str] = None,
+    dry_run: bool = False,
+    atomic: bool = False,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Skupni uvoz utrošaka iz CSV ili JSONL datoteke"""
+    try:
+        file_format = detect_format(file.filename, file.content_type, format)
+    except ValueError as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(error))
+    
+    result = await LedgerImportService.run(
+        db, "consumption", file.file, file_format, current_user.id, dry_run=dry_run, atomic=atomic
+    )
+    if result.inserted and not dry_run:
+        await response_cache.invalidate(TAG_STOCK)
+    return result
+
+
 @router.get("/{consumption_id}", response_model=ConsumptionResponse)
 async def get_consumption(
     consumption_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    consumption = db.query(Consumption).filter(Consumption.id == consumption_id).first()
+    consumption = await db.scalar(select(Consumption).where(Consumption.id == consumption_id))
     if not consumption:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -62,38 +102,48 @@ async def get_consumption(
 async def update_consumption(
     consumption_id: int,
     consumption: ConsumptionUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    db_consumption = db.query(Consumption).filter(Consumption.id == consumption_id).first()
+    db_consumption = await db.scalar(select(Consumption).where(Consumption.id == consumption_id))
     if not db_consumption:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Consumption not found"
         )
     
+    previous_entry = consumption_entry(db_consumption)
     update_data = consumption.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_consumption, field, value)
+    # Izmijenjena stavka knjiži se po trenutnoj cijeni; uklanja se prethodno knjižena vrijednost
+    await db.run_sync(LedgerRollupService.post_value, db_consumption)
     
-    db.commit()
-    db.refresh(db_consumption)
+    await db.flush()
+    await db.run_sync(StockBalanceService.apply, "consumption", added=consumption_entry(db_consumption), removed=previous_entry)
+    await db.commit()
+    await response_cache.invalidate(TAG_STOCK)
+    await db.refresh(db_consumption)
     return db_consumption
 
 
 @router.delete("/{consumption_id}")
 async def delete_consumption(
     consumption_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    db_consumption = db.query(Consumption).filter(Consumption.id == consumption_id).first()
+    db_consumption = await db.scalar(select(Consumption).where(Consumption.id == consumption_id))
     if not db_consumption:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Consumption not found"
         )
     
-    db.delete(db_consumption)
-    db.commit()
+    removed_entry = consumption_entry(db_consumption)
+    await db.delete(db_consumption)
+    await db.flush()
+    await db.run_sync(StockBalanceService.apply, "consumption", removed=removed_entry)
+    await db.commit()
+    await response_cache.invalidate(TAG_STOCK)
     return {"message": "Consumption deleted successfully"} 
\ No newline at end of file
@@ -1,66 +1,82 @@
-from typing import List, Dict, Any
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from typing import List, Dict, Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
+from ..core.cache import response_cache, TAG_MATERIALS, TAG_STOCK, TAG_PURCHASE_ORDERS
+from ..core.config import settings
 from ..core.database import get_db
+from ..core.pagination import NEXT_CURSOR_HEADER, PREV_CURSOR_HEADER, PageParams, paginate
 from ..core.auth import get_current_active_user
 from ..models.user import User
-from ..models.material import Material
+from ..models.material import Material, ItemType
+from ..schemas.material import ItemType as SchemaItemType, Category as SchemaCategory
 from ..models.receipt import Receipt
 from ..models.consumption import Consumption
 from ..models.purchase_order import PurchaseOrder
+from ..services.ledger_rollup_service import GRANULARITIES, LedgerRollupService
 from ..services.material_service import MaterialService
+from ..services.replenishment_service import ReplenishmentService
 
 router = APIRouter(prefix="/dashboard", tags=["dashboard"])
 
 
 @router.get("/summary")
 async def get_dashboard_summary(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Rekapitulacija - glavni dashboard podaci"""
+    return await response_cache.get_or_compute(
+        "dashboard:summary",
+        lambda: _build_summary(db),
+        tags=(TAG_MATERIALS, TAG_STOCK, TAG_PURCHASE_ORDERS),
+        ttl=settings.cache_ttl_seconds
+    )
+
+
+async def _build_summary(db: AsyncSession) -> dict:
+    """Izračun rekapitulacije (bez cachea)"""
     
     # Ukupan broj materijala i usluga
-    total_materials = db.query(Material).filter(
+    total_materials = await db.scalar(select(func.count(Material.id)).where(
         Material.is_active == True,
-        Material.item_type == "materijal"
-    ).count()
+        Material.item_type == ItemType.MATERIAL
+    ))
     
-    total_services = db.query(Material).filter(
+    total_services = await db.scalar(select(func.count(Material.id)).where(
         Material.is_active == True,
-        Material.item_type == "usluga"
-    ).count()
+        Material.item_type == ItemType.SERVICE
+    ))
     
     # Materijali s niskim zalihama (samo materijali, ne usluge)
-    low_stock_materials = MaterialService.get_low_stock_materials(db)
+    low_stock_materials = await MaterialService.get_low_stock_materials(db)
     
     # Ukupan broj aktivnih narudžbi
-    active_pos = db.query(PurchaseOrder).filter(PurchaseOrder.status == "pending").count()
+    active_pos = await db.scalar(select(func.count(PurchaseOrder.id)).where(PurchaseOrder.status == "pending"))
     
     # Ukupan broj prijema u zadnjih 30 dana
     thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-    recent_receipts = db.query(Receipt).filter(Receipt.receipt_date >= thirty_days_ago).count()
+    recent_receipts = await db.scalar(select(func.count(Receipt.id)).where(Receipt.receipt_date >= thirty_days_ago))
     
     # Ukupan utrošak u zadnjih 30 dana
-    recent_consumptions = db.query(Consumption).filter(Consumption.consumption_date >= thirty_days_ago).count()
+    recent_consumptions = await db.scalar(select(func.count(Consumption.id)).where(Consumption.consumption_date >= thirty_days_ago))
     
     # Statistike po kategorijama
-    category_stats = db.query(
+    category_stats = (await db.execute(select(
         Material.category,
         func.count(Material.id).label('count')
-    ).filter(
+    ).where(
         Material.is_active == True
     ).group_by(
         Material.category
-    ).all()
+    ))).all()
     
     # Materijali s COA
-    materials_with_coa = db.query(Material).filter(
+    materials_with_coa = await db.scalar(select(func.count(Material.id)).where(
         Material.is_active == True,
         Material.has_coa == True
-    ).count()
+    ))
     
     return {
         "total_materials": total_materials,
@@ -91,24 +107,46 @@ async def get_dashboard_summary(
 
 @router.get("/stock-status")
 async def get_stock_status_overview(
-    db: Session = Depends(get_db),
+    vendor_id: Optional[int] = None,
+    item_type: Optional[SchemaItemType] = None,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Pregled statusa zaliha po kategorijama"""
+    return await response_cache.get_or_compute(
+        "dashboard:stock-status",
+        lambda: _build_stock_status(db, vendor_id, item_type),
+        tags=(TAG_MATERIALS, TAG_STOCK),
+        ttl=settings.cache_ttl_seconds,
+        params={"vendor_id": vendor_id, "item_type": item_type}
+    )
+
+
+async def _build_stock_status(
+    db: AsyncSession,
+    vendor_id: Optional[int] = None,
+    item_type: Optional[SchemaItemType] = None
+) -> dict:
+    """Izračun statusa zaliha po kategorijama (bez cachea, jedan GROUP BY upit)"""
+    
+    criteria = [Material.is_active == True]
+    if vendor_id is not None:
+        criteria.append(Material.vendor_id == vendor_id)
+    if item_type is not None:
+        criteria.append(Material.item_type == ItemType(item_type.value))
     
-    materials = db.query(Material).filter(Material.is_active == True).all()
+    rows = await MaterialService.count_stocks_by_status(db, *criteria, group_by=Material.category)
     
     status_counts = {"normal": 0, "low": 0, "critical": 0}
     category_counts = {}
     
-    for material in materials:
-        status = MaterialService.get_stock_status(db, material.id)
-        status_counts[status] += 1
+    for category, status, count in rows:
+        status_counts[status] += count
         
-        category = material.category or "uncategorized"
+        category = category or "uncategorized"
         if category not in category_counts:
             category_counts[category] = {"normal": 0, "low": 0, "critical": 0}
-        category_counts[category][status] += 1
+        category_counts[category][status] += count
     
     return {
         "overall_status": status_counts,
@@ -119,79 +157,81 @@ async def get_stock_status_overview(
 @router.get("/trends")
 async def get_consumption_trends(
     days: int = 30,
-    db: Session = Depends(get_db),
+    granularity: str = Query("day", description="day, week ili month"),
+    by_category: bool = False,
+    category: Optional[SchemaCategory] = None,
+    material_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Trend utroška u zadnjih N dana"""
-    
-    start_date = datetime.utcnow() - timedelta(days=days)
-    
-    # Dnevni utrošak
-    daily_consumption = db.query(
-        func.date(Consumption.consumption_date).label('date'),
-        func.sum(Consumption.quantity).label('total_quantity')
-    ).filter(
-        Consumption.consumption_date >= start_date
-    ).group_by(
-        func.date(Consumption.consumption_date)
-    ).order_by(
-        func.date(Consumption.consumption_date)
-    ).all()
-    
-    # Dnevni prijemi
-    daily_receipts = db.query(
-        func.date(Receipt.receipt_date).label('date'),
-        func.sum(Receipt.quantity).label('total_quantity')
-    ).filter(
-        Receipt.receipt_date >= start_date
-    ).group_by(
-        func.date(Receipt.receipt_date)
-    ).order_by(
-        func.date(Receipt.receipt_date)
-    ).all()
+    """Trend utroška i prijema u zadnjih N dana (iz dnevnih zbrojeva knjige)"""
+    if granularity not in GRANULARITIES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported granularity '{granularity}', allowed: {', '.join(GRANULARITIES)}"
+        )
+    
+    start_date = (datetime.utcnow() - timedelta(days=days)).date()
+    periods = await db.run_sync(
+        LedgerRollupService.trend,
+        start_date,
+        granularity=granularity,
+        by_category=by_category,
+        category=category.value if category is not None else None,
+        material_id=material_id
+    )
+    
+    def series(rows: list, kind: str) -> list:
+        return [
+            {
+                "date": row["date"].isoformat(),
+                "quantity": row[f"{kind}_quantity"],
+                "value": row[f"{kind}_value"],
+                **({"category": row["category"]} if by_category else {})
+            }
+            for row in rows
+            if row[f"{kind}_quantity"] or row[f"{kind}_value"]
+        ]
     
     return {
-        "consumption_trend": [
-            {"date": str(item.date), "quantity": float(item.total_quantity)}
-            for item in daily_consumption
-        ],
-        "receipts_trend": [
-            {"date": str(item.date), "quantity": float(item.total_quantity)}
-            for item in daily_receipts
-        ]
+        "granularity": granularity,
+        "consumption_trend": series(periods, "consumed"),
+        "receipts_trend": series(periods, "received")
     }
 
 
 @router.get("/recommendations")
 async def get_recommendations(
-    db: Session = Depends(get_db),
+    vendor_id: Optional[int] = None,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Preporučene akcije"""
+    """Preporučene akcije - rangirani plan nabave (sort: urgency, quantity, value)"""
+    return await response_cache.get_or_compute(
+        "dashboard:recommendations",
+        lambda: _build_recommendations(db, page, vendor_id),
+        tags=(TAG_MATERIALS, TAG_STOCK),
+        ttl=settings.cache_ttl_seconds,
+        params={"vendor_id": vendor_id, "cursor": page.cursor, "limit": page.limit, "sort": page.sort, "skip": page.skip}
+    )
+
+
+async def _build_recommendations(db: AsyncSession, page: PageParams, vendor_id: Optional[int] = None) -> dict:
+    """Izračun plana nabave (bez cachea)"""
     
-    materials = db.query(Material).filter(Material.is_active == True).all()
-    recommendations = []
+    criteria = [Material.is_active == True]
+    if vendor_id is not None:
+        criteria.append(Material.vendor_id == vendor_id)
     
-    for material in materials:
-        current_stock = MaterialService.calculate_current_stock(db, material.id)
-        recommended_po = MaterialService.calculate_recommended_po(db, material.id)
-        stock_status = MaterialService.get_stock_status(db, material.id)
-        
-        if stock_status in ["low", "critical"] and recommended_po > 0:
-            recommendations.append({
-                "material_id": material.id,
-                "material_code": material.code,
-                "material_name": material.name,
-                "current_stock": current_stock,
-                "safety_stock": material.safety_stock,
-                "recommended_po": recommended_po,
-                "priority": "high" if stock_status == "critical" else "medium"
-            })
-    
-    # Sortiraj po prioritetu
-    recommendations.sort(key=lambda x: 0 if x["priority"] == "high" else 1)
+    query, sorts = ReplenishmentService.plan_query(*criteria)
+    rows = await paginate(db, query, page, Material, sorts, default_sort="urgency")
+    total = await db.run_sync(ReplenishmentService.count, *criteria)
     
+    # Kursori su i u tijelu jer se tijelo cachea bez headera
     return {
-        "recommendations": recommendations,
-        "total_recommendations": len(recommendations)
-    } 
\ No newline at end of file
+        "recommendations": [ReplenishmentService.to_item(row) for row in rows],
+        "total_recommendations": total,
+        "next_cursor": page.response.headers.get(NEXT_CURSOR_HEADER),
+        "prev_cursor": page.response.headers.get(PREV_CURSOR_HEADER)
+    }
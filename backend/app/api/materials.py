@@ -1,97 +1,146 @@
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..core.cache import response_cache, TAG_MATERIALS, TAG_STOCK
+from ..core.config import settings
 from ..core.database import get_db
+from ..core.expand import expand_options, expand_param
+from ..core.pagination import PageParams, paginate
 from ..core.auth import get_current_active_user
 from ..models.user import User
-from ..models.material import Material
-from ..schemas.material import MaterialCreate, MaterialUpdate, MaterialResponse, MaterialWithCalculations
+from ..models.material import Material, ItemType
+from ..schemas.material import (
+    MaterialCreate, MaterialUpdate, MaterialResponse, MaterialWithCalculations, MaterialBulkUpdate, MaterialBulkResult
+)
+from ..schemas.vendor import VendorSummary
+from ..services.material_bulk_service import MaterialBulkService, material_values
 from ..services.material_service import MaterialService
+from ..services.search_service import MaterialSearch
 
 router = APIRouter(prefix="/materials", tags=["materials"])
 
+# Relacije dostupne kroz ?expand=
+MATERIAL_EXPANDS = {"vendor": VendorSummary}
+
 
 @router.get("/", response_model=List[MaterialResponse])
 async def get_materials(
-    skip: int = 0,
-    limit: int = 100,
+    page: PageParams = Depends(),
     item_type: str = None,
     category: str = None,
     vendor_id: int = None,
     has_coa: bool = None,
     regulatory_status: str = None,
     search: str = None,
-    db: Session = Depends(get_db),
+    expand: set[str] = Depends(expand_param(MATERIAL_EXPANDS)),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    query = db.query(Material)
+    query = select(Material).options(*expand_options(Material, expand, MATERIAL_EXPANDS))
     
     # Filtriranje po tipu stavke
     if item_type:
-        query = query.filter(Material.item_type == item_type)
+        query = query.where(Material.item_type == item_type)
     
     # Filtriranje po kategoriji
     if category:
-        query = query.filter(Material.category == category)
+        query = query.where(Material.category == category)
     
     # Filtriranje po dobavljaču
     if vendor_id:
-        query = query.filter(Material.vendor_id == vendor_id)
+        query = query.where(Material.vendor_id == vendor_id)
     
     # Filtriranje po COA
     if has_coa is not None:
-        query = query.filter(Material.has_coa == has_coa)
+        query = query.where(Material.has_coa == has_coa)
     
     # Filtriranje po regulatornom statusu
     if regulatory_status:
-        query = query.filter(Material.regulatory_status == regulatory_status)
-    
-    # Pretraživanje po nazivu, kodu ili opisu
-    if search:
-        search_filter = f"%{search}%"
-        query = query.filter(
-            (Material.name.ilike(search_filter)) |
-            (Material.code.ilike(search_filter)) |
-            (Material.description.ilike(search_filter)) |
-            (Material.material_component.ilike(search_filter)) |
-            (Material.service_description.ilike(search_filter))
-        )
+        query = query.where(Material.regulatory_status == regulatory_status)
     
     # Samo aktivni materijali
-    query = query.filter(Material.is_active == True)
+    query = query.where(Material.is_active == True)
     
-    materials = query.offset(skip).limit(limit).all()
+    # Pretraživanje po kodu, nazivu i opisima, poredano po relevantnosti
+    if search:
+        match, relevance = await db.run_sync(MaterialSearch.criteria, search)
+        materials = await paginate(
+            db, query.where(match), page, Material,
+            sorts={"relevance": (relevance,)}, default_sort="-relevance"
+        )
+    else:
+        materials = await paginate(db, query, page, Material)
     return materials
 
 
 @router.post("/", response_model=MaterialResponse)
 async def create_material(
     material: MaterialCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     # Provjeri postoji li materijal s istim kodom
-    existing_material = db.query(Material).filter(Material.code == material.code).first()
+    existing_material = await db.scalar(select(Material).where(Material.code == material.code))
     if existing_material:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Material with this code already exists"
         )
     
-    db_material = Material(**material.dict())
+    db_material = Material(**material_values(material.dict()))
     db.add(db_material)
-    db.commit()
-    db.refresh(db_material)
+    await db.commit()
+    await response_cache.invalidate(TAG_MATERIALS)
+    await db.refresh(db_material)
     return db_material
 
 
+def _check_bulk_size(items: list) -> None:
+    if len(items) > settings.materials_bulk_max_items:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Too many items, max {settings.materials_bulk_max_items} per request"
+        )
+
+
+@router.post("/bulk", response_model=MaterialBulkResult)
+async def create_materials_bulk(
+    materials: List[MaterialCreate],
+    atomic: bool = False,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Skupni unos materijala; rezultat po stavci, atomic=true ne upisuje ništa ako ijedna stavka ne prolazi"""
+    _check_bulk_size(materials)
+    result = await MaterialBulkService.create(db, materials, atomic=atomic)
+    if result.created:
+        await response_cache.invalidate(TAG_MATERIALS)
+    return result
+
+
+@router.patch("/bulk", response_model=MaterialBulkResult)
+async def update_materials_bulk(
+    materials: List[MaterialBulkUpdate],
+    atomic: bool = False,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Skupna izmjena materijala po id-u; mijenjaju se samo poslana polja"""
+    _check_bulk_size(materials)
+    result = await MaterialBulkService.update(db, materials, atomic=atomic)
+    if result.updated:
+        await response_cache.invalidate(TAG_MATERIALS)
+    return result
+
+
 @router.get("/{material_id}", response_model=MaterialWithCalculations)
 async def get_material(
     material_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    material_with_calc = MaterialService.get_material_with_calculations(db, material_id)
+    material_with_calc = await MaterialService.get_material_with_calculations(db, material_id)
     if not material_with_calc:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -104,10 +153,10 @@ async def get_material(
 async def update_material(
     material_id: int,
     material: MaterialUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    db_material = db.query(Material).filter(Material.id == material_id).first()
+    db_material = await db.scalar(select(Material).where(Material.id == material_id))
     if not db_material:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -116,7 +165,7 @@ async def update_material(
     
     # Provjeri kod ako se mijenja
     if material.code and material.code != db_material.code:
-        existing_material = db.query(Material).filter(Material.code == material.code).first()
+        existing_material = await db.scalar(select(Material).where(Material.code == material.code))
         if existing_material:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -124,22 +173,23 @@ async def update_material(
             )
     
     # Ažuriraj polja
-    update_data = material.dict(exclude_unset=True)
+    update_data = material_values(material.dict(exclude_unset=True))
     for field, value in update_data.items():
         setattr(db_material, field, value)
     
-    db.commit()
-    db.refresh(db_material)
+    await db.commit()
+    await response_cache.invalidate(TAG_MATERIALS)
+    await db.refresh(db_material)
     return db_material
 
 
 @router.delete("/{material_id}")
 async def delete_material(
     material_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    db_material = db.query(Material).filter(Material.id == material_id).first()
+    db_material = await db.scalar(select(Material).where(Material.id == material_id))
     if not db_material:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -148,61 +198,68 @@ async def delete_material(
     
     # Soft delete - samo deaktiviraj
     db_material.is_active = False
-    db.commit()
+    await db.commit()
+    await response_cache.invalidate(TAG_MATERIALS)
     return {"message": "Material deactivated successfully"}
 
 
 @router.get("/{material_id}/current-stock")
 async def get_material_current_stock(
     material_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    current_stock = MaterialService.calculate_current_stock(db, material_id)
+    current_stock = await MaterialService.calculate_current_stock(db, material_id)
     return {"material_id": material_id, "current_stock": current_stock}
 
 
 @router.get("/{material_id}/recommended-po")
 async def get_material_recommended_po(
     material_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    recommended_po = MaterialService.calculate_recommended_po(db, material_id)
+    recommended_po = await MaterialService.calculate_recommended_po(db, material_id)
     return {"material_id": material_id, "recommended_po": recommended_po}
 
 
 @router.get("/statistics/summary")
 async def get_materials_statistics(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Dohvati statistike materijala i usluga"""
-    total_materials = db.query(Material).filter(
+    return await response_cache.get_or_compute(
+        "materials:statistics",
+        lambda: _build_statistics(db),
+        tags=(TAG_MATERIALS, TAG_STOCK),
+        ttl=settings.cache_ttl_seconds
+    )
+
+
+async def _build_statistics(db: AsyncSession) -> dict:
+    """Izračun statistika materijala i usluga (bez cachea)"""
+    total_materials = await db.scalar(select(func.count(Material.id)).where(
         Material.is_active == True,
-        Material.item_type == "materijal"
-    ).count()
+        Material.item_type == ItemType.MATERIAL
+    ))
     
-    total_services = db.query(Material).filter(
+    total_services = await db.scalar(select(func.count(Material.id)).where(
         Material.is_active == True,
-        Material.item_type == "usluga"
-    ).count()
+        Material.item_type == ItemType.SERVICE
+    ))
     
-    materials_with_coa = db.query(Material).filter(
+    materials_with_coa = await db.scalar(select(func.count(Material.id)).where(
         Material.is_active == True,
         Material.has_coa == True
-    ).count()
+    ))
     
-    critical_stock_materials = db.query(Material).filter(
+    critical_count = await MaterialService.count_stocks(
+        db,
         Material.is_active == True,
-        Material.item_type == "materijal"
-    ).all()
-    
-    critical_count = 0
-    for material in critical_stock_materials:
-        current_stock = MaterialService.calculate_current_stock(db, material.id)
-        if current_stock <= material.safety_stock * 0.5:
-            critical_count += 1
+        Material.item_type == ItemType.MATERIAL,
+        statuses=["critical"]
+    )
     
     return {
         "total_materials": total_materials,
@@ -216,46 +273,43 @@ async def get_materials_statistics(
 @router.get("/categories/{category}/items")
 async def get_items_by_category(
     category: str,
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Dohvati sve stavke po kategoriji"""
-    items = db.query(Material).filter(
+    items = await paginate(db, select(Material).where(
         Material.category == category,
         Material.is_active == True
-    ).offset(skip).limit(limit).all()
+    ), page, Material)
     return items
 
 
 @router.get("/vendors/{vendor_id}/items")
 async def get_items_by_vendor(
     vendor_id: int,
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Dohvati sve stavke po dobavljaču"""
-    items = db.query(Material).filter(
+    items = await paginate(db, select(Material).where(
         Material.vendor_id == vendor_id,
         Material.is_active == True
-    ).offset(skip).limit(limit).all()
+    ), page, Material)
     return items
 
 
 @router.get("/regulatory/{status}/items")
 async def get_items_by_regulatory_status(
     status: str,
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Dohvati sve stavke po regulatornom statusu"""
-    items = db.query(Material).filter(
+    items = await paginate(db, select(Material).where(
         Material.regulatory_status == status,
         Material.is_active == True
-    ).offset(skip).limit(limit).all()
+    ), page, Material)
     return items 
\ No newline at end of file
@@ -0,0 +1,67 @@
+import secrets
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import PlainTextResponse
+from ..core.auth import require_role
+from ..core.cache import response_cache
+from ..core.config import settings
+from ..core.database import POOL_METRICS, get_pool_stats
+from ..core.passwords import password_hasher
+from ..core.principals import principal_cache
+from ..core.request_metrics import render_prometheus, request_metrics
+from ..models.user import User
+
+router = APIRouter(prefix="/monitoring", tags=["monitoring"])
+
+
+@router.get("/pool")
+async def get_connection_pool_stats(
+    current_user: User = Depends(require_role("admin"))
+):
+    """Stanje connection poolova ovog worker procesa"""
+    return get_pool_stats()
+
+
+@router.get("/cache")
+async def get_response_cache_stats(
+    current_user: User = Depends(require_role("admin"))
+):
+    """Pogoci i promašaji response cachea ovog worker procesa"""
+    return response_cache.snapshot()
+
+
+@router.get("/principals")
+async def get_principal_cache_stats(
+    current_user: User = Depends(require_role("admin"))
+):
+    """Stanje cachea korisnika iz JWT tokena ovog worker procesa"""
+    return principal_cache.snapshot()
+
+
+@router.get("/passwords")
+async def get_password_hasher_stats(
+    current_user: User = Depends(require_role("admin"))
+):
+    """Red i trajanje bcrypt provjera lozinki ovog worker procesa"""
+    return password_hasher.snapshot()
+
+
+@router.get("/requests")
+async def get_request_stats(
+    current_user: User = Depends(require_role("admin"))
+):
+    """Zahtjevi, prosječno trajanje i broj SQL upita po ruti ovog worker procesa"""
+    return request_metrics.snapshot()
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_prometheus_metrics(authorization: Optional[str] = Header(None)):
+    """Metrike zahtjeva i poolova u Prometheus formatu (vrijednosti ovog worker procesa)"""
+    if settings.metrics_token and not secrets.compare_digest(
+        authorization or "", f"Bearer {settings.metrics_token}"
+    ):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
+    return PlainTextResponse(
+        render_prometheus(request_metrics, POOL_METRICS, password_hasher),
+        media_type="text/plain; version=0.0.4",
+    )
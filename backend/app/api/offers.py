@@ -1,33 +1,42 @@
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..core.database import get_db
+from ..core.expand import expand_options, expand_param
+from ..core.pagination import PageParams, paginate
 from ..core.auth import get_current_active_user
 from ..models.user import User
 from ..models.offer import Offer
 from ..schemas.offer import OfferCreate, OfferUpdate, OfferResponse
+from ..schemas.material import MaterialSummary
+from ..schemas.vendor import VendorSummary
 
 router = APIRouter(prefix="/offers", tags=["offers"])
 
+# Relacije dostupne kroz ?expand=
+OFFER_EXPANDS = {"material": MaterialSummary, "vendor": VendorSummary}
+
 
 @router.get("/", response_model=List[OfferResponse])
 async def get_offers(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
+    page: PageParams = Depends(),
+    expand: set[str] = Depends(expand_param(OFFER_EXPANDS)),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    offers = db.query(Offer).offset(skip).limit(limit).all()
+    query = select(Offer).options(*expand_options(Offer, expand, OFFER_EXPANDS))
+    offers = await paginate(db, query, page, Offer)
     return offers
 
 
 @router.post("/", response_model=OfferResponse)
 async def create_offer(
     offer: OfferCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    existing_offer = db.query(Offer).filter(Offer.offer_number == offer.offer_number).first()
+    existing_offer = await db.scalar(select(Offer).where(Offer.offer_number == offer.offer_number))
     if existing_offer:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -36,18 +45,18 @@ async def create_offer(
     
     db_offer = Offer(**offer.dict())
     db.add(db_offer)
-    db.commit()
-    db.refresh(db_offer)
+    await db.commit()
+    await db.refresh(db_offer)
     return db_offer
 
 
 @router.get("/{offer_id}", response_model=OfferResponse)
 async def get_offer(
     offer_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    offer = db.query(Offer).filter(Offer.id == offer_id).first()
+    offer = await db.scalar(select(Offer).where(Offer.id == offer_id))
     if not offer:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -60,10 +69,10 @@ async def get_offer(
 async def update_offer(
     offer_id: int,
     offer: OfferUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    db_offer = db.query(Offer).filter(Offer.id == offer_id).first()
+    db_offer = await db.scalar(select(Offer).where(Offer.id == offer_id))
     if not db_offer:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -74,24 +83,24 @@ async def update_offer(
     for field, value in update_data.items():
         setattr(db_offer, field, value)
     
-    db.commit()
-    db.refresh(db_offer)
+    await db.commit()
+    await db.refresh(db_offer)
     return db_offer
 
 
 @router.delete("/{offer_id}")
 async def delete_offer(
     offer_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    db_offer = db.query(Offer).filter(Offer.id == offer_id).first()
+    db_offer = await db.scalar(select(Offer).where(Offer.id == offer_id))
     if not db_offer:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Offer not found"
         )
     
-    db.delete(db_offer)
-    db.commit()
+    await db.delete(db_offer)
+    await db.commit()
     return {"message": "Offer deleted successfully"} 
\ No newline at end of file
@@ -1,33 +1,44 @@
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..core.cache import response_cache, TAG_PURCHASE_ORDERS
 from ..core.database import get_db
+from ..core.expand import expand_options, expand_param
+from ..core.pagination import PageParams, paginate
 from ..core.auth import get_current_active_user
 from ..models.user import User
 from ..models.purchase_order import PurchaseOrder
 from ..schemas.purchase_order import PurchaseOrderCreate, PurchaseOrderUpdate, PurchaseOrderResponse
+from ..schemas.material import MaterialSummary
+from ..schemas.user import UserSummary
+from ..schemas.vendor import VendorSummary
 
 router = APIRouter(prefix="/purchase-orders", tags=["purchase_orders"])
 
+# Relacije dostupne kroz ?expand=
+PURCHASE_ORDER_EXPANDS = {"material": MaterialSummary, "vendor": VendorSummary, "user": UserSummary}
+
 
 @router.get("/", response_model=List[PurchaseOrderResponse])
 async def get_purchase_orders(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
+    page: PageParams = Depends(),
+    expand: set[str] = Depends(expand_param(PURCHASE_ORDER_EXPANDS)),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    purchase_orders = db.query(PurchaseOrder).offset(skip).limit(limit).all()
+    query = select(PurchaseOrder).options(*expand_options(PurchaseOrder, expand, PURCHASE_ORDER_EXPANDS))
+    purchase_orders = await paginate(db, query, page, PurchaseOrder, {"date": (PurchaseOrder.order_date,)})
     return purchase_orders
 
 
 @router.post("/", response_model=PurchaseOrderResponse)
 async def create_purchase_order(
     purchase_order: PurchaseOrderCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    existing_po = db.query(PurchaseOrder).filter(PurchaseOrder.po_number == purchase_order.po_number).first()
+    existing_po = await db.scalar(select(PurchaseOrder).where(PurchaseOrder.po_number == purchase_order.po_number))
     if existing_po:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -36,18 +47,19 @@ async def create_purchase_order(
     
     db_po = PurchaseOrder(**purchase_order.dict(), created_by=current_user.id)
     db.add(db_po)
-    db.commit()
-    db.refresh(db_po)
+    await db.commit()
+    await response_cache.invalidate(TAG_PURCHASE_ORDERS)
+    await db.refresh(db_po)
     return db_po
 
 
 @router.get("/{po_id}", response_model=PurchaseOrderResponse)
 async def get_purchase_order(
     po_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    po = db.query(PurchaseOrder).filter(PurchaseOrder.id == po_id).first()
+    po = await db.scalar(select(PurchaseOrder).where(PurchaseOrder.id == po_id))
     if not po:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -60,10 +72,10 @@ async def get_purchase_order(
 async def update_purchase_order(
     po_id: int,
     purchase_order: PurchaseOrderUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    db_po = db.query(PurchaseOrder).filter(PurchaseOrder.id == po_id).first()
+    db_po = await db.scalar(select(PurchaseOrder).where(PurchaseOrder.id == po_id))
     if not db_po:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -74,18 +86,19 @@ async def update_purchase_order(
     for field, value in update_data.items():
         setattr(db_po, field, value)
     
-    db.commit()
-    db.refresh(db_po)
+    await db.commit()
+    await response_cache.invalidate(TAG_PURCHASE_ORDERS)
+    await db.refresh(db_po)
     return db_po
 
 
 @router.delete("/{po_id}")
 async def delete_purchase_order(
     po_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    db_po = db.query(PurchaseOrder).filter(PurchaseOrder.id == po_id).first()
+    db_po = await db.scalar(select(PurchaseOrder).where(PurchaseOrder.id == po_id))
     if not db_po:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -93,5 +106,6 @@ async def delete_purchase_order(
         )
     
     db_po.status = "cancelled"
-    db.commit()
+    await db.commit()
+    await response_cache.invalidate(TAG_PURCHASE_ORDERS)
     return {"message": "Purchase order cancelled successfully"} 
\ No newline at end of file
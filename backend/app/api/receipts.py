@@ -1,33 +1,51 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..core.cache import response_cache, TAG_STOCK
 from ..core.database import get_db
+from ..core.expand import expand_options, expand_param
+from ..core.pagination import PageParams, paginate
 from ..core.auth import get_current_active_user
 from ..models.user import User
 from ..models.receipt import Receipt
+from ..services.import_service import LedgerImportService, detect_format
+from ..services.stock_balance_service import StockBalanceService, receipt_entry
 from ..schemas.receipt import ReceiptCreate, ReceiptUpdate, ReceiptResponse
+from ..schemas.material import MaterialSummary
+from ..schemas.purchase_order import PurchaseOrderSummary
+from ..schemas.user import UserSummary
+from ..schemas.vendor import VendorSummary
+from ..schemas.ledger_import import ImportResult
 
 router = APIRouter(prefix="/receipts", tags=["receipts"])
 
+# Relacije dostupne kroz ?expand=
+RECEIPT_EXPANDS = {
+    "material": MaterialSummary, "vendor": VendorSummary,
+    "purchase_order": PurchaseOrderSummary, "user": UserSummary,
+}
+
 
 @router.get("/", response_model=List[ReceiptResponse])
 async def get_receipts(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
+    page: PageParams = Depends(),
+    expand: set[str] = Depends(expand_param(RECEIPT_EXPANDS)),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    receipts = db.query(Receipt).offset(skip).limit(limit).all()
+    query = select(Receipt).options(*expand_options(Receipt, expand, RECEIPT_EXPANDS))
+    receipts = await paginate(db, query, page, Receipt, {"date": (Receipt.receipt_date,)})
     return receipts
 
 
 @router.post("/", response_model=ReceiptResponse)
 async def create_receipt(
     receipt: ReceiptCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    existing_receipt = db.query(Receipt).filter(Receipt.receipt_number == receipt.receipt_number).first()
+    existing_receipt = await db.scalar(select(Receipt).where(Receipt.receipt_number == receipt.receipt_number))
     if existing_receipt:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -36,18 +54,43 @@ async def create_receipt(
     
     db_receipt = Receipt(**receipt.dict(), created_by=current_user.id)
     db.add(db_receipt)
-    db.commit()
-    db.refresh(db_receipt)
+    await db.run_sync(StockBalanceService.apply, "receipt", added=receipt_entry(db_receipt))
+    await db.commit()
+    await response_cache.invalidate(TAG_STOCK)
+    await db.refresh(db_receipt)
     return db_receipt
 
 
+@router.post("/import", response_model=ImportResult)
+async def import_receipts(
+    file: UploadFile = File(...),
+    format: Optional[str] = None,
+    dry_run: bool = False,
+    atomic: bool = False,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Skupni uvoz prijema iz CSV ili JSONL datoteke"""
+    try:
+        file_format = detect_format(file.filename, file.content_type, format)
+    except ValueError as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(error))
+    
+    result = await LedgerImportService.run(
+        db, "receipt", file.file, file_format, current_user.id, dry_run=dry_run, atomic=atomic
+    )
+    if result.inserted and not dry_run:
+        await response_cache.invalidate(TAG_STOCK)
+    return result
+
+
 @router.get("/{receipt_id}", response_model=ReceiptResponse)
 async def get_receipt(
     receipt_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    receipt = db.query(Receipt).filter(Receipt.id == receipt_id).first()
+    receipt = await db.scalar(select(Receipt).where(Receipt.id == receipt_id))
     if not receipt:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -60,38 +103,46 @@ async def get_receipt(
 async def update_receipt(
     receipt_id: int,
     receipt: ReceiptUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    db_receipt = db.query(Receipt).filter(Receipt.id == receipt_id).first()
+    db_receipt = await db.scalar(select(Receipt).where(Receipt.id == receipt_id))
     if not db_receipt:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Receipt not found"
         )
     
+    previous_entry = receipt_entry(db_receipt)
     update_data = receipt.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_receipt, field, value)
     
-    db.commit()
-    db.refresh(db_receipt)
+    await db.flush()
+    await db.run_sync(StockBalanceService.apply, "receipt", added=receipt_entry(db_receipt), removed=previous_entry)
+    await db.commit()
+    await response_cache.invalidate(TAG_STOCK)
+    await db.refresh(db_receipt)
     return db_receipt
 
 
 @router.delete("/{receipt_id}")
 async def delete_receipt(
     receipt_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    db_receipt = db.query(Receipt).filter(Receipt.id == receipt_id).first()
+    db_receipt = await db.scalar(select(Receipt).where(Receipt.id == receipt_id))
     if not db_receipt:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Receipt not found"
         )
     
-    db.delete(db_receipt)
-    db.commit()
+    removed_entry = receipt_entry(db_receipt)
+    await db.delete(db_receipt)
+    await db.flush()
+    await db.run_sync(StockBalanceService.apply, "receipt", removed=removed_entry)
+    await db.commit()
+    await response_cache.invalidate(TAG_STOCK)
     return {"message": "Receipt deleted successfully"} 
\ No newline at end of file
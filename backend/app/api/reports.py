@@ -0,0 +1,132 @@
+from datetime import date
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..core.cache import response_cache, TAG_MATERIALS
+from ..core.database import get_db
+from ..core.pagination import PageParams, paginate
+from ..core.auth import get_current_active_user, require_role
+from ..models.user import User
+from ..models.stock_snapshot import StockSnapshot
+from ..models.demand_forecast import DemandForecast
+from ..services.forecast_service import ForecastService
+from ..services.snapshot_service import StockSnapshotService
+from ..schemas.stock_snapshot import StockSnapshotResponse, StockSnapshotDay
+from ..schemas.demand_forecast import DemandForecastResponse
+
+router = APIRouter(prefix="/reports", tags=["reports"])
+
+
+@router.get("/stock-snapshots", response_model=List[StockSnapshotDay])
+async def get_snapshot_days(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Dostupni dnevni snimci s brojem materijala po statusu"""
+    query = select(
+        StockSnapshot.snapshot_date, StockSnapshot.stock_status, func.count().label("count")
+    ).group_by(StockSnapshot.snapshot_date, StockSnapshot.stock_status)
+    if date_from:
+        query = query.where(StockSnapshot.snapshot_date >= date_from)
+    if date_to:
+        query = query.where(StockSnapshot.snapshot_date <= date_to)
+
+    days: dict[date, StockSnapshotDay] = {}
+    for row in (await db.execute(query)).all():
+        day = days.setdefault(row.snapshot_date, StockSnapshotDay(
+            snapshot_date=row.snapshot_date, total_materials=0, by_status={}
+        ))
+        day.by_status[row.stock_status] = row.count
+        day.total_materials += row.count
+    return sorted(days.values(), key=lambda day: day.snapshot_date, reverse=True)
+
+
+@router.post("/stock-snapshots")
+async def build_snapshot(
+    snapshot_date: Optional[date] = None,
+    full: bool = False,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role("admin"))
+):
+    """Ručno gradi snimak za dan (zadano danas); full=true računa sve materijale iz knjige"""
+    return await db.run_sync(StockSnapshotService.build, snapshot_date, full)
+
+
+@router.get("/stock-snapshots/materials/{material_id}", response_model=List[StockSnapshotResponse])
+async def get_material_snapshot_history(
+    material_id: int,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Povijest stanja jednog materijala po danima"""
+    query = select(StockSnapshot).where(StockSnapshot.material_id == material_id)
+    if date_from:
+        query = query.where(StockSnapshot.snapshot_date >= date_from)
+    if date_to:
+        query = query.where(StockSnapshot.snapshot_date <= date_to)
+    return await paginate(
+        db, query, page, StockSnapshot, {"date": (StockSnapshot.snapshot_date,)}, default_sort="-date"
+    )
+
+
+@router.get("/stock-snapshots/{snapshot_date}", response_model=List[StockSnapshotResponse])
+async def get_snapshot(
+    snapshot_date: date,
+    stock_status: Optional[str] = Query(None, description="normal, low ili critical"),
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Stanje svih materijala na zadani dan"""
+    query = select(StockSnapshot).where(StockSnapshot.snapshot_date == snapshot_date)
+    if stock_status:
+        query = query.where(StockSnapshot.stock_status == stock_status)
+    snapshots = await paginate(db, query, page, StockSnapshot)
+    if not snapshots and not page.cursor:
+        exists = await db.scalar(
+            select(StockSnapshot.id).where(StockSnapshot.snapshot_date == snapshot_date).limit(1)
+        )
+        if exists is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Snapshot for this date not found"
+            )
+    return snapshots
+
+
+@router.post("/forecasts")
+async def run_forecasts(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role("admin"))
+):
+    """Ručno pokreće forecast potrošnje za sve materijale"""
+    summary = await db.run_sync(ForecastService.run)
+    if summary["updated_materials"]:
+        await response_cache.invalidate(TAG_MATERIALS)
+    return summary
+
+
+@router.get("/forecasts/materials/{material_id}", response_model=List[DemandForecastResponse])
+async def get_material_forecasts(
+    material_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Forecast materijala po metodama s greškama; odabrana metoda je prva"""
+    forecasts = (await db.scalars(
+        select(DemandForecast)
+        .where(DemandForecast.material_id == material_id)
+        .order_by(DemandForecast.selected.desc(), DemandForecast.mae)
+    )).all()
+    if not forecasts:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No forecast for this material"
+        )
+    return forecasts
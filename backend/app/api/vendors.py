@@ -1,7 +1,9 @@
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..core.database import get_db
+from ..core.pagination import PageParams, paginate
 from ..core.auth import get_current_active_user
 from ..models.user import User
 from ..models.vendor import Vendor
@@ -12,22 +14,21 @@ router = APIRouter(prefix="/vendors", tags=["vendors"])
 
 @router.get("/", response_model=List[VendorResponse])
 async def get_vendors(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    vendors = db.query(Vendor).offset(skip).limit(limit).all()
+    vendors = await paginate(db, select(Vendor), page, Vendor)
     return vendors
 
 
 @router.post("/", response_model=VendorResponse)
 async def create_vendor(
     vendor: VendorCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    existing_vendor = db.query(Vendor).filter(Vendor.code == vendor.code).first()
+    existing_vendor = await db.scalar(select(Vendor).where(Vendor.code == vendor.code))
     if existing_vendor:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -36,18 +37,18 @@ async def create_vendor(
     
     db_vendor = Vendor(**vendor.dict())
     db.add(db_vendor)
-    db.commit()
-    db.refresh(db_vendor)
+    await db.commit()
+    await db.refresh(db_vendor)
     return db_vendor
 
 
 @router.get("/{vendor_id}", response_model=VendorResponse)
 async def get_vendor(
     vendor_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    vendor = db.query(Vendor).filter(Vendor.id == vendor_id).first()
+    vendor = await db.scalar(select(Vendor).where(Vendor.id == vendor_id))
     if not vendor:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -60,10 +61,10 @@ async def get_vendor(
 async def update_vendor(
     vendor_id: int,
     vendor: VendorUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    db_vendor = db.query(Vendor).filter(Vendor.id == vendor_id).first()
+    db_vendor = await db.scalar(select(Vendor).where(Vendor.id == vendor_id))
     if not db_vendor:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -74,18 +75,18 @@ async def update_vendor(
     for field, value in update_data.items():
         setattr(db_vendor, field, value)
     
-    db.commit()
-    db.refresh(db_vendor)
+    await db.commit()
+    await db.refresh(db_vendor)
     return db_vendor
 
 
 @router.delete("/{vendor_id}")
 async def delete_vendor(
     vendor_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    db_vendor = db.query(Vendor).filter(Vendor.id == vendor_id).first()
+    db_vendor = await db.scalar(select(Vendor).where(Vendor.id == vendor_id))
     if not db_vendor:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -93,5 +94,5 @@ async def delete_vendor(
         )
     
     db_vendor.is_active = False
-    db.commit()
+    await db.commit()
     return {"message": "Vendor deactivated successfully"} 
\ No newline at end of file
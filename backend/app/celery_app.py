@@ -1,6 +1,12 @@
 from celery import Celery
+from kombu import Queue
 from .core.config import settings
 
+# Redovi: kratki taskovi (obavijesti, planiranje, spajanje rezultata) ne čekaju
+# iza teških noćnih poslova; heavy se skalira dodavanjem workera (-Q heavy)
+QUEUE_DEFAULT = "default"
+QUEUE_HEAVY = "heavy"
+
 celery_app = Celery(
     "zencore",
     broker=settings.redis_url,
@@ -19,4 +25,11 @@ celery_app.conf.update(
     task_soft_time_limit=25 * 60,  # 25 minuta
     worker_prefetch_multiplier=1,
     worker_max_tasks_per_child=1000,
+    task_queues=(Queue(QUEUE_DEFAULT), Queue(QUEUE_HEAVY)),
+    task_default_queue=QUEUE_DEFAULT,
+    task_routes={
+        "app.tasks.sync_with_erp": {"queue": QUEUE_HEAVY},
+        "app.tasks.build_snapshot_chunk": {"queue": QUEUE_HEAVY},
+        "app.tasks.forecast_chunk": {"queue": QUEUE_HEAVY},
+    },
 ) 
\ No newline at end of file
@@ -0,0 +1,223 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Awaitable, Callable, Iterable, Optional
+import redis
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+from .config import settings
+from .metrics import Counter
+
+logger = logging.getLogger(__name__)
+
+# Tagovi za invalidaciju - svaki cache unos ovisi o jednom ili više tagova
+TAG_MATERIALS = "materials"
+TAG_STOCK = "stock"  # prijemi i utrošak
+TAG_PURCHASE_ORDERS = "purchase_orders"
+
+KEY_PREFIX = "zencore:cache"
+
+
+def _jsonable(value: Any) -> Any:
+    # FastAPI se učitava tek ovdje: Celery worker koristi samo invalidaciju
+    from fastapi.encoders import jsonable_encoder
+
+    return jsonable_encoder(value)
+
+
+class CacheStats:
+    """Brojači pogodaka i promašaja po cache unosu"""
+
+    def __init__(self):
+        self.hits = Counter()
+        self.misses = Counter()
+        self.errors = Counter()
+
+    def snapshot(self) -> dict:
+        hits, misses = self.hits.value, self.misses.value
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "errors": self.errors.value,
+            "hit_ratio": round(hits / total, 4) if total else None,
+        }
+
+
+class ResponseCache:
+    """Redis cache za skupe read-only odgovore.
+
+    Ključ sadrži ime unosa, hash parametara i trenutnu generaciju svakog
+    taga. Invalidacija samo povećava generaciju taga (INCR), pa stari ključevi
+    postaju nedostupni i istječu kroz TTL. Rezultat izračunat prije
+    invalidacije sprema se pod staru generaciju i nikad se ne vraća.
+
+    Ako Redis nije dostupan, odgovor se računa direktno (fail-open), a
+    ponovni pokušaj spajanja radi se tek nakon `retry_after` sekundi.
+    """
+
+    def __init__(self, url: str, enabled: bool = True, retry_after: float = 30.0):
+        self.url = url
+        self.enabled = enabled
+        self.retry_after = retry_after
+        self._client: Optional[aioredis.Redis] = None
+        self._unavailable_until = 0.0
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._pending_tags: set[str] = set()
+        self._stats: dict[str, CacheStats] = {}
+        self.invalidations = Counter()
+
+    def _get_client(self) -> Optional[aioredis.Redis]:
+        if not self.enabled or time.monotonic() < self._unavailable_until:
+            return None
+        if self._client is None:
+            self._client = aioredis.from_url(
+                self.url,
+                decode_responses=True,
+                socket_timeout=settings.cache_socket_timeout,
+                socket_connect_timeout=settings.cache_socket_timeout,
+            )
+        return self._client
+
+    def _mark_unavailable(self, error: Exception) -> None:
+        logger.warning("Response cache nedostupan, odgovori se računaju direktno: %s", error)
+        self._unavailable_until = time.monotonic() + self.retry_after
+
+    def stats(self, name: str) -> CacheStats:
+        if name not in self._stats:
+            self._stats[name] = CacheStats()
+        return self._stats[name]
+
+    @staticmethod
+    def _tag_key(tag: str) -> str:
+        return f"{KEY_PREFIX}:tag:{tag}"
+
+    @staticmethod
+    def _params_hash(params: Optional[dict]) -> str:
+        payload = json.dumps(_jsonable(params or {}), sort_keys=True)
+        return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+    async def get_or_compute(
+        self,
+        name: str,
+        compute: Callable[[], Awaitable[Any]],
+        tags: Iterable[str],
+        ttl: int,
+        params: Optional[dict] = None,
+    ) -> Any:
+        """Vraća odgovor iz cachea ili ga izračunava i sprema"""
+        stats = self.stats(name)
+        client = self._get_client()
+        if client is None:
+            stats.misses.inc()
+            return await compute()
+
+        tags = sorted(tags)
+        try:
+            await self._flush_pending(client)
+            generations = await client.mget([self._tag_key(tag) for tag in tags])
+            key = ":".join(
+                [KEY_PREFIX, name, self._params_hash(params)]
+                + [f"{tag}={generation or 0}" for tag, generation in zip(tags, generations)]
+            )
+            cached = await client.get(key)
+        except (RedisError, OSError) as error:
+            stats.errors.inc()
+            stats.misses.inc()
+            self._mark_unavailable(error)
+            return await compute()
+
+        if cached is not None:
+            stats.hits.inc()
+            return json.loads(cached)
+
+        # Istovremeni promašaji istog ključa u ovom procesu računaju se jednom
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        try:
+            async with lock:
+                return await self._compute_and_store(client, key, stats, compute, ttl)
+        finally:
+            if not lock.locked():
+                self._locks.pop(key, None)
+
+    async def _compute_and_store(self, client, key, stats, compute, ttl) -> Any:
+        try:
+            cached = await client.get(key)
+        except (RedisError, OSError):
+            cached = None
+        if cached is not None:
+            stats.hits.inc()
+            return json.loads(cached)
+
+        stats.misses.inc()
+        value = _jsonable(await compute())
+        try:
+            await client.set(key, json.dumps(value), ex=ttl)
+        except (RedisError, OSError) as error:
+            stats.errors.inc()
+            self._mark_unavailable(error)
+        return value
+
+    async def _flush_pending(self, client: aioredis.Redis) -> None:
+        """Invalidacije propuštene dok Redis nije bio dostupan"""
+        if not self._pending_tags:
+            return
+        tags = sorted(self._pending_tags)
+        await self._incr_tags(client, tags)
+        self._pending_tags.difference_update(tags)
+
+    async def _incr_tags(self, client: aioredis.Redis, tags: Iterable[str]) -> None:
+        async with client.pipeline(transaction=False) as pipe:
+            for tag in tags:
+                pipe.incr(self._tag_key(tag))
+            await pipe.execute()
+
+    async def invalidate(self, *tags: str) -> None:
+        """Poništava sve unose koji ovise o zadanim tagovima"""
+        if not self.enabled:
+            return
+        client = self._get_client()
+        if client is None:
+            self._pending_tags.update(tags)
+            return
+        try:
+            await self._incr_tags(client, tags)
+            self.invalidations.inc()
+        except (RedisError, OSError) as error:
+            self._pending_tags.update(tags)
+            self._mark_unavailable(error)
+
+    def invalidate_blocking(self, *tags: str) -> None:
+        """Invalidacija iz sinkronog koda (Celery taskovi), s kratkotrajnom konekcijom"""
+        if not self.enabled:
+            return
+        client = redis.Redis.from_url(
+            self.url,
+            socket_timeout=settings.cache_socket_timeout,
+            socket_connect_timeout=settings.cache_socket_timeout,
+        )
+        try:
+            with client.pipeline(transaction=False) as pipe:
+                for tag in tags:
+                    pipe.incr(self._tag_key(tag))
+                pipe.execute()
+            self.invalidations.inc()
+        except (RedisError, OSError) as error:
+            # Unosi istječu kroz TTL
+            logger.warning("Invalidacija cachea nije uspjela: %s", error)
+        finally:
+            client.close()
+
+    def snapshot(self) -> dict:
+        """Brojači po unosu za ovaj proces"""
+        return {
+            "enabled": self.enabled,
+            "available": time.monotonic() >= self._unavailable_until,
+            "invalidations": self.invalidations.value,
+            "entries": {name: stats.snapshot() for name, stats in sorted(self._stats.items())},
+        }
+
+
+response_cache = ResponseCache(settings.redis_url, enabled=settings.cache_enabled)
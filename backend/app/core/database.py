@@ -1,17 +1,231 @@
-from sqlalchemy import create_engine
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
 from .config import settings
+from .metrics import Counter, Histogram
+from .request_metrics import instrument_engine
 
-engine = create_engine(settings.database_url)
+# Async driveri za API (asyncpg za PostgreSQL, aiosqlite za SQLite)
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+# Bucketi za čekanje na konekciju iz poola (sekunde)
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0)
+
+
+def async_database_url(url: str) -> str:
+    """Pretvara sinkroni database URL u URL s async driverom"""
+    scheme, separator, rest = url.partition("://")
+    driver = ASYNC_DRIVERS.get(scheme.split("+")[0])
+    if not separator or driver is None:
+        return url
+    return f"{driver}://{rest}"
+
+
+class PoolMetrics:
+    """Metrike jednog connection poola"""
+
+    def __init__(self):
+        self.wait_time = Histogram(POOL_WAIT_BUCKETS)
+        self.checkouts = Counter()
+        self.connections_opened = Counter()
+        self.connections_closed = Counter()
+        self.connections_invalidated = Counter()
+
+    def attach(self, pool) -> None:
+        event.listen(pool, "checkout", lambda *args: self.checkouts.inc())
+        event.listen(pool, "connect", lambda *args: self.connections_opened.inc())
+        event.listen(pool, "close", lambda *args: self.connections_closed.inc())
+        event.listen(pool, "close_detached", lambda *args: self.connections_closed.inc())
+        event.listen(pool, "invalidate", lambda *args: self.connections_invalidated.inc())
+
+
+class _WaitTimingPool:
+    """Mixin za QueuePool koji mjeri vrijeme čekanja na konekciju"""
+
+    metrics: PoolMetrics = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            if self.metrics is not None:
+                self.metrics.wait_time.observe(time.perf_counter() - start)
+
+    def recreate(self):
+        # Novi pool (npr. nakon dispose) nastavlja puniti iste metrike
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class InstrumentedQueuePool(_WaitTimingPool, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_WaitTimingPool, AsyncAdaptedQueuePool):
+    pass
+
+
+def engine_options(url: str, async_driver: bool = False) -> dict:
+    """Postavke poola i konekcije iz Settings za zadani URL"""
+    if not url.startswith(("postgresql", "postgres")):
+        return {}
+
+    options = {
+        "poolclass": InstrumentedAsyncQueuePool if async_driver else InstrumentedQueuePool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+    if settings.db_statement_timeout_ms:
+        timeout = str(settings.db_statement_timeout_ms)
+        if async_driver:
+            options["connect_args"] = {"server_settings": {"statement_timeout": timeout}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={timeout}"}
+    return options
+
+
+def instrument_pool(pool) -> PoolMetrics:
+    metrics = PoolMetrics()
+    metrics.attach(pool)
+    if isinstance(pool, _WaitTimingPool):
+        pool.metrics = metrics
+    return metrics
+
+
+def pool_stats(pool, metrics: PoolMetrics) -> dict:
+    """Trenutno stanje poola i metrike od pokretanja procesa"""
+    stats = {"pool_class": type(pool).__name__}
+    for name in ("size", "checkedout", "checkedin", "overflow"):
+        method = getattr(pool, name, None)
+        if method is not None:
+            stats[name] = method()
+    if "overflow" in stats:
+        # QueuePool broji overflow od -pool_size, zanimaju nas samo konekcije iznad poola
+        stats["overflow"] = max(0, stats["overflow"])
+    stats.update({
+        "max_overflow": getattr(pool, "_max_overflow", None),
+        "timeout": getattr(pool, "_timeout", None),
+        "checkouts": metrics.checkouts.value,
+        "wait_time_seconds": metrics.wait_time.snapshot(),
+        "connections_opened": metrics.connections_opened.value,
+        "connections_closed": metrics.connections_closed.value,
+        "connections_invalidated": metrics.connections_invalidated.value,
+    })
+    return stats
+
+
+# Sinkroni engine - Celery taskovi, skripte i migracije
+engine = create_engine(settings.database_url, **engine_options(settings.database_url))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine - API routeri
+async_url = async_database_url(settings.database_url)
+async_engine = create_async_engine(async_url, **engine_options(async_url, async_driver=True))
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+POOL_METRICS = {
+    "sync": instrument_pool(engine.pool),
+    "async": instrument_pool(async_engine.sync_engine.pool),
+}
+
+# Broj upita i vrijeme u bazi po HTTP zahtjevu (API koristi async engine)
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+
+
+def get_pool_stats() -> dict:
+    """Statistika oba poola u ovom procesu"""
+    return {
+        "sync": pool_stats(engine.pool, POOL_METRICS["sync"]),
+        "async": pool_stats(async_engine.sync_engine.pool, POOL_METRICS["async"]),
+    }
+
+
 Base = declarative_base()
 
 
-def get_db():
-    db = SessionLocal()
-    try:
+def dialect_insert(db, model):
+    """INSERT s podrškom za ON CONFLICT (PostgreSQL i SQLite), inače None"""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return None
+    return insert(model)
+
+
+def id_ranges(db, column, chunk_size: int, *where) -> list[tuple[Optional[int], Optional[int]]]:
+    """Dijeli retke na raspone id-eva [start, end) od najviše chunk_size redaka.
+
+    Prvi i zadnji raspon su otvoreni (None), pa ih zajedno pokrivaju i
+    retci dodani nakon podjele.
+    """
+    numbered = select(column.label("id"), func.row_number().over(order_by=column).label("n")).where(*where).subquery()
+    bounds = db.scalars(
+        select(numbered.c.id).where(numbered.c.n > 1, (numbered.c.n - 1) % chunk_size == 0).order_by(numbered.c.id)
+    ).all()
+    edges = [None, *bounds, None]
+    return list(zip(edges[:-1], edges[1:]))
+
+
+def id_range_filter(column, id_range: Optional[tuple]) -> list:
+    """Uvjeti za raspon id-eva iz id_ranges (None = bez ograničenja)"""
+    if id_range is None:
+        return []
+    start, end = id_range
+    conditions = []
+    if start is not None:
+        conditions.append(column >= start)
+    if end is not None:
+        conditions.append(column < end)
+    return conditions
+
+
+@contextmanager
+def advisory_lock(key: int, bind=None, wait: bool = False) -> Iterator[bool]:
+    """PostgreSQL advisory lock na zasebnoj konekciji (commitovi ga ne otpuštaju).
+
+    Vraća False ako lock drži drugi proces (s wait=True čeka da ga otpusti);
+    na drugim bazama uvijek True.
+    """
+    bind = bind or engine
+    if bind.dialect.name != "postgresql":
+        yield True
+        return
+    with bind.connect() as connection:
+        if wait:
+            connection.execute(select(func.pg_advisory_lock(key)))
+            acquired = True
+        else:
+            acquired = connection.scalar(select(func.pg_try_advisory_lock(key)))
+        try:
+            yield bool(acquired)
+        finally:
+            if acquired:
+                connection.scalar(select(func.pg_advisory_unlock(key)))
+
+
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close() 
\ No newline at end of file
@@ -0,0 +1,39 @@
+from typing import Callable, Optional
+from fastapi import HTTPException, Query, status
+from pydantic import BaseModel
+from sqlalchemy.orm import selectinload
+
+
+def expand_param(relations: dict[str, type[BaseModel]]) -> Callable[..., set[str]]:
+    """Dependency za ?expand=rel1,rel2 s dopuštenim relacijama endpointa"""
+    allowed = ", ".join(relations)
+
+    def dependency(
+        expand: Optional[str] = Query(None, description=f"Ugniježđene relacije odvojene zarezom: {allowed}")
+    ) -> set[str]:
+        names = {name.strip() for name in (expand or "").split(",") if name.strip()}
+        unknown = sorted(names - set(relations))
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown expand '{unknown[0]}', allowed: {allowed}"
+            )
+        return names
+
+    return dependency
+
+
+def expand_options(model, expand: set[str], relations: dict[str, type[BaseModel]]) -> list:
+    """Loader opcije za tražene relacije.
+
+    Svaka relacija učitava se jednim SELECT ... WHERE id IN (...) za cijelu
+    stranicu i samo sa stupcima sažetka, pa broj upita ne ovisi o veličini
+    stranice (1 + broj relacija).
+    """
+    options = []
+    for name in sorted(expand):
+        relationship = getattr(model, name)
+        target = relationship.property.mapper.class_
+        columns = [getattr(target, field) for field in relations[name].model_fields]
+        options.append(selectinload(relationship).load_only(*columns))
+    return options
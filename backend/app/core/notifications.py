@@ -0,0 +1,137 @@
+import smtplib
+import threading
+import time
+from email.mime.text import MIMEText
+from email.mime.multipart import MIMEMultipart
+from typing import Optional
+import httpx
+from .config import settings
+
+
+class PermanentDeliveryError(Exception):
+    """Greška koju ponovno slanje ne može popraviti (npr. kriva prijava ili webhook)"""
+
+
+class EmailChannel:
+    """SMTP kanal s jednom konekcijom po procesu.
+
+    Konekcija ostaje otvorena između poruka i taskova; prije slanja provjerava
+    se s NOOP i po potrebi otvara ponovno (serveri zatvaraju neaktivne veze).
+    """
+
+    name = "email"
+
+    def __init__(self):
+        self._server: Optional[smtplib.SMTP] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(settings.smtp_server, settings.smtp_port, timeout=30)
+        server.starttls()
+        if settings.smtp_username:
+            try:
+                server.login(settings.smtp_username, settings.smtp_password)
+            except smtplib.SMTPAuthenticationError as error:
+                server.close()
+                raise PermanentDeliveryError(f"SMTP login failed: {error}")
+        return server
+
+    def _alive(self) -> bool:
+        try:
+            return self._server.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    def send(self, subject: str, body: str) -> None:
+        msg = MIMEMultipart()
+        msg['From'] = settings.smtp_username
+        msg['To'] = settings.notification_email_to
+        msg['Subject'] = subject
+        msg.attach(MIMEText(body, 'plain'))
+
+        with self._lock:
+            if self._server is not None and not self._alive():
+                self.close()
+            if self._server is None:
+                self._server = self._connect()
+            try:
+                self._server.send_message(msg)
+            except (smtplib.SMTPServerDisconnected, OSError):
+                self.close()
+                raise
+
+    def close(self) -> None:
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except (smtplib.SMTPException, OSError):
+                self._server.close()
+            self._server = None
+
+
+class SlackChannel:
+    """Slack webhook kanal s dijeljenim HTTP klijentom (keep-alive konekcije)"""
+
+    name = "slack"
+
+    def __init__(self):
+        self._client: Optional[httpx.Client] = None
+
+    def send(self, subject: str, body: str) -> None:
+        if self._client is None:
+            self._client = httpx.Client(timeout=10, limits=httpx.Limits(max_connections=2))
+        response = self._client.post(
+            settings.slack_webhook_url,
+            json={"text": f"🚨 *{subject}*\n\n{body}"},
+        )
+        if response.status_code == 429 or response.status_code >= 500:
+            response.raise_for_status()
+        elif response.status_code >= 400:
+            raise PermanentDeliveryError(f"Slack webhook returned {response.status_code}")
+
+    def close(self) -> None:
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+
+# Kanali se kreiraju lijeno, pa svaki Celery worker proces ima svoje konekcije
+_channels: dict[str, object] = {}
+
+
+def configured_channels() -> list:
+    """Kanali za koje postoji konfiguracija"""
+    channels = []
+    if settings.smtp_server:
+        channels.append(_channels.setdefault("email", EmailChannel()))
+    if settings.slack_webhook_url:
+        channels.append(_channels.setdefault("slack", SlackChannel()))
+    return channels
+
+
+def _retry_delay(error: Exception, attempt: int) -> float:
+    """Eksponencijalni backoff; Retry-After ima prednost kod HTTP 429"""
+    delay = settings.notification_retry_backoff * 2 ** (attempt - 1)
+    if isinstance(error, httpx.HTTPStatusError):
+        retry_after = error.response.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, float(retry_after))
+    return delay
+
+
+def deliver(channel, subject: str, body: str, attempts: Optional[int] = None) -> bool:
+    """Šalje poruku kroz kanal uz ponavljanje s backoffom, vraća je li poslana"""
+    attempts = attempts or settings.notification_max_attempts
+    for attempt in range(1, attempts + 1):
+        try:
+            channel.send(subject, body)
+            return True
+        except PermanentDeliveryError as e:
+            print(f"{channel.name} notification failed: {str(e)}")
+            return False
+        except Exception as e:
+            if attempt == attempts:
+                print(f"{channel.name} notification failed after {attempts} attempts: {str(e)}")
+                return False
+            time.sleep(_retry_delay(e, attempt))
+    return False
@@ -0,0 +1,185 @@
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from typing import Any, NamedTuple, Optional, Sequence
+from fastapi import HTTPException, Query, Request, Response, status
+from sqlalchemy import Date, DateTime, Select, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+MAX_PAGE_SIZE = 1000
+
+# Headeri s metapodacima stranice (tijelo odgovora ostaje lista)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+PREV_CURSOR_HEADER = "X-Prev-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+PAGINATION_HEADERS = [NEXT_CURSOR_HEADER, PREV_CURSOR_HEADER, TOTAL_COUNT_HEADER, "Link"]
+
+
+class PageParams:
+    """Parametri keyset paginacije za list endpointe"""
+
+    def __init__(
+        self,
+        request: Request,
+        response: Response,
+        cursor: Optional[str] = Query(None, description="Kursor iz X-Next-Cursor / X-Prev-Cursor"),
+        limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+        sort: Optional[str] = Query(None, description="Stupac sortiranja, '-' za silazno (npr. -date)"),
+        include_total: bool = Query(False, description="Vrati ukupan broj u X-Total-Count"),
+        skip: int = Query(0, ge=0, deprecated=True, description="Offset paginacija, koristiti cursor"),
+    ):
+        self.request = request
+        self.response = response
+        self.cursor = cursor
+        self.limit = limit
+        self.sort = sort
+        self.include_total = include_total
+        self.skip = skip
+
+
+class _Position(NamedTuple):
+    values: list
+    backwards: bool
+
+
+def _invalid_cursor() -> HTTPException:
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _decode_value(value: Any, column) -> Any:
+    """Vrijednost iz kursora u tipu stupca; kriv tip je neispravan kursor, ne greška baze"""
+    if value is None:
+        return None
+    if isinstance(column.type, DateTime):
+        return datetime.fromisoformat(value)
+    if isinstance(column.type, Date):
+        return date.fromisoformat(value)
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+    if isinstance(value, bool) and python_type is not bool:
+        raise _invalid_cursor()
+    if python_type is float and isinstance(value, int):
+        return float(value)
+    if not isinstance(value, python_type):
+        raise _invalid_cursor()
+    return value
+
+
+def encode_cursor(sort: str, values: Sequence[Any], backwards: bool = False) -> str:
+    payload = {"s": sort, "k": [_encode_value(value) for value in values]}
+    if backwards:
+        payload["b"] = 1
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str, columns: Sequence) -> _Position:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        values = payload["k"]
+        if payload["s"] != sort or len(values) != len(columns):
+            raise _invalid_cursor()
+        return _Position(
+            [_decode_value(value, column) for value, column in zip(values, columns)],
+            bool(payload.get("b")),
+        )
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise _invalid_cursor()
+
+
+def _sort_columns(model, sort: str, sorts: dict) -> tuple[list, bool]:
+    """Stupci sortiranja; id je uvijek zadnji pa je redoslijed jednoznačan"""
+    descending = sort.startswith("-")
+    name = sort[1:] if descending else sort
+    if name not in sorts:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported sort '{sort}', allowed: {', '.join(sorted(sorts))}"
+        )
+    columns = [column for column in sorts[name] if column is not model.id] + [model.id]
+    return columns, descending
+
+
+def _page_link(request: Request, cursor: str, rel: str) -> str:
+    url = request.url.remove_query_params("skip").include_query_params(cursor=cursor)
+    return f'<{url}>; rel="{rel}"'
+
+
+async def paginate(
+    db: AsyncSession,
+    query: Select,
+    page: PageParams,
+    model,
+    sorts: Optional[dict] = None,
+    default_sort: str = "id",
+) -> list:
+    """Vraća jednu stranicu upita i postavlja kursore u headere odgovora.
+
+    Stranica se čita uvjetom na indeksirane stupce sortiranja umjesto
+    OFFSET-a, pa je cijena ista za prvu i za tisućitu stranicu.
+    `sorts` mapira ime sortiranja na stupce ili izraze, npr.
+    {"date": (Receipt.receipt_date,)}.
+    """
+    sort = page.sort or default_sort
+    width = len(query.column_descriptions)  # entitet se broji kao jedan stupac
+    columns, descending = _sort_columns(model, sort, {"id": (model.id,), **(sorts or {})})
+
+    if page.include_total:
+        total = await db.scalar(select(func.count()).select_from(query.order_by(None).subquery()))
+        page.response.headers[TOTAL_COUNT_HEADER] = str(total)
+
+    position = decode_cursor(page.cursor, sort, columns) if page.cursor else None
+    backwards = position is not None and position.backwards
+    scan_descending = descending != backwards
+
+    if position is not None:
+        keys = tuple_(*columns) if len(columns) > 1 else columns[0]
+        bound = tuple_(*position.values) if len(columns) > 1 else position.values[0]
+        query = query.where(keys < bound if scan_descending else keys > bound)
+    elif page.skip:
+        query = query.offset(page.skip)
+
+    # Vrijednosti ključa čitaju se uz redak, pa sortiranje može biti i po izrazu
+    query = query.add_columns(*columns)
+    query = query.order_by(*[column.desc() if scan_descending else column.asc() for column in columns])
+    rows = list((await db.execute(query.limit(page.limit + 1))).all())
+    has_more = len(rows) > page.limit
+    rows = rows[:page.limit]
+    if backwards:
+        rows.reverse()
+    # Upit s jednim entitetom vraća entitete, inače retke bez stupaca ključa
+    items = [row[0] if width == 1 else tuple(row[:width]) for row in rows]
+
+    # Unatrag se uvijek može natrag naprijed; unaprijed postoji prethodna
+    # stranica samo ako ovo nije prva
+    if backwards:
+        has_next, has_prev = True, has_more
+    else:
+        has_next, has_prev = has_more, position is not None or page.skip > 0
+
+    next_cursor = prev_cursor = None
+    if rows and has_next:
+        next_cursor = encode_cursor(sort, rows[-1][width:])
+    if rows and has_prev:
+        prev_cursor = encode_cursor(sort, rows[0][width:], backwards=True)
+
+    links = []
+    if next_cursor:
+        page.response.headers[NEXT_CURSOR_HEADER] = next_cursor
+        links.append(_page_link(page.request, next_cursor, "next"))
+    if prev_cursor:
+        page.response.headers[PREV_CURSOR_HEADER] = prev_cursor
+        links.append(_page_link(page.request, prev_cursor, "prev"))
+    if links:
+        page.response.headers["Link"] = ", ".join(links)
+    return items
@@ -0,0 +1,116 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+from .config import settings
+from .metrics import Counter, Histogram
+
+# Hash s manje rundi od bcrypt_rounds je zastario i obnavlja se pri prijavi
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.bcrypt_rounds,
+    bcrypt__min_rounds=settings.bcrypt_rounds,
+)
+
+# Bucketi za čekanje u redu i trajanje jednog hasha (sekunde)
+PASSWORD_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class PasswordHasher:
+    """Bcrypt u ograničenom poolu threadova umjesto na event loopu.
+
+    bcrypt otpušta GIL, pa se prijave izvode paralelno na svim jezgrama, a
+    ostali zahtjevi ne čekaju. Najviše `workers` hasheva radi istovremeno;
+    kad na red čeka više od `max_queue`, zahtjev dobiva 503.
+    """
+
+    def __init__(self, context: CryptContext = pwd_context, workers: int = 0, max_queue: int = 0):
+        self.context = context
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.in_flight = 0
+        self.wait_time = Histogram(PASSWORD_BUCKETS)
+        self.hash_time = Histogram(PASSWORD_BUCKETS)
+        self.rejected = Counter()
+        self.rehashed = Counter()
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password")
+        return self._executor
+
+    async def _run(self, function, *args):
+        with self._lock:
+            if self.max_queue and self.queued >= self.max_queue:
+                self.rejected.inc()
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Too many concurrent password checks",
+                    headers={"Retry-After": "1"},
+                )
+            self.queued += 1
+        submitted = time.perf_counter()
+        # Stanje poziva: "queued" dok čeka na thread, "abandoned" ako je
+        # pozivatelj otkazan prije nego što je thread preuzeo posao
+        state = ["queued"]
+
+        def task():
+            started = time.perf_counter()
+            with self._lock:
+                if state[0] == "abandoned":
+                    return None
+                state[0] = "started"
+                self.queued -= 1
+                self.in_flight += 1
+            self.wait_time.observe(started - submitted)
+            try:
+                return function(*args)
+            finally:
+                self.hash_time.observe(time.perf_counter() - started)
+                with self._lock:
+                    self.in_flight -= 1
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._pool(), task)
+        finally:
+            # Otkazani zahtjev (prekid klijenta, timeout) oslobađa svoje mjesto u redu
+            with self._lock:
+                if state[0] == "queued":
+                    state[0] = "abandoned"
+                    self.queued -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self.context.hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+        """Provjera lozinke; drugi element je novi hash ako je postojeći zastario"""
+        valid, new_hash = await self._run(self.context.verify_and_update, password, hashed_password)
+        if new_hash is not None:
+            self.rehashed.inc()
+        return valid, new_hash
+
+    def snapshot(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "queued": self.queued,
+            "in_flight": self.in_flight,
+            "rejected": self.rejected.value,
+            "rehashed": self.rehashed.value,
+            "wait_time": self.wait_time.snapshot(),
+            "hash_time": self.hash_time.snapshot(),
+        }
+
+
+password_hasher = PasswordHasher(
+    workers=settings.password_hash_workers,
+    max_queue=settings.password_hash_queue,
+)
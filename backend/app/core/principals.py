@@ -0,0 +1,199 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+from .config import settings
+from .metrics import Counter
+from ..models.user import User
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "zencore:principal"
+
+# Kolone korisnika koje se cacheiraju (bez hasha lozinke)
+PRINCIPAL_FIELDS = (
+    "id", "email", "username", "full_name", "is_active",
+    "is_superuser", "role", "created_at", "updated_at",
+)
+DATETIME_FIELDS = ("created_at", "updated_at")
+
+
+def principal_data(user: User) -> dict:
+    return {field: getattr(user, field) for field in PRINCIPAL_FIELDS}
+
+
+def principal_user(data: dict) -> User:
+    """Novi (transient) User za jedan request, nije vezan ni na jednu sesiju"""
+    return User(**data)
+
+
+def _dump(data: dict) -> str:
+    return json.dumps({
+        field: value.isoformat() if isinstance(value, datetime) else value
+        for field, value in data.items()
+    })
+
+
+def _load(raw: str) -> dict:
+    data = json.loads(raw)
+    for field in DATETIME_FIELDS:
+        if data.get(field):
+            data[field] = datetime.fromisoformat(data[field])
+    return data
+
+
+class PrincipalCache:
+    """Cache korisnika razriješenih iz JWT tokena.
+
+    Lokalni tier je LRU s TTL-om unutar procesa; unos nikad ne živi dulje od
+    tokena koji ga je napunio. Opcionalni Redis tier dijele svi workeri - tada
+    lokalni unosi žive kratko (`local_ttl`) da invalidacija brzo stigne do
+    ostalih procesa. Bez Redisa invalidacija vrijedi samo za ovaj proces, a
+    ostali workeri vide promjenu najkasnije nakon `ttl` sekundi.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        enabled: bool = True,
+        redis_url: Optional[str] = None,
+        local_ttl: float = 5.0,
+        retry_after: float = 30.0,
+    ):
+        self.maxsize = maxsize
+        self.enabled = enabled
+        self.redis_url = redis_url
+        self.ttl = ttl
+        self.local_ttl = min(local_ttl, ttl) if redis_url else ttl
+        self.retry_after = retry_after
+        self._entries: OrderedDict[str, tuple[dict, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._client: Optional[aioredis.Redis] = None
+        self._unavailable_until = 0.0
+        self.hits = Counter()
+        self.redis_hits = Counter()
+        self.misses = Counter()
+        self.invalidations = Counter()
+
+    def _get_client(self) -> Optional[aioredis.Redis]:
+        if not self.redis_url or time.monotonic() < self._unavailable_until:
+            return None
+        if self._client is None:
+            self._client = aioredis.from_url(
+                self.redis_url,
+                decode_responses=True,
+                socket_timeout=settings.cache_socket_timeout,
+                socket_connect_timeout=settings.cache_socket_timeout,
+            )
+        return self._client
+
+    def _mark_unavailable(self, error: Exception) -> None:
+        logger.warning("Redis tier cachea korisnika nedostupan: %s", error)
+        self._unavailable_until = time.monotonic() + self.retry_after
+
+    def _get_local(self, subject: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(subject)
+            if entry is None:
+                return None
+            data, expires_at = entry
+            if time.time() >= expires_at:
+                del self._entries[subject]
+                return None
+            self._entries.move_to_end(subject)
+            return data
+
+    def _set_local(self, subject: str, data: dict, expires_at: float) -> None:
+        with self._lock:
+            self._entries[subject] = (data, expires_at)
+            self._entries.move_to_end(subject)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    async def get(self, subject: str) -> Optional[dict]:
+        """Vraća podatke korisnika iz lokalnog ili Redis tiera"""
+        if not self.enabled:
+            return None
+        data = self._get_local(subject)
+        if data is not None:
+            self.hits.inc()
+            return data
+
+        client = self._get_client()
+        if client is not None:
+            try:
+                raw = await client.get(f"{KEY_PREFIX}:{subject}")
+            except (RedisError, OSError) as error:
+                self._mark_unavailable(error)
+                raw = None
+            if raw is not None:
+                data = _load(raw)
+                self._set_local(subject, data, time.time() + self.local_ttl)
+                self.redis_hits.inc()
+                return data
+
+        self.misses.inc()
+        return None
+
+    async def set(self, subject: str, data: dict, token_expires_at: Optional[float] = None) -> None:
+        """Sprema korisnika; trajanje je ograničeno istekom tokena"""
+        if not self.enabled:
+            return
+        now = time.time()
+        expires_at = now + self.ttl
+        if token_expires_at is not None:
+            expires_at = min(expires_at, token_expires_at)
+        if expires_at <= now:
+            return
+
+        self._set_local(subject, data, min(expires_at, now + self.local_ttl))
+        client = self._get_client()
+        if client is not None:
+            try:
+                await client.set(f"{KEY_PREFIX}:{subject}", _dump(data), ex=max(1, int(expires_at - now)))
+            except (RedisError, OSError) as error:
+                self._mark_unavailable(error)
+
+    async def invalidate(self, *subjects: str) -> None:
+        """Briše korisnike iz cachea (deaktivacija, promjena uloge...)"""
+        with self._lock:
+            for subject in subjects:
+                self._entries.pop(subject, None)
+        self.invalidations.inc()
+        client = self._get_client()
+        if client is not None and subjects:
+            try:
+                await client.delete(*[f"{KEY_PREFIX}:{subject}" for subject in subjects])
+            except (RedisError, OSError) as error:
+                self._mark_unavailable(error)
+
+    def snapshot(self) -> dict:
+        """Brojači za ovaj proces"""
+        with self._lock:
+            size = len(self._entries)
+        return {
+            "enabled": self.enabled,
+            "redis_tier": bool(self.redis_url),
+            "redis_available": bool(self.redis_url) and time.monotonic() >= self._unavailable_until,
+            "size": size,
+            "maxsize": self.maxsize,
+            "hits": self.hits.value,
+            "redis_hits": self.redis_hits.value,
+            "misses": self.misses.value,
+            "invalidations": self.invalidations.value,
+        }
+
+
+principal_cache = PrincipalCache(
+    maxsize=settings.principal_cache_size,
+    ttl=settings.principal_cache_ttl_seconds,
+    enabled=settings.principal_cache_enabled,
+    redis_url=settings.redis_url if settings.principal_cache_redis else None,
+    local_ttl=settings.principal_cache_local_ttl_seconds,
+)
@@ -0,0 +1,239 @@
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+from .config import settings
+from .metrics import Counter, Histogram
+
+logger = logging.getLogger(__name__)
+
+# Bucketi za broj SQL upita po zahtjevu
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+# Zahtjevi koji ne odgovaraju nijednoj ruti (ne šire skup labela)
+UNMATCHED_ROUTE = "unmatched"
+
+# Duljina SQL-a u logu sporih zahtjeva
+STATEMENT_LOG_LENGTH = 300
+
+
+class RequestStats:
+    """Upiti jednog HTTP zahtjeva (puni se iz SQLAlchemy cursor evenata)"""
+
+    __slots__ = ("query_count", "db_time", "statements")
+
+    def __init__(self):
+        self.query_count = 0
+        self.db_time = 0.0
+        # SQL -> [broj izvršavanja, ukupno vrijeme]
+        self.statements: dict[str, list] = {}
+
+    def record(self, statement: str, duration: float) -> None:
+        self.query_count += 1
+        self.db_time += duration
+        totals = self.statements.get(statement)
+        if totals is None:
+            self.statements[statement] = [1, duration]
+        else:
+            totals[0] += 1
+            totals[1] += duration
+
+    def top_queries(self, limit: int) -> list[dict]:
+        """Upiti s najviše ukupnog vremena (N+1 se vidi po broju izvršavanja)"""
+        ranked = sorted(self.statements.items(), key=lambda item: item[1][1], reverse=True)[:limit]
+        return [
+            {"statement": " ".join(statement.split())[:STATEMENT_LOG_LENGTH], "count": count, "seconds": round(seconds, 4)}
+            for statement, (count, seconds) in ranked
+        ]
+
+
+def server_timing(stats: RequestStats) -> str:
+    """Server-Timing header s vremenom i brojem SQL upita (čita ga benchmark.py)"""
+    return f'db;dur={stats.db_time * 1000:.2f};desc="{stats.query_count} queries"'
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    return _current.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    started = conn.info.get("query_started_at")
+    if stats is None or not started:
+        return
+    stats.record(statement, time.perf_counter() - started.pop())
+
+
+def instrument_engine(engine) -> None:
+    """Pripisuje upite enginea zahtjevu koji ih izvršava (izvan zahtjeva se ne broje)"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class RouteMetrics:
+    """Metrike jedne rute (metoda + predložak putanje)"""
+
+    def __init__(self):
+        self.duration = Histogram()
+        self.queries = Histogram(QUERY_COUNT_BUCKETS)
+        self.db_time = Histogram()
+        self.errors = Counter()  # odgovori 5xx
+
+
+class RequestMetrics:
+    """Latencija, broj upita i vrijeme u bazi po ruti, unutar procesa"""
+
+    def __init__(self):
+        self.routes: dict[tuple, RouteMetrics] = {}
+        self._lock = threading.Lock()
+
+    def route(self, method: str, path: str) -> RouteMetrics:
+        key = (method, path)
+        metrics = self.routes.get(key)
+        if metrics is None:
+            with self._lock:
+                metrics = self.routes.setdefault(key, RouteMetrics())
+        return metrics
+
+    def observe(self, method: str, path: str, status: int, duration: float, stats: RequestStats) -> None:
+        metrics = self.route(method, path)
+        metrics.duration.observe(duration)
+        metrics.queries.observe(stats.query_count)
+        metrics.db_time.observe(stats.db_time)
+        if status >= 500:
+            metrics.errors.inc()
+
+    def snapshot(self) -> dict:
+        routes = {}
+        for (method, path), metrics in sorted(self.routes.items(), key=lambda item: (item[0][1], item[0][0])):
+            duration, queries, db_time = (
+                metrics.duration.snapshot(), metrics.queries.snapshot(), metrics.db_time.snapshot()
+            )
+            count = duration["count"]
+            routes[f"{method} {path}"] = {
+                "requests": count,
+                "errors": metrics.errors.value,
+                "avg_seconds": round(duration["sum"] / count, 4) if count else None,
+                "avg_queries": round(queries["sum"] / count, 2) if count else None,
+                "avg_db_seconds": round(db_time["sum"] / count, 4) if count else None,
+            }
+        return routes
+
+
+request_metrics = RequestMetrics()
+
+
+class RequestMetricsMiddleware:
+    """ASGI middleware: trajanje i upiti po zahtjevu, log sporih zahtjeva"""
+
+    def __init__(self, app, metrics: RequestMetrics = request_metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        status = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if settings.server_timing_header:
+                    # Upiti do početka odgovora (tijelo se kod JSON endpointa računa prije)
+                    message["headers"] = [*message.get("headers", []), (b"server-timing", server_timing(stats).encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            duration = time.perf_counter() - start
+            _current.reset(token)
+            route = scope.get("route")
+            path = getattr(route, "path", None) or UNMATCHED_ROUTE
+            self.metrics.observe(scope["method"], path, status, duration, stats)
+            if settings.slow_request_ms and duration * 1000 >= settings.slow_request_ms:
+                logger.warning(
+                    "Spori zahtjev %s %s: %.0f ms, status %s, %s upita, %.0f ms u bazi, najsporiji upiti: %s",
+                    scope["method"], path, duration * 1000, status, stats.query_count, stats.db_time * 1000,
+                    stats.top_queries(settings.slow_request_top_queries),
+                )
+
+
+def _prometheus_histogram(lines: list, name: str, labels: str, snapshot: dict) -> None:
+    prefix = f"{labels}," if labels else ""
+    suffix = f"{{{labels}}}" if labels else ""
+    for bound, count in snapshot["buckets"].items():
+        lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {count}')
+    lines.append(f"{name}_sum{suffix} {snapshot['sum']}")
+    lines.append(f"{name}_count{suffix} {snapshot['count']}")
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def render_prometheus(metrics: RequestMetrics = request_metrics, pool_metrics: Optional[dict] = None, password_hasher=None) -> str:
+    """Metrike u Prometheus text formatu (0.0.4)"""
+    histograms = (
+        ("zencore_http_request_duration_seconds", "Trajanje HTTP zahtjeva", "duration"),
+        ("zencore_http_request_queries", "Broj SQL upita po zahtjevu", "queries"),
+        ("zencore_http_request_db_seconds", "Vrijeme SQL upita po zahtjevu", "db_time"),
+    )
+    routes = sorted(metrics.routes.items(), key=lambda item: (item[0][1], item[0][0]))
+    lines = []
+    for name, help_text, attribute in histograms:
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+        for (method, path), route in routes:
+            labels = f'method="{method}",route="{_label(path)}"'
+            _prometheus_histogram(lines, name, labels, getattr(route, attribute).snapshot())
+
+    lines += ["# HELP zencore_http_request_errors_total Odgovori 5xx", "# TYPE zencore_http_request_errors_total counter"]
+    for (method, path), route in routes:
+        lines.append(f'zencore_http_request_errors_total{{method="{method}",route="{_label(path)}"}} {route.errors.value}')
+
+    if pool_metrics:
+        lines += ["# HELP zencore_db_pool_wait_seconds Čekanje na konekciju iz poola", "# TYPE zencore_db_pool_wait_seconds histogram"]
+        for pool, pool_metric in pool_metrics.items():
+            _prometheus_histogram(lines, "zencore_db_pool_wait_seconds", f'pool="{pool}"', pool_metric.wait_time.snapshot())
+        lines += ["# HELP zencore_db_pool_checkouts_total Preuzete konekcije", "# TYPE zencore_db_pool_checkouts_total counter"]
+        for pool, pool_metric in pool_metrics.items():
+            lines.append(f'zencore_db_pool_checkouts_total{{pool="{pool}"}} {pool_metric.checkouts.value}')
+
+    if password_hasher is not None:
+        lines += [
+            "# HELP zencore_password_hash_queued Provjere lozinki koje čekaju slobodan thread",
+            "# TYPE zencore_password_hash_queued gauge",
+            f"zencore_password_hash_queued {password_hasher.queued}",
+            "# HELP zencore_password_hash_in_flight Provjere lozinki u izvođenju",
+            "# TYPE zencore_password_hash_in_flight gauge",
+            f"zencore_password_hash_in_flight {password_hasher.in_flight}",
+            "# HELP zencore_password_hash_rejected_total Odbijene provjere (pun red, 503)",
+            "# TYPE zencore_password_hash_rejected_total counter",
+            f"zencore_password_hash_rejected_total {password_hasher.rejected.value}",
+            "# HELP zencore_password_rehashed_total Hashevi obnovljeni pri prijavi",
+            "# TYPE zencore_password_rehashed_total counter",
+            f"zencore_password_rehashed_total {password_hasher.rehashed.value}",
+        ]
+        for name, help_text, histogram in (
+            ("zencore_password_hash_wait_seconds", "Čekanje u redu za hashiranje", password_hasher.wait_time),
+            ("zencore_password_hash_seconds", "Trajanje jednog bcrypt hasha", password_hasher.hash_time),
+        ):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+            _prometheus_histogram(lines, name, "", histogram.snapshot())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,124 @@
+import logging
+import math
+import os
+from typing import Optional
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+CGROUP_ROOT = "/sys/fs/cgroup"
+
+# cgroup v1 bez limita memorije vraća ogroman broj umjesto "max"
+UNLIMITED_MEMORY = 1 << 60
+
+
+def _read(path: str) -> Optional[str]:
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def cpu_limit(root: str = CGROUP_ROOT) -> float:
+    """Jezgre dostupne procesu: cgroup kvota kontejnera, inače CPU affinity"""
+    try:
+        cpus = float(len(os.sched_getaffinity(0)))
+    except AttributeError:
+        cpus = float(os.cpu_count() or 1)
+
+    quota = None
+    cpu_max = _read(os.path.join(root, "cpu.max"))  # cgroup v2: "<kvota> <period>" ili "max <period>"
+    if cpu_max and not cpu_max.startswith("max"):
+        limit, period = cpu_max.split()
+        quota = int(limit) / int(period)
+    else:
+        limit = _read(os.path.join(root, "cpu", "cpu.cfs_quota_us"))
+        period = _read(os.path.join(root, "cpu", "cpu.cfs_period_us"))
+        if limit and period and int(limit) > 0:
+            quota = int(limit) / int(period)
+    return min(cpus, quota) if quota else cpus
+
+
+def memory_limit(root: str = CGROUP_ROOT) -> Optional[int]:
+    """Limit memorije kontejnera u bajtovima, None ako ga nema"""
+    value = _read(os.path.join(root, "memory.max")) or _read(os.path.join(root, "memory", "memory.limit_in_bytes"))
+    if not value or value == "max" or int(value) >= UNLIMITED_MEMORY:
+        return None
+    return int(value)
+
+
+def worker_count(cpus: float, memory: Optional[int], worker_memory_mb: int) -> int:
+    """Jedan async worker po jezgri, koliko stane u limit memorije"""
+    workers = max(1, math.ceil(cpus))
+    if memory and worker_memory_mb:
+        workers = min(workers, max(1, memory // (worker_memory_mb * 1024 * 1024)))
+    return workers
+
+
+def _post_fork(server, worker) -> None:
+    # Konekcije iz mastera (migracije, preload) ne smiju se dijeliti između procesa
+    from .database import async_engine, engine
+
+    engine.dispose(close=False)
+    async_engine.sync_engine.dispose(close=False)
+
+
+def gunicorn_options(port: int, workers: int) -> dict:
+    return {
+        "bind": f"0.0.0.0:{port}",
+        "workers": workers,
+        # uvloop i httptools (uvicorn[standard]) biraju se automatski
+        "worker_class": "uvicorn.workers.UvicornWorker",
+        # app.main se importa jednom u masteru, workeri ga dobivaju forkom
+        "preload_app": True,
+        "max_requests": settings.web_max_requests,
+        "max_requests_jitter": settings.web_max_requests_jitter,
+        "timeout": settings.web_timeout,
+        "graceful_timeout": settings.web_graceful_timeout,
+        "keepalive": settings.web_keepalive,
+        "backlog": settings.web_backlog,
+        "forwarded_allow_ips": "*",
+        "post_fork": _post_fork,
+        "loglevel": "info",
+    }
+
+
+def serve(port: int) -> None:
+    """Produkcijski server: gunicorn master s uvicorn workerima.
+
+    Broj workera je WEB_CONCURRENCY ili jedan po jezgri iz cgroup kvote
+    kontejnera, ograničen limitom memorije. Worker se nakon
+    WEB_MAX_REQUESTS zahtjeva (uz jitter) zamjenjuje novim bez prekida.
+    Bez gunicorna (Windows) pokreće se jedan uvicorn proces.
+    """
+    cpus, memory = cpu_limit(), memory_limit()
+    workers = settings.web_concurrency or worker_count(cpus, memory, settings.web_worker_memory_mb)
+    logger.info(
+        "Server: %s workera (CPU %.2f, memorija %s)",
+        workers, cpus, f"{memory // (1024 * 1024)} MB" if memory else "bez limita",
+    )
+
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        import uvicorn
+
+        logger.warning("gunicorn nije dostupan, pokreće se jedan uvicorn proces")
+        uvicorn.run(
+            "app.main:app", host="0.0.0.0", port=port, log_level="info",
+            timeout_keep_alive=settings.web_keepalive, backlog=settings.web_backlog,
+        )
+        return
+
+    class Application(BaseApplication):
+        def load_config(self):
+            for key, value in gunicorn_options(port, workers).items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from app.main import app
+
+            return app
+
+    Application().run()
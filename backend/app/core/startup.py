@@ -0,0 +1,108 @@
+import logging
+import os
+import time
+from contextlib import ExitStack, contextmanager
+from typing import Iterator
+from sqlalchemy import func, inspect, select
+from .config import settings
+from .database import Base, SessionLocal, advisory_lock, engine
+
+logger = logging.getLogger(__name__)
+
+# Ključ advisory locka: migracije izvodi samo jedan proces/replika
+MIGRATION_LOCK_KEY = 7_201_017
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class StartupTimer:
+    """Trajanje faza pokretanja, ispisuje se kao jedan redak"""
+
+    def __init__(self):
+        self.phases: list[tuple[str, float]] = []
+        self.started = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start))
+
+    def summary(self) -> str:
+        parts = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in self.phases)
+        return f"{parts} (ukupno {time.perf_counter() - self.started:.2f}s)"
+
+
+def alembic_config():
+    from alembic.config import Config
+
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+    # ConfigParser interpolacija: % u lozinki mora biti udvostručen
+    config.set_main_option("sqlalchemy.url", settings.database_url.replace("%", "%%"))
+    # env.py ne smije pregaziti logging procesa
+    config.attributes["configure_logger"] = False
+    return config
+
+
+def _backfill_derived_tables(bind) -> None:
+    """Puni salde i dnevne zbrojeve ako postoji knjiga, a oni su prazni (baza bez migracija)"""
+    from ..models import Consumption, Receipt, StockBalance
+    from ..services.ledger_rollup_service import LedgerRollupService
+    from ..services.stock_balance_service import StockBalanceService
+
+    db = SessionLocal(bind=bind)
+    try:
+        has_ledger = db.scalar(select(func.count()).select_from(Receipt)) or db.scalar(
+            select(func.count()).select_from(Consumption)
+        )
+        if has_ledger and not db.scalar(select(func.count()).select_from(StockBalance)):
+            StockBalanceService.rebuild(db)
+            LedgerRollupService.rebuild(db)
+    finally:
+        db.close()
+
+
+def migrate(timer: StartupTimer, bind=None) -> str:
+    """Dovodi shemu na zadnju verziju; istovremeni pozivi čekaju na lock.
+
+    Baza bez alembic_version (nova ili kreirana s create_all) dobiva tablice
+    iz modela i označava se zadnjom revizijom; ostale se nadograđuju s
+    `alembic upgrade head`. Vraća "created" ili "upgraded".
+    """
+    from alembic import command
+    from .. import models  # noqa: F401 - registrira sve tablice u Base.metadata
+
+    bind = bind or engine
+    config = alembic_config()
+    with ExitStack() as stack:
+        with timer.phase("lock"):
+            stack.enter_context(advisory_lock(MIGRATION_LOCK_KEY, bind=bind, wait=True))
+
+        if not inspect(bind).has_table("alembic_version"):
+            with timer.phase("create_all"), bind.begin() as connection:
+                Base.metadata.create_all(bind=connection)
+                config.attributes["connection"] = connection
+                command.stamp(config, "head")
+            with timer.phase("backfill"):
+                _backfill_derived_tables(bind)
+            return "created"
+
+        with timer.phase("migrations"), bind.begin() as connection:
+            config.attributes["connection"] = connection
+            command.upgrade(config, "head")
+        return "upgraded"
+
+
+def prepare_database(init: bool = None) -> StartupTimer:
+    """Migracije (i opcionalno testni podaci) prije pokretanja API workera"""
+    timer = StartupTimer()
+    result = migrate(timer)
+    if init if init is not None else settings.init_db:
+        with timer.phase("init_db"):
+            from init_db import init_db
+            init_db()
+    logger.info("Baza spremna (%s): %s", result, timer.summary())
+    return timer
@@ -1,9 +1,14 @@
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+
+IMPORT_STARTED_AT = time.perf_counter()
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-import os
-import subprocess
-from .core.database import engine
-from .models import Base
+from .core.pagination import PAGINATION_HEADERS
+from .core.request_metrics import RequestMetricsMiddleware
 from .api import (
     auth_router,
     materials_router,
@@ -12,58 +17,71 @@ from .api import (
     purchase_orders_router,
     receipts_router,
     consumptions_router,
-    dashboard_router
+    dashboard_router,
+    monitoring_router,
+    reports_router
 )
 
-# Pokreni migracije ako je potrebno
-def run_migrations():
-    try:
-        subprocess.run(["alembic", "upgrade", "head"], check=True)
-        print("✅ Migracije uspješno pokrenute")
-    except Exception as e:
-        print(f"⚠️ Greška pri migracijama: {e}")
-
-# Inicijaliziraj bazu ako je potrebno
-def init_database():
-    try:
-        from .init_db import init_db
-        init_db()
-        print("✅ Baza podataka inicijalizirana")
-    except Exception as e:
-        print(f"⚠️ Greška pri inicijalizaciji baze: {e}")
-
-# Kreiraj tablice i pokreni migracije
-Base.metadata.create_all(bind=engine)
-run_migrations()
-
-# Inicijaliziraj bazu ako je postavljena varijabla
-if os.getenv("INIT_DB", "false").lower() == "true":
-    init_database()
-
-app = FastAPI(
-    title="ZenCore API",
-    description="Sustav za materijalno knjigovodstvo",
-    version="1.0.0"
-)
+IMPORTED_AT = time.perf_counter()
+IMPORT_PID = os.getpid()
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if os.getpid() != IMPORT_PID:
+        # gunicorn preload: app je importan u masteru, worker je samo fork
+        logger.info(
+            "Worker %s spreman (fork mastera %s, import %.2fs jednom prije forka)",
+            os.getpid(), IMPORT_PID, IMPORTED_AT - IMPORT_STARTED_AT,
+        )
+        yield
+        return
+    logger.info(
+        "Worker %s spreman: import %.2fs, do pokretanja %.2fs",
+        os.getpid(), IMPORTED_AT - IMPORT_STARTED_AT, time.perf_counter() - IMPORT_STARTED_AT,
+    )
+    yield
+
+
+def create_app() -> FastAPI:
+    """Kreira aplikaciju bez DDL-a; shemu priprema start.py / migrate.py prije workera"""
+    app = FastAPI(
+        title="ZenCore API",
+        description="Sustav za materijalno knjigovodstvo",
+        version="1.0.0",
+        lifespan=lifespan,
+    )
+
+    # CORS middleware
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],  # U produkciji postavi specifične domene
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=PAGINATION_HEADERS,
+    )
+    # Trajanje i SQL upiti po ruti (/monitoring/metrics), log sporih zahtjeva
+    app.add_middleware(RequestMetricsMiddleware)
+
+    # Uključi routere
+    app.include_router(auth_router)
+    app.include_router(materials_router)
+    app.include_router(vendors_router)
+    app.include_router(offers_router)
+    app.include_router(purchase_orders_router)
+    app.include_router(receipts_router)
+    app.include_router(consumptions_router)
+    app.include_router(dashboard_router)
+    app.include_router(monitoring_router)
+    app.include_router(reports_router)
+
+    return app
 
-# CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # U produkciji postavi specifične domene
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
 
-# Uključi routere
-app.include_router(auth_router)
-app.include_router(materials_router)
-app.include_router(vendors_router)
-app.include_router(offers_router)
-app.include_router(purchase_orders_router)
-app.include_router(receipts_router)
-app.include_router(consumptions_router)
-app.include_router(dashboard_router)
+app = create_app()
 
 
 @app.get("/")
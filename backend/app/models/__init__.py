@@ -1,3 +1,4 @@
+from ..core.database import Base
 from .user import User
 from .material import Material
 from .vendor import Vendor
@@ -5,13 +6,30 @@ from .offer import Offer
 from .purchase_order import PurchaseOrder
 from .receipt import Receipt
 from .consumption import Consumption
+from .stock_balance import StockBalance
+from .stock_snapshot import StockSnapshot
+from .stock_alert_state import StockAlertState
+from .erp_sync_state import ErpSyncState
+from .erp_record_hash import ErpRecordHash
+from .demand_forecast import DemandForecast
+from .ledger_daily_rollup import LedgerDailyRollup
+from .ledger_category_rollup import LedgerCategoryRollup
 
 __all__ = [
+    "Base",
     "User",
     "Material", 
     "Vendor",
     "Offer",
     "PurchaseOrder",
     "Receipt",
-    "Consumption"
+    "Consumption",
+    "StockBalance",
+    "StockSnapshot",
+    "StockAlertState",
+    "ErpSyncState",
+    "ErpRecordHash",
+    "DemandForecast",
+    "LedgerDailyRollup",
+    "LedgerCategoryRollup"
 ] 
\ No newline at end of file
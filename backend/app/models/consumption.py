@@ -11,6 +11,7 @@ class Consumption(Base):
     consumption_number = Column(String, unique=True, index=True, nullable=False)
     material_id = Column(Integer, ForeignKey("materials.id"), nullable=False)
     quantity = Column(Float, nullable=False)
+    total_value = Column(Float)  # Vrijednost pri knjiženju (količina × cijena materijala)
     consumption_date = Column(DateTime, nullable=False)
     project = Column(String)  # Projekt/radni nalog
     cost_center = Column(String)  # Centar troškova
@@ -28,5 +29,6 @@ class Consumption(Base):
         Index('idx_consumption_number', 'consumption_number'),
         Index('idx_consumption_material', 'material_id'),
         Index('idx_consumption_date', 'consumption_date'),
+        Index('idx_consumption_date_id', 'consumption_date', 'id'),  # keyset paginacija po datumu
         Index('idx_consumption_project', 'project'),
     ) 
\ No newline at end of file
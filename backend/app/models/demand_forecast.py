@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from ..core.database import Base
+
+
+class DemandForecast(Base):
+    """Mjesečni forecast potrošnje materijala po metodi, s metrikama prilagodbe"""
+    __tablename__ = "demand_forecasts"
+
+    material_id = Column(Integer, ForeignKey("materials.id"), primary_key=True)
+    method = Column(String, primary_key=True)  # moving_average, exponential_smoothing, seasonal_naive
+    forecast = Column(Float, nullable=False)  # očekivana potrošnja sljedećeg mjeseca
+    mae = Column(Float)  # srednja apsolutna greška prognoze jedan mjesec unaprijed
+    rmse = Column(Float)
+    history_months = Column(Integer, nullable=False)
+    selected = Column(Boolean, nullable=False, default=False)  # metoda upisana u monthly_forecast
+    computed_at = Column(DateTime(timezone=True), server_default=func.now())  # zadnja promjena vrijednosti
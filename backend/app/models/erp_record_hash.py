@@ -0,0 +1,13 @@
+from sqlalchemy import Column, String, DateTime
+from sqlalchemy.sql import func
+from ..core.database import Base
+
+
+class ErpRecordHash(Base):
+    """Hash zadnje primijenjene verzije ERP zapisa (otkrivanje promjena)"""
+    __tablename__ = "erp_record_hashes"
+
+    entity = Column(String, primary_key=True)  # vendor, material, price
+    code = Column(String, primary_key=True)
+    hash = Column(String(32), nullable=False)
+    synced_at = Column(DateTime(timezone=True), server_default=func.now())
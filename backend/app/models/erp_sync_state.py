@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+from ..core.database import Base
+
+
+class ErpSyncState(Base):
+    """Stanje sinkronizacije s ERP-om (watermark za nastavak), po feedu"""
+    __tablename__ = "erp_sync_state"
+
+    feed = Column(String, primary_key=True)
+    watermark = Column(String)  # zadnji obrađeni modified_at iz ERP-a
+    last_status = Column(String)  # success, partial, error
+    rows_seen = Column(Integer, default=0)
+    rows_changed = Column(Integer, default=0)
+    started_at = Column(DateTime(timezone=True))
+    finished_at = Column(DateTime(timezone=True))
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, String, Float, Date, DateTime
+from sqlalchemy.sql import func
+from ..core.database import Base
+
+
+class LedgerCategoryRollup(Base):
+    """Dnevni zbroj prijema i utrošaka po kategoriji (kategorija materijala pri knjiženju)"""
+    __tablename__ = "ledger_category_rollups"
+
+    day = Column(Date, primary_key=True)
+    category = Column(String, primary_key=True)  # vrijednost kategorije, npr. "adaptogen"
+    received_quantity = Column(Float, nullable=False, default=0.0, server_default="0")
+    received_value = Column(Float, nullable=False, default=0.0, server_default="0")
+    consumed_quantity = Column(Float, nullable=False, default=0.0, server_default="0")
+    consumed_value = Column(Float, nullable=False, default=0.0, server_default="0")
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
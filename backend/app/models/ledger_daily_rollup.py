@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, Float, Date, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from ..core.database import Base
+
+
+class LedgerDailyRollup(Base):
+    """Dnevni zbroj prijema i utrošaka po materijalu, održava se pri svakom knjiženju"""
+    __tablename__ = "ledger_daily_rollups"
+
+    material_id = Column(Integer, ForeignKey("materials.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    received_quantity = Column(Float, nullable=False, default=0.0, server_default="0")
+    received_value = Column(Float, nullable=False, default=0.0, server_default="0")  # zbroj total_amount prijema
+    consumed_quantity = Column(Float, nullable=False, default=0.0, server_default="0")
+    consumed_value = Column(Float, nullable=False, default=0.0, server_default="0")  # po cijeni materijala pri knjiženju
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    # Indeksi
+    __table_args__ = (
+        Index('idx_ledger_rollup_day', 'day'),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Text, DateTime, Index, Boolean, Date, Enum
+from sqlalchemy import Column, Integer, String, Float, Text, DateTime, Index, Boolean, Date, Enum, ForeignKey, DDL, event
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -89,7 +89,7 @@ class Material(Base):
     unit_price = Column(Float, default=0.0)
     
     # Dobavljač
-    vendor_id = Column(Integer, nullable=True)
+    vendor_id = Column(Integer, ForeignKey("vendors.id"), nullable=True)
     
     # COA / Certifikat analize
     has_coa = Column(Boolean, default=False)
@@ -137,6 +137,7 @@ class Material(Base):
     purchase_orders = relationship("PurchaseOrder", back_populates="material")
     receipts = relationship("Receipt", back_populates="material")
     consumptions = relationship("Consumption", back_populates="material")
+    stock_balance = relationship("StockBalance", back_populates="material", uselist=False)
 
     # Indeksi za optimizaciju
     __table_args__ = (
@@ -147,4 +148,53 @@ class Material(Base):
         Index('idx_material_active', 'is_active'),
         Index('idx_material_coa', 'has_coa'),
         Index('idx_material_regulatory', 'regulatory_status'),
-    ) 
\ No newline at end of file
+    )
+
+
+# Pretraživanje na PostgreSQL-u: jedini izvor DDL-a, izvodi ga migracija 0005,
+# a za baze kreirane kroz create_all listener ispod. Stupci nisu mapirani na
+# model; čita ih MaterialSearch.
+MATERIAL_SEARCH_DDL = (
+    # Mala slova i folding hrvatskih znakova (č/ć -> c, š -> s, ž -> z, đ -> d)
+    """
+    CREATE OR REPLACE FUNCTION zc_fold(value text) RETURNS text
+    LANGUAGE sql IMMUTABLE PARALLEL SAFE
+    AS $$ SELECT translate(lower(value), 'čćšžđČĆŠŽĐ', 'ccszdccszd') $$
+    """,
+    # Težine: kod i naziv (A), sastojak i opis usluge (B), opis (C)
+    """
+    ALTER TABLE materials ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', zc_fold(coalesce(code, ''))), 'A') ||
+        setweight(to_tsvector('simple', zc_fold(coalesce(name, ''))), 'A') ||
+        setweight(to_tsvector('simple', zc_fold(coalesce(material_component, '') || ' ' || coalesce(service_description, ''))), 'B') ||
+        setweight(to_tsvector('simple', zc_fold(coalesce(description, ''))), 'C')
+    ) STORED
+    """,
+    """
+    ALTER TABLE materials ADD COLUMN IF NOT EXISTS search_text text
+    GENERATED ALWAYS AS (
+        zc_fold(
+            coalesce(code, '') || ' ' || coalesce(name, '') || ' ' || coalesce(description, '') || ' ' ||
+            coalesce(material_component, '') || ' ' || coalesce(service_description, '')
+        )
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_material_search_vector ON materials USING gin (search_vector)",
+    "CREATE INDEX IF NOT EXISTS idx_material_code_prefix ON materials (zc_fold(code) text_pattern_ops)",
+    # Trigram indeks za podnizove (LIKE '%...%'); bez pg_trgm pretraga radi, samo bez indeksa
+    """
+    DO $$
+    BEGIN
+        CREATE EXTENSION IF NOT EXISTS pg_trgm;
+        CREATE INDEX IF NOT EXISTS idx_material_search_trgm ON materials USING gin (search_text gin_trgm_ops);
+    EXCEPTION WHEN OTHERS THEN
+        RAISE NOTICE 'pg_trgm nije dostupan, trigram indeks nije kreiran';
+    END
+    $$
+    """,
+)
+
+for _statement in MATERIAL_SEARCH_DDL:
+    event.listen(Material.__table__, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+
@@ -35,4 +35,5 @@ class PurchaseOrder(Base):
         Index('idx_po_vendor', 'vendor_id'),
         Index('idx_po_status', 'status'),
         Index('idx_po_date', 'order_date'),
+        Index('idx_po_date_id', 'order_date', 'id'),  # keyset paginacija po datumu
     ) 
\ No newline at end of file
@@ -35,4 +35,5 @@ class Receipt(Base):
         Index('idx_receipt_po', 'purchase_order_id'),
         Index('idx_receipt_vendor', 'vendor_id'),
         Index('idx_receipt_date', 'receipt_date'),
+        Index('idx_receipt_date_id', 'receipt_date', 'id'),  # keyset paginacija po datumu
     ) 
\ No newline at end of file
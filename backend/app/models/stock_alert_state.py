@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from ..core.database import Base
+
+
+class StockAlertState(Base):
+    """Zadnji status zaliha za koji je poslana obavijest, po materijalu i kanalu"""
+    __tablename__ = "stock_alert_states"
+
+    material_id = Column(Integer, ForeignKey("materials.id"), primary_key=True)
+    channel = Column(String, primary_key=True)  # email, slack
+    stock_status = Column(String, nullable=False)  # normal, low, critical
+    current_stock = Column(Float)
+    notified_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from ..core.database import Base
+
+
+class StockBalance(Base):
+    """Tekući saldo zaliha po materijalu, održava se pri svakom knjiženju"""
+    __tablename__ = "stock_balances"
+
+    material_id = Column(Integer, ForeignKey("materials.id"), primary_key=True)
+    received_quantity = Column(Float, nullable=False, default=0.0, server_default="0")
+    consumed_quantity = Column(Float, nullable=False, default=0.0, server_default="0")
+    last_receipt_date = Column(DateTime)
+    last_consumption_date = Column(DateTime)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    # Relationships
+    material = relationship("Material", back_populates="stock_balance")
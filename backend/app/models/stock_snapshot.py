@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from ..core.database import Base
+
+
+class StockSnapshot(Base):
+    """Stanje zaliha aktivnog materijala na kraju dana (dnevni izvještaj)"""
+    __tablename__ = "stock_snapshots"
+
+    id = Column(Integer, primary_key=True, index=True)
+    snapshot_date = Column(Date, nullable=False)
+    material_id = Column(Integer, ForeignKey("materials.id"), nullable=False)
+    received_quantity = Column(Float, nullable=False, default=0.0)
+    consumed_quantity = Column(Float, nullable=False, default=0.0)
+    current_stock = Column(Float, nullable=False)
+    safety_stock = Column(Float)
+    recommended_po = Column(Float, nullable=False, default=0.0)
+    stock_status = Column(String, nullable=False)  # normal, low, critical
+    computed_at = Column(DateTime(timezone=True), nullable=False)  # kad je redak izračunat iz knjige
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Relationships
+    material = relationship("Material")
+
+    # Indeksi
+    __table_args__ = (
+        UniqueConstraint('snapshot_date', 'material_id', name='uq_snapshot_date_material'),
+        Index('idx_snapshot_material_date', 'material_id', 'snapshot_date'),
+    )
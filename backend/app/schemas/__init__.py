@@ -1,17 +1,31 @@
-from .user import UserCreate, UserUpdate, UserResponse, UserLogin, Token
-from .material import MaterialCreate, MaterialUpdate, MaterialResponse, MaterialWithCalculations
-from .vendor import VendorCreate, VendorUpdate, VendorResponse
+from .user import UserCreate, UserUpdate, UserResponse, UserSummary, UserLogin, Token
+from .material import (
+    MaterialCreate, MaterialUpdate, MaterialResponse, MaterialSummary, MaterialWithCalculations,
+    MaterialBulkUpdate, MaterialBulkItemResult, MaterialBulkResult,
+)
+from .vendor import VendorCreate, VendorUpdate, VendorResponse, VendorSummary
 from .offer import OfferCreate, OfferUpdate, OfferResponse
-from .purchase_order import PurchaseOrderCreate, PurchaseOrderUpdate, PurchaseOrderResponse
+from .purchase_order import PurchaseOrderCreate, PurchaseOrderUpdate, PurchaseOrderResponse, PurchaseOrderSummary
 from .receipt import ReceiptCreate, ReceiptUpdate, ReceiptResponse
 from .consumption import ConsumptionCreate, ConsumptionUpdate, ConsumptionResponse
+from .expand import ExpandableResponse
+from .ledger_import import ImportRowError, ImportResult
+from .stock_snapshot import StockSnapshotResponse, StockSnapshotDay
+from .demand_forecast import DemandForecastResponse
+from .erp_sync import ErpVendor, ErpMaterial, ErpPrice
 
 __all__ = [
-    "UserCreate", "UserUpdate", "UserResponse", "UserLogin", "Token",
-    "MaterialCreate", "MaterialUpdate", "MaterialResponse", "MaterialWithCalculations",
-    "VendorCreate", "VendorUpdate", "VendorResponse",
+    "UserCreate", "UserUpdate", "UserResponse", "UserSummary", "UserLogin", "Token",
+    "MaterialCreate", "MaterialUpdate", "MaterialResponse", "MaterialSummary", "MaterialWithCalculations",
+    "MaterialBulkUpdate", "MaterialBulkItemResult", "MaterialBulkResult",
+    "VendorCreate", "VendorUpdate", "VendorResponse", "VendorSummary",
     "OfferCreate", "OfferUpdate", "OfferResponse",
-    "PurchaseOrderCreate", "PurchaseOrderUpdate", "PurchaseOrderResponse",
+    "PurchaseOrderCreate", "PurchaseOrderUpdate", "PurchaseOrderResponse", "PurchaseOrderSummary",
     "ReceiptCreate", "ReceiptUpdate", "ReceiptResponse",
-    "ConsumptionCreate", "ConsumptionUpdate", "ConsumptionResponse"
+    "ConsumptionCreate", "ConsumptionUpdate", "ConsumptionResponse",
+    "ExpandableResponse",
+    "ImportRowError", "ImportResult",
+    "StockSnapshotResponse", "StockSnapshotDay",
+    "DemandForecastResponse",
+    "ErpVendor", "ErpMaterial", "ErpPrice"
 ] 
\ No newline at end of file
@@ -1,6 +1,9 @@
 from pydantic import BaseModel
 from typing import Optional
 from datetime import datetime
+from .expand import ExpandableResponse
+from .material import MaterialSummary
+from .user import UserSummary
 
 
 class ConsumptionBase(BaseModel):
@@ -27,11 +30,14 @@ class ConsumptionUpdate(BaseModel):
     notes: Optional[str] = None
 
 
-class ConsumptionResponse(ConsumptionBase):
+class ConsumptionResponse(ConsumptionBase, ExpandableResponse):
     id: int
+    total_value: Optional[float] = None
     created_by: Optional[int] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
+    material: Optional[MaterialSummary] = None
+    user: Optional[UserSummary] = None
 
     class Config:
         from_attributes = True 
\ No newline at end of file
@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+
+class DemandForecastResponse(BaseModel):
+    material_id: int
+    method: str
+    forecast: float
+    mae: Optional[float] = None
+    rmse: Optional[float] = None
+    history_months: int
+    selected: bool
+    computed_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,18 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+from .vendor import VendorCreate
+from .material import MaterialCreate
+
+
+class ErpVendor(VendorCreate):
+    is_active: bool = True
+
+
+class ErpMaterial(MaterialCreate):
+    vendor_code: Optional[str] = None  # ERP ne zna naše vendor_id
+    is_active: bool = True
+
+
+class ErpPrice(BaseModel):
+    material_code: str
+    unit_price: float = Field(ge=0)
@@ -0,0 +1,19 @@
+from pydantic import BaseModel, model_validator
+from sqlalchemy import inspect
+
+
+class ExpandableResponse(BaseModel):
+    """Response s ugniježđenim relacijama (?expand=).
+
+    Iz ORM objekta čitaju se samo učitani atributi, pa relacija koja nije
+    tražena ostaje null i nikad ne pokreće lazy load (upit po retku).
+    """
+
+    @model_validator(mode="before")
+    @classmethod
+    def _loaded_attributes(cls, data):
+        state = inspect(data, raiseerr=False)
+        if state is None or not hasattr(state, "unloaded"):
+            return data
+        unloaded = state.unloaded
+        return {name: getattr(data, name) for name in cls.model_fields if name not in unloaded and hasattr(data, name)}
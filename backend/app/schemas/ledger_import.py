@@ -0,0 +1,19 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+
+class ImportRowError(BaseModel):
+    row: int  # redak u datoteci (CSV uključuje header)
+    number: Optional[str] = None
+    errors: List[str]
+
+
+class ImportResult(BaseModel):
+    format: str
+    total_rows: int
+    inserted: int
+    failed: int
+    dry_run: bool = False
+    atomic: bool = False
+    errors: List[ImportRowError] = []
+    errors_truncated: bool = False
@@ -1,7 +1,9 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime, date
 from enum import Enum
+from .expand import ExpandableResponse
+from .vendor import VendorSummary
 
 
 class ItemType(str, Enum):
@@ -163,11 +165,45 @@ class MaterialUpdate(BaseModel):
     is_active: Optional[bool] = None
 
 
-class MaterialResponse(MaterialBase):
+class MaterialBulkUpdate(MaterialUpdate):
+    """Stavka skupne izmjene (PATCH /materials/bulk)"""
+    id: int
+
+
+class MaterialBulkItemResult(BaseModel):
+    index: int  # pozicija stavke u zahtjevu
+    id: Optional[int] = None
+    code: Optional[str] = None
+    status: str  # created, updated, failed ili skipped (atomic zahtjev s greškama)
+    errors: List[str] = []
+
+
+class MaterialBulkResult(BaseModel):
+    total: int
+    created: int = 0
+    updated: int = 0
+    failed: int = 0
+    atomic: bool = False
+    results: List[MaterialBulkItemResult] = []
+
+
+class MaterialSummary(BaseModel):
+    """Materijal ugniježđen u drugim odgovorima (?expand=material)"""
+    id: int
+    code: str
+    name: str
+    unit: str
+
+    class Config:
+        from_attributes = True
+
+
+class MaterialResponse(MaterialBase, ExpandableResponse):
     id: int
     is_active: bool
     created_at: datetime
     updated_at: Optional[datetime] = None
+    vendor: Optional[VendorSummary] = None
 
     class Config:
         from_attributes = True
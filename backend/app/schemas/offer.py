@@ -1,6 +1,9 @@
 from pydantic import BaseModel
 from typing import Optional
 from datetime import datetime
+from .expand import ExpandableResponse
+from .material import MaterialSummary
+from .vendor import VendorSummary
 
 
 class OfferBase(BaseModel):
@@ -30,11 +33,13 @@ class OfferUpdate(BaseModel):
     status: Optional[str] = None
 
 
-class OfferResponse(OfferBase):
+class OfferResponse(OfferBase, ExpandableResponse):
     id: int
     status: str
     created_at: datetime
     updated_at: Optional[datetime] = None
+    material: Optional[MaterialSummary] = None
+    vendor: Optional[VendorSummary] = None
 
     class Config:
         from_attributes = True 
\ No newline at end of file
@@ -1,6 +1,10 @@
 from pydantic import BaseModel
 from typing import Optional
 from datetime import datetime
+from .expand import ExpandableResponse
+from .material import MaterialSummary
+from .user import UserSummary
+from .vendor import VendorSummary
 
 
 class PurchaseOrderBase(BaseModel):
@@ -32,12 +36,25 @@ class PurchaseOrderUpdate(BaseModel):
     status: Optional[str] = None
 
 
-class PurchaseOrderResponse(PurchaseOrderBase):
+class PurchaseOrderSummary(BaseModel):
+    """Narudžba ugniježđena u drugim odgovorima (?expand=purchase_order)"""
+    id: int
+    po_number: str
+    status: str
+
+    class Config:
+        from_attributes = True
+
+
+class PurchaseOrderResponse(PurchaseOrderBase, ExpandableResponse):
     id: int
     status: str
     created_by: Optional[int] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
+    material: Optional[MaterialSummary] = None
+    vendor: Optional[VendorSummary] = None
+    user: Optional[UserSummary] = None
 
     class Config:
         from_attributes = True 
\ No newline at end of file
@@ -1,6 +1,11 @@
 from pydantic import BaseModel
 from typing import Optional
 from datetime import datetime
+from .expand import ExpandableResponse
+from .material import MaterialSummary
+from .purchase_order import PurchaseOrderSummary
+from .user import UserSummary
+from .vendor import VendorSummary
 
 
 class ReceiptBase(BaseModel):
@@ -33,11 +38,15 @@ class ReceiptUpdate(BaseModel):
     notes: Optional[str] = None
 
 
-class ReceiptResponse(ReceiptBase):
+class ReceiptResponse(ReceiptBase, ExpandableResponse):
     id: int
     created_by: Optional[int] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
+    material: Optional[MaterialSummary] = None
+    vendor: Optional[VendorSummary] = None
+    purchase_order: Optional[PurchaseOrderSummary] = None
+    user: Optional[UserSummary] = None
 
     class Config:
         from_attributes = True 
\ No newline at end of file
@@ -0,0 +1,24 @@
+from pydantic import BaseModel
+from typing import Dict, Optional
+from datetime import date, datetime
+
+
+class StockSnapshotResponse(BaseModel):
+    snapshot_date: date
+    material_id: int
+    received_quantity: float
+    consumed_quantity: float
+    current_stock: float
+    safety_stock: Optional[float] = None
+    recommended_po: float
+    stock_status: str
+    computed_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class StockSnapshotDay(BaseModel):
+    snapshot_date: date
+    total_materials: int
+    by_status: Dict[str, int]
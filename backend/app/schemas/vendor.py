@@ -26,6 +26,16 @@ class VendorUpdate(BaseModel):
     is_active: Optional[bool] = None
 
 
+class VendorSummary(BaseModel):
+    """Dobavljač ugniježđen u drugim odgovorima (?expand=vendor)"""
+    id: int
+    code: str
+    name: str
+
+    class Config:
+        from_attributes = True
+
+
 class VendorResponse(VendorBase):
     id: int
     is_active: bool
@@ -0,0 +1,393 @@
+import hashlib
+import json
+import time
+from datetime import datetime, timezone
+from typing import Iterator, NamedTuple, Optional
+import httpx
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import Float, String, bindparam, column, func, select, update, values
+from sqlalchemy.orm import Session
+from ..core.config import settings
+from ..core.database import advisory_lock, dialect_insert
+from ..models.material import Material, ItemType, Category, Form, RegulatoryStatus
+from ..models.vendor import Vendor
+from ..models.erp_record_hash import ErpRecordHash
+from ..models.erp_sync_state import ErpSyncState
+from ..schemas.erp_sync import ErpVendor, ErpMaterial, ErpPrice
+from .search_service import memory_index
+
+FEED = "erp"
+ERP_SYNC_LOCK_KEY = 7_201_012
+MAX_REPORTED_ERRORS = 100
+
+# Polja koja nisu dio zapisa (ne ulaze u hash)
+META_FIELDS = ("type", "modified_at")
+
+# Enum vrijednosti iz ERP-a (npr. "adaptogen") u enume modela
+MATERIAL_ENUMS = {"item_type": ItemType, "category": Category, "form": Form, "regulatory_status": RegulatoryStatus}
+
+# Početna zaliha se vodi lokalno kroz knjigu, ERP je ne mijenja; vendor_id se
+# određuje iz vendor_code
+MATERIAL_EXCLUDED_FIELDS = {"opening_stock", "vendor_code", "vendor_id"}
+
+
+class _Entity(NamedTuple):
+    schema: type
+    key: str
+
+
+# Redoslijed obrade unutar chunka: dobavljači prije materijala, materijali prije cijena
+ENTITIES = {
+    "vendor": _Entity(ErpVendor, "code"),
+    "material": _Entity(ErpMaterial, "code"),
+    "price": _Entity(ErpPrice, "material_code"),
+}
+
+
+class _Record(NamedTuple):
+    line: int
+    entity: str
+    item: BaseModel
+    data: dict
+    hash: str
+    modified_at: Optional[str]
+
+
+def record_hash(data: dict) -> str:
+    payload = json.dumps(data, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+def stream_feed(client: httpx.Client, url: str, since: Optional[str] = None) -> Iterator[tuple[int, str]]:
+    """Čita NDJSON feed redak po redak (cijeli odgovor nikad nije u memoriji)"""
+    params = {"since": since} if since else None
+    headers = {"Authorization": f"Bearer {settings.erp_api_token}"} if settings.erp_api_token else None
+    with client.stream("GET", url, params=params, headers=headers) as response:
+        response.raise_for_status()
+        for line_number, line in enumerate(response.iter_lines(), start=1):
+            if line.strip():
+                yield line_number, line
+
+
+class _SyncRun:
+    """Brojači jednog pokretanja"""
+
+    def __init__(self):
+        self.rows_seen = 0
+        self.changed = {entity: 0 for entity in ENTITIES}
+        self.unchanged = 0
+        self.failed = 0
+        self.errors: list[str] = []
+        self._latest: Optional[tuple[datetime, str]] = None
+        self._held: Optional[tuple[datetime, str]] = None
+
+    @staticmethod
+    def _timestamp(modified_at) -> Optional[tuple[datetime, str]]:
+        if not isinstance(modified_at, str):
+            return None
+        try:
+            value = datetime.fromisoformat(modified_at)
+        except ValueError:
+            return None
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value, modified_at
+
+    @property
+    def watermark(self) -> Optional[str]:
+        """Zadnji obrađeni modified_at, ali ne dalje od najranijeg odbijenog zapisa"""
+        if self._held is not None and (self._latest is None or self._held < self._latest):
+            return self._held[1]
+        return self._latest[1] if self._latest else None
+
+    def error(self, line: int, message: str) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(f"line {line}: {message}")
+
+    def advance(self, modified_at) -> None:
+        timestamp = self._timestamp(modified_at)
+        if timestamp is not None and (self._latest is None or timestamp[0] > self._latest[0]):
+            self._latest = timestamp
+
+    def reject(self, record: "_Record", message: str) -> None:
+        # Zapis s nepostojećom referencom (npr. dobavljač stiže kasnije) zadržava
+        # watermark na svom modified_at, pa ga sljedeći sync ponovno čita
+        self.error(record.line, message)
+        timestamp = self._timestamp(record.modified_at)
+        if timestamp is not None and (self._held is None or timestamp[0] < self._held[0]):
+            self._held = timestamp
+
+
+class ErpSyncService:
+    """Sinkronizacija dobavljača, materijala i cijena iz ERP-a.
+
+    Feed je NDJSON, redak po zapisu s poljem `type` (vendor, material, price)
+    i `modified_at`, poredan uzlazno po `modified_at`. Zapisi se obrađuju u
+    chunkovima: validacija, jedan upit za postojeće hasheve, upsert samo
+    promijenjenih zapisa i commit zajedno s watermarkom. Prekinuti sync
+    nastavlja od watermarka (`since`), a ponovljeni zapisi imaju isti hash pa
+    se ne upisuju ponovno. Watermark ne prelazi zapis odbijen zbog nepostojeće
+    reference, pa se taj zapis ponovno čita dok ga nije moguće primijeniti.
+    """
+
+    @staticmethod
+    def _state(db: Session) -> ErpSyncState:
+        state = db.get(ErpSyncState, FEED)
+        if state is None:
+            state = ErpSyncState(feed=FEED)
+            db.add(state)
+            db.flush()
+        return state
+
+    @staticmethod
+    def _parse(line_number: int, line: str, run: _SyncRun) -> Optional[_Record]:
+        try:
+            data = json.loads(line)
+        except json.JSONDecodeError as error:
+            run.error(line_number, f"Invalid JSON: {error.msg}")
+            return None
+        if not isinstance(data, dict) or data.get("type") not in ENTITIES:
+            run.error(line_number, "Row must be an object with type vendor, material or price")
+            return None
+        entity = data["type"]
+        modified_at = data.get("modified_at")
+        run.advance(modified_at)
+        try:
+            item = ENTITIES[entity].schema(**{key: value for key, value in data.items() if key not in META_FIELDS})
+        except ValidationError as error:
+            messages = [f"{'.'.join(str(part) for part in e['loc'])}: {e['msg']}" for e in error.errors()]
+            run.error(line_number, "; ".join(messages))
+            return None
+        # model_dump umjesto zastarjelog .dict() (wrapper s upozorenjem je spor za 100k+ redaka)
+        data = item.model_dump()
+        return _Record(line_number, entity, item, data, record_hash(data), modified_at)
+
+    @staticmethod
+    def _changed(db: Session, records: list[_Record], run: _SyncRun) -> dict[str, list[_Record]]:
+        """Zapisi čiji se hash razlikuje od zadnje primijenjene verzije, po entitetu"""
+        latest: dict[tuple[str, str], _Record] = {}
+        for record in records:
+            # Unutar chunka vrijedi zadnja verzija zapisa
+            latest[(record.entity, getattr(record.item, ENTITIES[record.entity].key))] = record
+
+        changed = {entity: [] for entity in ENTITIES}
+        for entity in ENTITIES:
+            codes = [code for (kind, code) in latest if kind == entity]
+            if not codes:
+                continue
+            known = dict(db.execute(
+                select(ErpRecordHash.code, ErpRecordHash.hash)
+                .where(ErpRecordHash.entity == entity, ErpRecordHash.code.in_(codes))
+            ).all())
+            for code in codes:
+                record = latest[(entity, code)]
+                if known.get(code) == record.hash:
+                    run.unchanged += 1
+                else:
+                    changed[entity].append(record)
+        run.unchanged += len(records) - len(latest)
+        return changed
+
+    @staticmethod
+    def _upsert(db: Session, model, values: list[dict], fields: list[str]) -> None:
+        statement = dialect_insert(db, model)
+        if statement is None:
+            for value in values:
+                existing = db.scalar(select(model).where(model.code == value["code"]))
+                if existing is None:
+                    db.add(model(**value))
+                else:
+                    for field in fields:
+                        setattr(existing, field, value[field])
+            return
+        statement = statement.on_conflict_do_update(
+            index_elements=["code"],
+            set_={**{field: statement.excluded[field] for field in fields}, "updated_at": func.now()},
+        )
+        db.execute(statement, values)
+
+    @staticmethod
+    def _apply_vendors(db: Session, records: list[_Record]) -> list[_Record]:
+        values = [record.data for record in records]
+        ErpSyncService._upsert(db, Vendor, values, [field for field in values[0] if field != "code"])
+        return records
+
+    @staticmethod
+    def _apply_materials(db: Session, records: list[_Record], run: _SyncRun) -> list[_Record]:
+        vendor_codes = {record.item.vendor_code for record in records if record.item.vendor_code}
+        vendor_ids = dict(db.execute(
+            select(Vendor.code, Vendor.id).where(Vendor.code.in_(vendor_codes))
+        ).all()) if vendor_codes else {}
+
+        applied, values = [], []
+        for record in records:
+            data = {key: value for key, value in record.data.items() if key not in MATERIAL_EXCLUDED_FIELDS}
+            data["vendor_id"] = None
+            if record.item.vendor_code:
+                if record.item.vendor_code not in vendor_ids:
+                    run.reject(record, f"vendor_code: {record.item.vendor_code} does not exist")
+                    continue
+                data["vendor_id"] = vendor_ids[record.item.vendor_code]
+            for field, enum in MATERIAL_ENUMS.items():
+                if data.get(field) is not None:
+                    data[field] = enum(data[field].value)
+            applied.append(record)
+            values.append(data)
+        if values:
+            ErpSyncService._upsert(db, Material, values, [field for field in values[0] if field != "code"])
+        return applied
+
+    @staticmethod
+    def _apply_prices(db: Session, records: list[_Record], run: _SyncRun) -> list[_Record]:
+        codes = [record.item.material_code for record in records]
+        existing = set(db.scalars(select(Material.code).where(Material.code.in_(codes))))
+        applied = []
+        for record in records:
+            if record.item.material_code in existing:
+                applied.append(record)
+            else:
+                run.reject(record, f"material_code: {record.item.material_code} does not exist")
+        if not applied:
+            return applied
+        if db.get_bind().dialect.name == "postgresql":
+            # Jedan UPDATE ... FROM (VALUES ...) za cijeli chunk
+            prices = values(
+                column("code", String), column("unit_price", Float), name="erp_prices"
+            ).data([(record.item.material_code, record.item.unit_price) for record in applied])
+            db.execute(
+                update(Material)
+                .where(Material.code == prices.c.code)
+                .values(unit_price=prices.c.unit_price, updated_at=func.now())
+                .execution_options(synchronize_session=False)
+            )
+        else:
+            # executemany na Core razini (ORM bulk UPDATE zahtijeva primarni ključ)
+            db.connection().execute(
+                update(Material)
+                .where(Material.code == bindparam("b_code"))
+                .values(unit_price=bindparam("b_price"), updated_at=func.now()),
+                [{"b_code": record.item.material_code, "b_price": record.item.unit_price} for record in applied],
+            )
+        return applied
+
+    @staticmethod
+    def _store_hashes(db: Session, records: list[_Record]) -> None:
+        now = datetime.now(timezone.utc)
+        values = [
+            {"entity": record.entity, "code": getattr(record.item, ENTITIES[record.entity].key),
+             "hash": record.hash, "synced_at": now}
+            for record in records
+        ]
+        statement = dialect_insert(db, ErpRecordHash)
+        if statement is None:
+            for value in values:
+                db.merge(ErpRecordHash(**value))
+            return
+        statement = statement.on_conflict_do_update(
+            index_elements=["entity", "code"],
+            set_={"hash": statement.excluded.hash, "synced_at": statement.excluded.synced_at},
+        )
+        db.execute(statement, values)
+
+    @staticmethod
+    def _process_chunk(db: Session, records: list[_Record], run: _SyncRun) -> None:
+        changed = ErpSyncService._changed(db, records, run)
+        applied = []
+        if changed["vendor"]:
+            applied += ErpSyncService._apply_vendors(db, changed["vendor"])
+        if changed["material"]:
+            applied += ErpSyncService._apply_materials(db, changed["material"], run)
+        if changed["price"]:
+            applied += ErpSyncService._apply_prices(db, changed["price"], run)
+        for record in applied:
+            run.changed[record.entity] += 1
+        if applied:
+            ErpSyncService._store_hashes(db, applied)
+
+    @staticmethod
+    def _commit(db: Session, run: _SyncRun, status: str) -> None:
+        state = ErpSyncService._state(db)
+        if run.watermark is not None:
+            state.watermark = run.watermark
+        state.last_status = status
+        state.rows_seen = run.rows_seen
+        state.rows_changed = sum(run.changed.values())
+        if status != "running":
+            state.finished_at = datetime.now(timezone.utc)
+        db.commit()
+        if run.changed["material"]:
+            # Upsert ne okida mapper evente koji osvježavaju memorijski indeks
+            memory_index.invalidate()
+
+    @staticmethod
+    def run(
+        db: Session,
+        url: Optional[str] = None,
+        full: bool = False,
+        chunk_size: Optional[int] = None,
+        time_budget: Optional[float] = None,
+        client: Optional[httpx.Client] = None,
+    ) -> dict:
+        """Sinkronizira feed od watermarka (full=True od početka), vraća sažetak"""
+        url = url or settings.erp_sync_url
+        if not url:
+            return {"status": "skipped", "message": "ERP_SYNC_URL is not configured"}
+        chunk_size = chunk_size or settings.erp_sync_chunk_size
+        time_budget = time_budget or settings.erp_sync_time_budget_seconds
+
+        with advisory_lock(ERP_SYNC_LOCK_KEY, db.get_bind()) as acquired:
+            if not acquired:
+                return {"status": "skipped", "message": "ERP sync already running"}
+
+            state = ErpSyncService._state(db)
+            since = None if full else state.watermark
+            state.started_at = datetime.now(timezone.utc)
+            state.last_status = "running"
+            db.commit()
+
+            run = _SyncRun()
+            started = time.monotonic()
+            status = "success"
+            own_client = client is None
+            client = client or httpx.Client(timeout=settings.erp_sync_timeout)
+            try:
+                chunk: list[_Record] = []
+                for line_number, line in stream_feed(client, url, since):
+                    run.rows_seen += 1
+                    record = ErpSyncService._parse(line_number, line, run)
+                    if record is not None:
+                        chunk.append(record)
+                    if len(chunk) >= chunk_size:
+                        ErpSyncService._process_chunk(db, chunk, run)
+                        ErpSyncService._commit(db, run, "running")
+                        chunk = []
+                        # Ostatak u sljedećem tasku, od upravo spremljenog watermarka
+                        if time.monotonic() - started > time_budget:
+                            status = "partial"
+                            break
+                else:
+                    if chunk:
+                        ErpSyncService._process_chunk(db, chunk, run)
+                ErpSyncService._commit(db, run, status)
+            except BaseException:
+                # Upisani chunkovi ostaju, watermark pokazuje dokle se stiglo
+                db.rollback()
+                ErpSyncService._state(db).last_status = "error"
+                db.commit()
+                raise
+            finally:
+                if own_client:
+                    client.close()
+
+        return {
+            "status": status,
+            "since": since,
+            "watermark": run.watermark or since,
+            "rows_seen": run.rows_seen,
+            "changed": run.changed,
+            "unchanged": run.unchanged,
+            "failed": run.failed,
+            "errors": run.errors,
+            "seconds": round(time.monotonic() - started, 2),
+        }
@@ -0,0 +1,236 @@
+import math
+from datetime import date, datetime, timezone
+from typing import NamedTuple, Optional
+from sqlalchemy import Integer, bindparam, cast, delete, extract, func, select, update
+from sqlalchemy.orm import Session
+from ..core.config import settings
+from ..core.database import dialect_insert, id_range_filter
+from ..models.consumption import Consumption
+from ..models.demand_forecast import DemandForecast
+from ..models.material import Material
+
+MOVING_AVERAGE = "moving_average"
+EXPONENTIAL_SMOOTHING = "exponential_smoothing"
+SEASONAL_NAIVE = "seasonal_naive"
+# Redoslijed je i prednost kod jednake greške
+METHODS = (MOVING_AVERAGE, EXPONENTIAL_SMOOTHING, SEASONAL_NAIVE)
+
+SEASON_MONTHS = 12
+
+# Vrijednosti forecasta koje se uspoređuju sa spremljenima
+FORECAST_VALUE_FIELDS = ("forecast", "mae", "rmse", "history_months", "selected")
+
+
+class ForecastFit(NamedTuple):
+    forecast: float
+    mae: Optional[float]
+    rmse: Optional[float]
+
+
+def month_index(year: int, month: int) -> int:
+    return year * 12 + month - 1
+
+
+def month_start(index: int) -> datetime:
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def moving_average(series: list[float], window: int) -> tuple[list, float]:
+    """Prognoze jedan korak unaprijed i prognoza sljedećeg mjeseca"""
+    predictions = [None] * len(series)
+    total = sum(series[:window])
+    for t in range(window, len(series)):
+        predictions[t] = total / window
+        total += series[t] - series[t - window]
+    return predictions, sum(series[-window:]) / min(window, len(series))
+
+
+def exponential_smoothing(series: list[float], alpha: float) -> tuple[list, float]:
+    predictions = [None] * len(series)
+    level = series[0]
+    for t in range(1, len(series)):
+        predictions[t] = level
+        level = alpha * series[t] + (1 - alpha) * level
+    return predictions, level
+
+
+def seasonal_naive(series: list[float], season: int = SEASON_MONTHS) -> Optional[tuple[list, float]]:
+    """Isti mjesec prošle godine; treba više od jedne sezone povijesti"""
+    if len(series) <= season:
+        return None
+    predictions = [None] * len(series)
+    for t in range(season, len(series)):
+        predictions[t] = series[t - season]
+    return predictions, series[len(series) - season]
+
+
+def fit_methods(series: list[float], window: int, alpha: float) -> dict[str, ForecastFit]:
+    """Prognoze svih metoda s greškama na zajedničkom razdoblju povijesti"""
+    results = {
+        MOVING_AVERAGE: moving_average(series, window),
+        EXPONENTIAL_SMOOTHING: exponential_smoothing(series, alpha),
+    }
+    seasonal = seasonal_naive(series)
+    if seasonal is not None:
+        results[SEASONAL_NAIVE] = seasonal
+
+    start = SEASON_MONTHS if seasonal is not None else window
+    fits = {}
+    for method, (predictions, forecast) in results.items():
+        errors = [actual - predicted for actual, predicted in zip(series[start:], predictions[start:])]
+        mae = rmse = None
+        if errors:
+            mae = sum(map(abs, errors)) / len(errors)
+            rmse = math.sqrt(sum(error * error for error in errors) / len(errors))
+        fits[method] = ForecastFit(max(0.0, forecast), mae, rmse)
+    return fits
+
+
+def select_method(fits: dict[str, ForecastFit]) -> str:
+    """Metoda s najmanjim MAE"""
+    return min(fits, key=lambda method: (fits[method].mae is None, fits[method].mae or 0.0, METHODS.index(method)))
+
+
+class ForecastService:
+    """Forecast mjesečne potrošnje iz knjige utrošaka.
+
+    Potrošnja se jednim GROUP BY upitom agregira po materijalu i mjesecu za
+    zadnjih N završenih mjeseci, metode se računaju u memoriji nad mjesečnim
+    nizovima, a upisuju se samo promijenjeni rezultati. Materijal dobiva forecast tek s
+    dovoljno povijesti; ostali zadržavaju ručno unesen monthly_forecast.
+    """
+
+    @staticmethod
+    def monthly_consumption(
+        db: Session, first_month: int, last_month: int, id_range: Optional[tuple] = None
+    ) -> dict[int, dict[int, float]]:
+        """Potrošnja po materijalu i indeksu mjeseca"""
+        month = cast(
+            extract("year", Consumption.consumption_date) * 12 + extract("month", Consumption.consumption_date) - 1,
+            Integer,
+        )
+        # Core upit bez ORM obrade redaka (red po materijalu i mjesecu)
+        rows = db.connection().execute(
+            select(Consumption.material_id, month, func.sum(Consumption.quantity))
+            .where(
+                Consumption.consumption_date >= month_start(first_month),
+                Consumption.consumption_date < month_start(last_month + 1),
+                *id_range_filter(Consumption.material_id, id_range),
+            )
+            .group_by(Consumption.material_id, month)
+        ).all()
+        history: dict[int, dict[int, float]] = {}
+        for material_id, index, quantity in rows:
+            history.setdefault(material_id, {})[index] = quantity or 0.0
+        return history
+
+    @staticmethod
+    def _existing(db: Session, id_range: Optional[tuple] = None) -> dict[tuple, tuple]:
+        """Spremljeni forecasti po (materijal, metoda)"""
+        rows = db.connection().execute(select(
+            DemandForecast.material_id, DemandForecast.method, DemandForecast.forecast, DemandForecast.mae,
+            DemandForecast.rmse, DemandForecast.history_months, DemandForecast.selected,
+        ).where(*id_range_filter(DemandForecast.material_id, id_range)))
+        return {(row[0], row[1]): tuple(row[2:]) for row in rows}
+
+    @staticmethod
+    def _store(db: Session, records: list[dict], stale: list[tuple]) -> None:
+        """Upisuje promijenjene forecaste i briše one bez povijesti"""
+        if stale:
+            db.execute(
+                delete(DemandForecast).where(
+                    DemandForecast.material_id == bindparam("stale_material_id"),
+                    DemandForecast.method == bindparam("stale_method"),
+                ).execution_options(synchronize_session=False),
+                [{"stale_material_id": material_id, "stale_method": method} for material_id, method in stale],
+            )
+        if not records:
+            return
+        statement = dialect_insert(db, DemandForecast)
+        if statement is None:
+            for record in records:
+                db.merge(DemandForecast(**record))
+            return
+        statement = statement.on_conflict_do_update(
+            index_elements=["material_id", "method"],
+            set_={field: statement.excluded[field] for field in FORECAST_VALUE_FIELDS + ("computed_at",)},
+        )
+        db.execute(statement, records)
+
+    @staticmethod
+    def run(db: Session, today: Optional[date] = None, id_range: Optional[tuple] = None) -> dict:
+        """Računa forecaste za sve materijale s poviješću potrošnje, vraća sažetak.
+
+        Upisuju se samo forecasti koji se razlikuju od spremljenih, pa ponovni
+        izračun unutar istog mjeseca ne piše ništa. S id_range računa samo
+        materijale iz raspona (dio paralelnog izračuna).
+        """
+        today = today or datetime.utcnow().date()
+        last_month = month_index(today.year, today.month) - 1  # tekući mjesec nije završen
+        first_month = last_month - settings.forecast_history_months + 1
+        window = settings.forecast_moving_average_window
+        alpha = settings.forecast_smoothing_alpha
+        min_history = max(settings.forecast_min_history_months, window + 1)
+        now = datetime.now(timezone.utc)
+
+        history = ForecastService.monthly_consumption(db, first_month, last_month, id_range)
+        existing = ForecastService._existing(db, id_range)
+        changed, skipped = [], 0
+        selected_counts = {method: 0 for method in METHODS}
+        for material_id, months in history.items():
+            # Niz počinje prvim mjesecom s potrošnjom; mjeseci bez potrošnje su 0
+            series = [months.get(index, 0.0) for index in range(min(months), last_month + 1)]
+            if len(series) < min_history:
+                skipped += 1
+                continue
+            fits = fit_methods(series, window, alpha)
+            best = select_method(fits)
+            selected_counts[best] += 1
+            for method, fit in fits.items():
+                values = (
+                    round(fit.forecast, 3),
+                    round(fit.mae, 3) if fit.mae is not None else None,
+                    round(fit.rmse, 3) if fit.rmse is not None else None,
+                    len(series),
+                    method == best,
+                )
+                if existing.pop((material_id, method), None) != values:
+                    changed.append({
+                        "material_id": material_id, "method": method,
+                        **dict(zip(FORECAST_VALUE_FIELDS, values)), "computed_at": now,
+                    })
+
+        # Što je ostalo u existing više nema dovoljno povijesti
+        ForecastService._store(db, changed, list(existing))
+
+        updated = 0
+        if settings.forecast_update_materials and any(record["selected"] for record in changed):
+            # Mijenjaju se samo materijali kojima se forecast promijenio (updated_at
+            # pokreće ponovni izračun u dnevnom snimku)
+            forecast = (
+                select(DemandForecast.forecast)
+                .where(DemandForecast.material_id == Material.id, DemandForecast.selected == True)
+                .scalar_subquery()
+            )
+            updated = db.execute(
+                update(Material)
+                .where(
+                    Material.id.in_(select(DemandForecast.material_id).where(DemandForecast.selected == True)),
+                    *id_range_filter(Material.id, id_range),
+                    Material.monthly_forecast.is_distinct_from(forecast),
+                )
+                .values(monthly_forecast=forecast)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+        db.commit()
+
+        return {
+            "history_from": month_start(first_month).date().isoformat(),
+            "history_to": month_start(last_month).date().isoformat(),
+            "forecasted_materials": sum(selected_counts.values()),
+            "skipped_materials": skipped,
+            "selected_methods": selected_counts,
+            "changed_forecasts": len(changed),
+            "removed_forecasts": len(existing),
+            "updated_materials": updated,
+        }
@@ -0,0 +1,242 @@
+import csv
+import io
+import json
+from typing import BinaryIO, Iterator, NamedTuple, Optional
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from ..core.database import dialect_insert
+from ..models.material import Material
+from ..models.vendor import Vendor
+from ..models.purchase_order import PurchaseOrder
+from ..models.receipt import Receipt
+from ..models.consumption import Consumption
+from ..schemas.receipt import ReceiptCreate
+from ..schemas.consumption import ConsumptionCreate
+from ..schemas.ledger_import import ImportRowError, ImportResult
+from .ledger_rollup_service import LedgerRollupService
+from .stock_balance_service import StockBalanceService, LedgerEntry
+
+# Redaka po chunku (validacija, provjera duplikata i INSERT)
+IMPORT_CHUNK_SIZE = 1000
+# Najviše grešaka u odgovoru; ukupan broj je u `failed`
+MAX_REPORTED_ERRORS = 1000
+
+IMPORT_FORMATS = ("csv", "jsonl")
+
+
+class _ImportSpec(NamedTuple):
+    model: type
+    schema: type
+    number_field: str
+    date_field: str
+    value_field: str  # vrijednost stavke za dnevne zbrojeve
+    references: dict  # polje -> model na koji mora postojati
+
+
+IMPORTS = {
+    "receipt": _ImportSpec(
+        Receipt, ReceiptCreate, "receipt_number", "receipt_date", "total_amount",
+        {"material_id": Material, "vendor_id": Vendor, "purchase_order_id": PurchaseOrder},
+    ),
+    "consumption": _ImportSpec(
+        Consumption, ConsumptionCreate, "consumption_number", "consumption_date", "total_value",
+        {"material_id": Material},
+    ),
+}
+
+
+class _Row(NamedTuple):
+    line: int
+    data: Optional[dict]
+    error: Optional[str] = None
+
+
+def detect_format(filename: Optional[str], content_type: Optional[str], requested: Optional[str] = None) -> str:
+    """Format uvoza iz parametra, ekstenzije ili content-typea"""
+    if requested:
+        if requested not in IMPORT_FORMATS:
+            raise ValueError(f"Unsupported format '{requested}', use csv or jsonl")
+        return requested
+    name = (filename or "").lower()
+    if name.endswith((".jsonl", ".ndjson")) or "ndjson" in (content_type or "") or "jsonl" in (content_type or ""):
+        return "jsonl"
+    if name.endswith(".csv") or "csv" in (content_type or ""):
+        return "csv"
+    raise ValueError("Cannot detect file format, pass format=csv or format=jsonl")
+
+
+def iter_rows(file: BinaryIO, fmt: str) -> Iterator[_Row]:
+    """Čita datoteku redak po redak (memorija ne raste s veličinom datoteke)"""
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        for record in reader:
+            if None in record:
+                yield _Row(reader.line_num, None, "Row has more columns than the header")
+                continue
+            # Prazne ćelije su nedostajuće vrijednosti
+            yield _Row(reader.line_num, {key: value for key, value in record.items() if value not in ("", None)})
+        return
+
+    for line_number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as error:
+            yield _Row(line_number, None, f"Invalid JSON: {error.msg}")
+            continue
+        if not isinstance(record, dict):
+            yield _Row(line_number, None, "Row must be a JSON object")
+            continue
+        yield _Row(line_number, record)
+
+
+def _validation_messages(error: ValidationError) -> list[str]:
+    return [f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}" for item in error.errors()]
+
+
+class LedgerImportService:
+    """Skupni uvoz prijema i utrošaka iz CSV/JSONL datoteke.
+
+    Redci se obrađuju u chunkovima: validacija Pydantic shemom, jedan upit za
+    duplikate brojeva i jedan po referenci, INSERT za cijeli chunk i jedan
+    upsert salda. U zadanom načinu svaki chunk se commita zasebno, a neispravni
+    redci se preskaču i vraćaju u odgovoru; u atomic načinu bilo koja greška
+    poništava cijeli uvoz.
+    """
+
+    @staticmethod
+    def _process_chunk(
+        db: Session,
+        kind: str,
+        rows: list[_Row],
+        user_id: int,
+        write: bool,
+    ) -> tuple[int, list[ImportRowError]]:
+        spec = IMPORTS[kind]
+        errors: list[ImportRowError] = []
+        valid: list[tuple[int, BaseModel]] = []
+
+        for row in rows:
+            number = row.data.get(spec.number_field) if row.data else None
+            number = str(number) if number is not None else None
+            if row.error:
+                errors.append(ImportRowError(row=row.line, number=number, errors=[row.error]))
+                continue
+            try:
+                valid.append((row.line, spec.schema(**row.data)))
+            except ValidationError as error:
+                errors.append(ImportRowError(row=row.line, number=number, errors=_validation_messages(error)))
+
+        # Duplikati unutar chunka i u bazi (prethodni chunkovi su već upisani;
+        # u dry_run načinu se zato ne vide duplikati između chunkova)
+        number_column = getattr(spec.model, spec.number_field)
+        numbers = [getattr(item, spec.number_field) for _, item in valid]
+        existing = set(db.scalars(select(number_column).where(number_column.in_(numbers)))) if numbers else set()
+
+        # Reference koje ne postoje, jedan upit po referenci
+        missing: dict[str, set] = {}
+        for field, model in spec.references.items():
+            ids = {getattr(item, field) for _, item in valid if getattr(item, field) is not None}
+            found = set(db.scalars(select(model.id).where(model.id.in_(ids)))) if ids else set()
+            missing[field] = ids - found
+
+        records = []
+        record_lines: dict[str, int] = {}
+        seen = set()
+        for line, item in valid:
+            number = getattr(item, spec.number_field)
+            problems = []
+            if number in existing:
+                problems.append(f"{spec.number_field}: already exists")
+            elif number in seen:
+                problems.append(f"{spec.number_field}: duplicate in file")
+            for field in spec.references:
+                if getattr(item, field) in missing[field]:
+                    problems.append(f"{field}: {getattr(item, field)} does not exist")
+            if problems:
+                errors.append(ImportRowError(row=line, number=number, errors=problems))
+                continue
+            seen.add(number)
+            records.append({**item.dict(), "created_by": user_id})
+            record_lines[number] = line
+
+        if write and records:
+            if spec.model is Consumption:
+                # Utrošak se vrednuje cijenom materijala pri knjiženju (LedgerRollupService.post_value)
+                prices = LedgerRollupService.unit_prices(db, {record["material_id"] for record in records})
+                for record in records:
+                    record["total_value"] = record["quantity"] * prices.get(record["material_id"], 0.0)
+            # Broj koji je između provjere i INSERT-a upisao drugi uvoz preskače se
+            # kao duplikat umjesto da sruši cijeli chunk
+            statement = dialect_insert(db, spec.model)
+            if statement is None:
+                statement = insert(spec.model)
+            else:
+                statement = statement.on_conflict_do_nothing(index_elements=[spec.number_field])
+            inserted = set(db.execute(statement.returning(number_column), records).scalars())
+            if len(inserted) < len(records):
+                errors.extend(
+                    ImportRowError(row=record_lines[record[spec.number_field]], number=record[spec.number_field],
+                                   errors=[f"{spec.number_field}: already exists"])
+                    for record in records if record[spec.number_field] not in inserted
+                )
+                records = [record for record in records if record[spec.number_field] in inserted]
+            StockBalanceService.apply_many(db, kind, [
+                LedgerEntry(record["material_id"], record["quantity"], record[spec.date_field], record.get(spec.value_field))
+                for record in records
+            ])
+        return len(records), errors
+
+    @staticmethod
+    async def run(
+        db: AsyncSession,
+        kind: str,
+        file: BinaryIO,
+        fmt: str,
+        user_id: int,
+        dry_run: bool = False,
+        atomic: bool = False,
+        chunk_size: int = IMPORT_CHUNK_SIZE,
+    ) -> ImportResult:
+        """Uvozi datoteku; vraća broj upisanih redaka i greške po retku"""
+        result = ImportResult(format=fmt, total_rows=0, inserted=0, failed=0, dry_run=dry_run, atomic=atomic)
+
+        def collect(inserted: int, errors: list[ImportRowError]) -> None:
+            result.inserted += inserted
+            result.failed += len(errors)
+            room = MAX_REPORTED_ERRORS - len(result.errors)
+            result.errors.extend(errors[:max(room, 0)])
+            if len(errors) > room:
+                result.errors_truncated = True
+
+        # U atomic načinu sve ide u jednu transakciju, commit samo ako nema grešaka
+        write = not dry_run
+        chunk: list[_Row] = []
+        try:
+            for row in iter_rows(file, fmt):
+                result.total_rows += 1
+                chunk.append(row)
+                if len(chunk) >= chunk_size:
+                    collect(*await db.run_sync(LedgerImportService._process_chunk, kind, chunk, user_id, write))
+                    chunk = []
+                    if write and not atomic:
+                        await db.commit()
+        except UnicodeDecodeError:
+            # Ostatak datoteke se ne može pročitati; dotad pročitani redci se obrađuju normalno
+            collect(0, [ImportRowError(row=result.total_rows + 1, errors=["File must be UTF-8 encoded"])])
+        if chunk:
+            collect(*await db.run_sync(LedgerImportService._process_chunk, kind, chunk, user_id, write))
+
+        if write and not (atomic and result.failed):
+            await db.commit()
+        else:
+            await db.rollback()
+            if write:
+                # Atomic uvoz s greškama ne upisuje ništa; u dry_run načinu
+                # inserted je broj redaka koji bi bili upisani
+                result.inserted = 0
+        return result
@@ -0,0 +1,228 @@
+from datetime import date, timedelta
+from typing import Iterable, Optional
+from sqlalchemy import delete, func, insert, literal, select, union_all, update
+from sqlalchemy.orm import Session
+from ..core.database import dialect_insert
+from ..models.consumption import Consumption
+from ..models.ledger_category_rollup import LedgerCategoryRollup
+from ..models.ledger_daily_rollup import LedgerDailyRollup
+from ..models.material import Material
+from ..models.receipt import Receipt
+
+# Stupci dnevnog zbroja po vrsti knjige (količina, vrijednost)
+ROLLUP_FIELDS = {
+    "receipt": ("received_quantity", "received_value"),
+    "consumption": ("consumed_quantity", "consumed_value"),
+}
+ROLLUP_VALUE_FIELDS = ("received_quantity", "received_value", "consumed_quantity", "consumed_value")
+
+GRANULARITIES = ("day", "week", "month")
+
+# Kategorija stavke čiji materijal ne postoji (ne bi se smjelo dogoditi)
+UNKNOWN_CATEGORY = "ostalo"
+
+
+def _category_value(category) -> str:
+    return category.value if hasattr(category, "value") else category
+
+
+def period_start(day: date, granularity: str) -> date:
+    """Prvi dan razdoblja (tjedan počinje ponedjeljkom)"""
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+class LedgerRollupService:
+    """Dnevni zbrojevi knjige prijema i utrošaka po materijalu i po kategoriji.
+
+    Održavaju se u istoj transakciji kao saldo (StockBalanceService), pa trend
+    ne čita stavke knjige. Utrošak se vrednuje cijenom materijala pri knjiženju
+    i ta se vrijednost sprema na stavku (total_value), pa izmjena i brisanje
+    oduzimaju točno knjiženi iznos i nakon promjene cijene. Zbroj po kategoriji
+    vodi se kategorijom materijala u trenutku knjiženja; nakon promjene
+    kategorija povijest se usklađuje s rebuild.
+    """
+
+    @staticmethod
+    def unit_prices(db: Session, material_ids: Iterable[int]) -> dict[int, float]:
+        """Trenutne cijene materijala (0 bez cijene) za vrednovanje utroška"""
+        material_ids = set(material_ids)
+        if not material_ids:
+            return {}
+        return {
+            material_id: unit_price or 0.0
+            for material_id, unit_price in db.execute(
+                select(Material.id, Material.unit_price).where(Material.id.in_(material_ids))
+            )
+        }
+
+    @staticmethod
+    def post_value(db: Session, consumption: Consumption) -> None:
+        """Sprema vrijednost utroška po trenutnoj cijeni materijala (prije knjiženja)"""
+        prices = LedgerRollupService.unit_prices(db, [consumption.material_id])
+        consumption.total_value = consumption.quantity * prices.get(consumption.material_id, 0.0)
+
+    @staticmethod
+    def _upsert(db: Session, model, keys: tuple, rows: list[dict], fields: tuple) -> None:
+        """Dodaje vrijednosti na postojeće retke (ili ih kreira)"""
+        statement = dialect_insert(db, model)
+        if statement is None:
+            for row in rows:
+                rollup = db.get(model, tuple(row[key] for key in keys))
+                if rollup is None:
+                    rollup = model(**{key: row[key] for key in keys}, **{field: 0.0 for field in ROLLUP_VALUE_FIELDS})
+                    db.add(rollup)
+                for field in fields:
+                    setattr(rollup, field, getattr(rollup, field) + row[field])
+            return
+
+        statement = statement.values(rows)
+        db.execute(statement.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={
+                **{field: getattr(model, field) + getattr(statement.excluded, field) for field in fields},
+                "updated_at": func.now(),
+            },
+        ))
+
+    @staticmethod
+    def apply(db: Session, kind: str, entries: Iterable[tuple]) -> None:
+        """Knjiži (stavka, predznak) parove; predznak je 1 za dodanu i -1 za uklonjenu stavku"""
+        entries = list(entries)
+        if not entries:
+            return
+        fields = ROLLUP_FIELDS[kind]
+
+        materials = {
+            row.id: row for row in db.execute(
+                select(Material.id, Material.unit_price, Material.category)
+                .where(Material.id.in_({entry.material_id for entry, _ in entries}))
+            )
+        }
+        by_material: dict[tuple, list] = {}
+        by_category: dict[tuple, list] = {}
+        for entry, sign in entries:
+            material = materials.get(entry.material_id)
+            value = entry.value
+            if value is None:
+                # Stavka bez spremljene vrijednosti vrednuje se trenutnom cijenom
+                value = entry.quantity * ((material.unit_price if material else None) or 0.0)
+            day = entry.date.date()
+            category = _category_value(material.category) if material else UNKNOWN_CATEGORY
+            for totals, key in ((by_material, (entry.material_id, day)), (by_category, (day, category))):
+                total = totals.setdefault(key, [0.0, 0.0])
+                total[0] += sign * entry.quantity
+                total[1] += sign * value
+
+        # Redci idu sortirani po ključu, isti redoslijed zaključavanja u svim transakcijama
+        LedgerRollupService._upsert(db, LedgerDailyRollup, ("material_id", "day"), [
+            {"material_id": material_id, "day": day, **dict(zip(fields, total))}
+            for (material_id, day), total in sorted(by_material.items())
+        ], fields)
+        LedgerRollupService._upsert(db, LedgerCategoryRollup, ("day", "category"), [
+            {"day": day, "category": category, **dict(zip(fields, total))}
+            for (day, category), total in sorted(by_category.items())
+        ], fields)
+
+    @staticmethod
+    def rebuild(db: Session) -> int:
+        """Ponovno gradi sve dnevne zbrojeve iz knjige (set-based), vraća broj redaka"""
+        # Utrošci bez spremljene vrijednosti (stariji podaci) vrednuju se trenutnom cijenom
+        db.execute(
+            update(Consumption)
+            .where(Consumption.total_value.is_(None))
+            .values(total_value=Consumption.quantity * func.coalesce(
+                select(Material.unit_price).where(Material.id == Consumption.material_id).scalar_subquery(), 0.0
+            ))
+            .execution_options(synchronize_session=False)
+        )
+        zero = literal(0.0)
+        ledger = union_all(
+            select(
+                Receipt.material_id.label("material_id"),
+                func.date(Receipt.receipt_date).label("day"),
+                Receipt.quantity.label("received_quantity"),
+                Receipt.total_amount.label("received_value"),
+                zero.label("consumed_quantity"),
+                zero.label("consumed_value"),
+            ),
+            select(
+                Consumption.material_id,
+                func.date(Consumption.consumption_date),
+                zero,
+                zero,
+                Consumption.quantity,
+                Consumption.total_value,
+            ),
+        ).subquery()
+
+        db.execute(delete(LedgerDailyRollup))
+        db.execute(insert(LedgerDailyRollup).from_select(
+            ["material_id", "day", *ROLLUP_VALUE_FIELDS],
+            select(
+                ledger.c.material_id,
+                ledger.c.day,
+                *[func.sum(ledger.c[field]) for field in ROLLUP_VALUE_FIELDS],
+            ).group_by(ledger.c.material_id, ledger.c.day),
+        ))
+
+        # Zbrojevi po kategoriji iz dnevnih zbrojeva (redak po danu i kategoriji)
+        rows = db.execute(
+            select(
+                LedgerDailyRollup.day,
+                Material.category,
+                *[func.sum(getattr(LedgerDailyRollup, field)) for field in ROLLUP_VALUE_FIELDS],
+            )
+            .join(Material, Material.id == LedgerDailyRollup.material_id)
+            .group_by(LedgerDailyRollup.day, Material.category)
+        ).all()
+        db.execute(delete(LedgerCategoryRollup))
+        if rows:
+            db.execute(insert(LedgerCategoryRollup), [
+                {"day": row[0], "category": _category_value(row[1]), **dict(zip(ROLLUP_VALUE_FIELDS, row[2:]))}
+                for row in rows
+            ])
+        db.commit()
+        return db.scalar(select(func.count()).select_from(LedgerDailyRollup)) or 0
+
+    @staticmethod
+    def trend(
+        db: Session,
+        start: date,
+        granularity: str = "day",
+        by_category: bool = False,
+        category: Optional[str] = None,
+        material_id: Optional[int] = None,
+    ) -> list[dict]:
+        """Zbrojevi po razdoblju (i kategoriji) od `start`, poredani po razdoblju.
+
+        Bez materijala čita se zbroj po kategoriji (najviše redak po danu i
+        kategoriji), pa cijena ovisi samo o broju dana; dani se u tjedne i
+        mjesece slažu u memoriji.
+        """
+        if material_id is not None:
+            model, group = LedgerDailyRollup, None
+            criteria = [LedgerDailyRollup.material_id == material_id]
+        else:
+            model, group = LedgerCategoryRollup, LedgerCategoryRollup.category
+            criteria = [LedgerCategoryRollup.category == category] if category is not None else []
+        columns = [model.day] + ([group] if by_category and group is not None else [])
+        query = (
+            select(*columns, *[func.sum(getattr(model, field)) for field in ROLLUP_VALUE_FIELDS])
+            .where(model.day >= start, *criteria)
+            .group_by(*columns)
+        )
+
+        periods: dict[tuple, dict] = {}
+        for row in db.execute(query):
+            key = (period_start(row[0], granularity), row[1] if len(columns) > 1 else None)
+            period = periods.setdefault(key, {field: 0.0 for field in ROLLUP_VALUE_FIELDS})
+            for field, value in zip(ROLLUP_VALUE_FIELDS, row[len(columns):]):
+                period[field] += value or 0.0
+        return [
+            {"date": day, "category": row_category, **values}
+            for (day, row_category), values in sorted(periods.items(), key=lambda item: (item[0][0], item[0][1] or ""))
+        ]
@@ -0,0 +1,171 @@
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from ..core.database import dialect_insert
+from ..models.material import Material, ItemType, Category, Form, RegulatoryStatus
+from ..models.vendor import Vendor
+from ..schemas.material import MaterialCreate, MaterialBulkUpdate, MaterialBulkItemResult, MaterialBulkResult
+from .search_service import memory_index
+
+# Enumi sheme nose vrijednosti (npr. "adaptogen"), stupci modela očekuju enume modela
+MATERIAL_ENUMS = {"item_type": ItemType, "category": Category, "form": Form, "regulatory_status": RegulatoryStatus}
+
+
+def material_values(data: dict) -> dict:
+    """Polja iz sheme materijala kao vrijednosti za stupce modela"""
+    return {
+        field: MATERIAL_ENUMS[field](value.value) if field in MATERIAL_ENUMS and value is not None else value
+        for field, value in data.items()
+    }
+
+
+class MaterialBulkService:
+    """Skupni unos i izmjena materijala (onboarding kataloga dobavljača).
+
+    Jedinstvenost kodova i postojanje dobavljača provjeravaju se jednim IN
+    upitom za cijeli zahtjev, a ispravne stavke upisuju jednim INSERT-om
+    (executemany s RETURNING) odnosno bulk UPDATE-om po primarnom ključu.
+    Kod koji između provjere i upisa zauzme drugi zahtjev vraća se kao
+    greška stavke, ne kao greška cijelog zahtjeva.
+    U zadanom načinu neispravne stavke se preskaču i vraćaju s greškama; u
+    atomic načinu bilo koja greška poništava cijeli zahtjev.
+    """
+
+    @staticmethod
+    def _missing_vendors(db: Session, items: list) -> set:
+        ids = {item.vendor_id for item in items if item.vendor_id is not None}
+        return ids - set(db.scalars(select(Vendor.id).where(Vendor.id.in_(ids)))) if ids else set()
+
+    @staticmethod
+    def _create(db: Session, items: list[MaterialCreate], atomic: bool) -> MaterialBulkResult:
+        result = MaterialBulkResult(total=len(items), atomic=atomic)
+        codes = [item.code for item in items]
+        existing = set(db.scalars(select(Material.code).where(Material.code.in_(codes)))) if codes else set()
+        missing_vendors = MaterialBulkService._missing_vendors(db, items)
+
+        pending: dict[str, MaterialBulkItemResult] = {}
+        records = []
+        for index, item in enumerate(items):
+            problems = []
+            if item.code in existing:
+                problems.append("code: already exists")
+            elif item.code in pending:
+                problems.append("code: duplicate in request")
+            if item.vendor_id in missing_vendors:
+                problems.append(f"vendor_id: {item.vendor_id} does not exist")
+            entry = MaterialBulkItemResult(index=index, code=item.code, status="failed", errors=problems)
+            result.results.append(entry)
+            if not problems:
+                pending[item.code] = entry
+                records.append(material_values(item.model_dump()))
+
+        if not records or (atomic and len(records) < len(items)):
+            return result
+        # Kod koji je u međuvremenu upisao drugi zahtjev preskače se umjesto da sruši cijeli INSERT
+        statement = dialect_insert(db, Material)
+        statement = insert(Material) if statement is None else statement.on_conflict_do_nothing(index_elements=["code"])
+        created = dict(db.execute(statement.returning(Material.code, Material.id), records).all())
+        for code, entry in pending.items():
+            if code in created:
+                entry.id, entry.status = created[code], "created"
+            else:
+                entry.errors.append("code: already exists")
+        return result
+
+    @staticmethod
+    def _update(db: Session, items: list[MaterialBulkUpdate], atomic: bool) -> MaterialBulkResult:
+        result = MaterialBulkResult(total=len(items), atomic=atomic)
+        ids = {item.id for item in items}
+        current = dict(db.execute(select(Material.id, Material.code).where(Material.id.in_(ids))).all()) if ids else {}
+        new_codes = {item.code for item in items if item.code is not None and item.code != current.get(item.id)}
+        taken = dict(db.execute(
+            select(Material.code, Material.id).where(Material.code.in_(new_codes))
+        ).all()) if new_codes else {}
+        missing_vendors = MaterialBulkService._missing_vendors(db, items)
+
+        seen_ids, seen_codes = set(), set()
+        rows, entries = [], {}
+        for index, item in enumerate(items):
+            data = item.model_dump(exclude_unset=True, exclude={"id"})
+            code = data.get("code")
+            problems = []
+            if item.id not in current:
+                problems.append(f"id: {item.id} does not exist")
+            elif item.id in seen_ids:
+                problems.append("id: duplicate in request")
+            if code is not None and code != current.get(item.id):
+                if taken.get(code, item.id) != item.id:
+                    problems.append("code: already exists")
+                elif code in seen_codes:
+                    problems.append("code: duplicate in request")
+            for field, value in data.items():
+                if value is None and not Material.__table__.c[field].nullable:
+                    problems.append(f"{field}: cannot be null")
+            if item.vendor_id in missing_vendors:
+                problems.append(f"vendor_id: {item.vendor_id} does not exist")
+            entry = MaterialBulkItemResult(
+                index=index, id=item.id, code=code or current.get(item.id), status="failed", errors=problems
+            )
+            result.results.append(entry)
+            if problems:
+                continue
+            seen_ids.add(item.id)
+            if code is not None:
+                seen_codes.add(code)
+            entry.status = "updated"
+            if data:
+                rows.append({"id": item.id, **material_values(data)})
+                entries[item.id] = entry
+
+        if rows and not (atomic and len(seen_ids) < len(items)):
+            MaterialBulkService._write_updates(db, rows, entries)
+        return result
+
+    @staticmethod
+    def _write_updates(db: Session, rows: list[dict], entries: dict[int, MaterialBulkItemResult]) -> None:
+        try:
+            with db.begin_nested():
+                # ORM bulk UPDATE po primarnom ključu: executemany po skupu izmijenjenih polja
+                db.execute(update(Material), rows)
+            return
+        except IntegrityError:
+            pass
+        # Drugi zahtjev je u međuvremenu zauzeo kod: svaka stavka u svom savepointu
+        for row in rows:
+            try:
+                with db.begin_nested():
+                    db.execute(update(Material), [row])
+            except IntegrityError:
+                entry = entries[row["id"]]
+                entry.status = "failed"
+                entry.errors.append("code: already exists" if "code" in row else "conflicts with a concurrent change")
+
+    @staticmethod
+    async def _finish(db: AsyncSession, result: MaterialBulkResult, written: str) -> MaterialBulkResult:
+        result.failed = sum(1 for entry in result.results if entry.errors)
+        if result.atomic and result.failed:
+            # Atomic zahtjev s greškama ne upisuje ništa
+            await db.rollback()
+            for entry in result.results:
+                if not entry.errors:
+                    entry.status = "skipped"
+                    if written == "created":
+                        entry.id = None
+            return result
+        await db.commit()
+        setattr(result, written, sum(1 for entry in result.results if entry.status == written))
+        if getattr(result, written):
+            # Bulk INSERT/UPDATE ne okida mapper evente koji osvježavaju memorijski indeks
+            memory_index.invalidate()
+        return result
+
+    @staticmethod
+    async def create(db: AsyncSession, items: list[MaterialCreate], atomic: bool = False) -> MaterialBulkResult:
+        result = await db.run_sync(MaterialBulkService._create, items, atomic)
+        return await MaterialBulkService._finish(db, result, "created")
+
+    @staticmethod
+    async def update(db: AsyncSession, items: list[MaterialBulkUpdate], atomic: bool = False) -> MaterialBulkResult:
+        result = await db.run_sync(MaterialBulkService._update, items, atomic)
+        return await MaterialBulkService._finish(db, result, "updated")
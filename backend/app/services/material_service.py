@@ -1,115 +1,87 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from datetime import datetime, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
 from typing import Optional
 from ..models.material import Material
-from ..models.receipt import Receipt
-from ..models.consumption import Consumption
 from ..schemas.material import MaterialWithCalculations
+from .stock_engine import StockEngine, MaterialStock
 
 
 class MaterialService:
-    
+    """Kalkulacije zaliha za API.
+
+    Skupni izračun radi StockEngine na sinkronoj sesiji; ovdje se izvršava
+    preko AsyncSession.run_sync pa I/O ide kroz async driver i ne blokira
+    event loop.
+    """
+
+    @staticmethod
+    async def get_stock(db: AsyncSession, material_id: int) -> Optional[MaterialStock]:
+        """Vraća izračun zaliha jednog materijala"""
+        return await db.run_sync(StockEngine.get, material_id)
+
+    @staticmethod
+    async def load_stocks(db: AsyncSession, *criteria, statuses: Optional[list[str]] = None) -> list[MaterialStock]:
+        """Vraća izračune zaliha za materijale po kriterijima"""
+        return await db.run_sync(StockEngine.load, *criteria, statuses=statuses)
+
+    @staticmethod
+    async def count_stocks(db: AsyncSession, *criteria, statuses: Optional[list[str]] = None) -> int:
+        """Broji materijale po kriterijima i statusu zaliha"""
+        return await db.run_sync(StockEngine.count, *criteria, statuses=statuses)
+
+    @staticmethod
+    async def count_stocks_by_status(db: AsyncSession, *criteria, group_by=None) -> list:
+        """Broj materijala po statusu zaliha, grupirano u bazi"""
+        return await db.run_sync(StockEngine.count_by_status, *criteria, group_by=group_by)
+
     @staticmethod
-    def calculate_current_stock(db: Session, material_id: int) -> float:
+    async def calculate_current_stock(db: AsyncSession, material_id: int) -> float:
         """Izračunava trenutnu zalihu materijala"""
-        material = db.query(Material).filter(Material.id == material_id).first()
-        if not material:
-            return 0.0
-        
-        # Suma prijema
-        total_receipts = db.query(func.sum(Receipt.quantity)).filter(
-            Receipt.material_id == material_id
-        ).scalar() or 0.0
-        
-        # Suma utroška
-        total_consumptions = db.query(func.sum(Consumption.quantity)).filter(
-            Consumption.material_id == material_id
-        ).scalar() or 0.0
-        
-        # Trenutna zaliha = početna zaliha + prijemi - utrošak
-        current_stock = material.opening_stock + total_receipts - total_consumptions
-        return max(0.0, current_stock)  # Ne može biti negativna
-    
+        stock = await MaterialService.get_stock(db, material_id)
+        return stock.current_stock if stock else 0.0
+
     @staticmethod
-    def calculate_recommended_po(db: Session, material_id: int) -> float:
+    async def calculate_recommended_po(db: AsyncSession, material_id: int) -> float:
         """Izračunava preporučenu količinu za narudžbu"""
-        material = db.query(Material).filter(Material.id == material_id).first()
-        if not material:
-            return 0.0
-        
-        current_stock = MaterialService.calculate_current_stock(db, material_id)
-        
-        # Preporučena narudžba = sigurnosna zaliha + mjesečni forecast - trenutna zaliha
-        recommended = material.safety_stock + material.monthly_forecast - current_stock
-        
-        # Dodaj 20% buffer za sigurnost
-        recommended = recommended * 1.2
-        
-        return max(0.0, recommended)
-    
+        stock = await MaterialService.get_stock(db, material_id)
+        return stock.recommended_po if stock else 0.0
+
     @staticmethod
-    def get_stock_status(db: Session, material_id: int) -> str:
+    async def get_stock_status(db: AsyncSession, material_id: int) -> str:
         """Određuje status zaliha (normal, low, critical)"""
-        material = db.query(Material).filter(Material.id == material_id).first()
-        if not material:
-            return "unknown"
-        
-        current_stock = MaterialService.calculate_current_stock(db, material_id)
-        
-        if current_stock <= material.safety_stock * 0.5:
-            return "critical"
-        elif current_stock <= material.safety_stock:
-            return "low"
-        else:
-            return "normal"
-    
+        stock = await MaterialService.get_stock(db, material_id)
+        return stock.stock_status if stock else "unknown"
+
     @staticmethod
-    def get_last_activity_dates(db: Session, material_id: int) -> tuple[Optional[datetime], Optional[datetime]]:
+    async def get_last_activity_dates(db: AsyncSession, material_id: int) -> tuple[Optional[datetime], Optional[datetime]]:
         """Vraća datume zadnjeg prijema i utroška"""
-        last_receipt = db.query(Receipt.receipt_date).filter(
-            Receipt.material_id == material_id
-        ).order_by(Receipt.receipt_date.desc()).first()
-        
-        last_consumption = db.query(Consumption.consumption_date).filter(
-            Consumption.material_id == material_id
-        ).order_by(Consumption.consumption_date.desc()).first()
-        
-        return (
-            last_receipt[0] if last_receipt else None,
-            last_consumption[0] if last_consumption else None
+        stock = await MaterialService.get_stock(db, material_id)
+        if not stock:
+            return None, None
+        return stock.last_receipt_date, stock.last_consumption_date
+
+    @staticmethod
+    def to_schema(stock: MaterialStock) -> MaterialWithCalculations:
+        """Pretvara izračun zaliha u response shemu"""
+        return MaterialWithCalculations(
+            **stock.material.__dict__,
+            current_stock=stock.current_stock,
+            recommended_po=stock.recommended_po,
+            stock_status=stock.stock_status,
+            last_receipt_date=stock.last_receipt_date,
+            last_consumption_date=stock.last_consumption_date
         )
-    
+
     @staticmethod
-    def get_material_with_calculations(db: Session, material_id: int) -> Optional[MaterialWithCalculations]:
+    async def get_material_with_calculations(db: AsyncSession, material_id: int) -> Optional[MaterialWithCalculations]:
         """Vraća materijal s kalkulacijama"""
-        material = db.query(Material).filter(Material.id == material_id).first()
-        if not material:
+        stock = await MaterialService.get_stock(db, material_id)
+        if not stock:
             return None
-        
-        current_stock = MaterialService.calculate_current_stock(db, material_id)
-        recommended_po = MaterialService.calculate_recommended_po(db, material_id)
-        stock_status = MaterialService.get_stock_status(db, material_id)
-        last_receipt_date, last_consumption_date = MaterialService.get_last_activity_dates(db, material_id)
-        
-        return MaterialWithCalculations(
-            **material.__dict__,
-            current_stock=current_stock,
-            recommended_po=recommended_po,
-            stock_status=stock_status,
-            last_receipt_date=last_receipt_date,
-            last_consumption_date=last_consumption_date
-        )
-    
+        return MaterialService.to_schema(stock)
+
     @staticmethod
-    def get_low_stock_materials(db: Session) -> list[MaterialWithCalculations]:
+    async def get_low_stock_materials(db: AsyncSession) -> list[MaterialWithCalculations]:
         """Vraća materijale s niskim zalihama"""
-        materials = db.query(Material).filter(Material.is_active == True).all()
-        low_stock_materials = []
-        
-        for material in materials:
-            material_with_calc = MaterialService.get_material_with_calculations(db, material.id)
-            if material_with_calc and material_with_calc.stock_status in ["low", "critical"]:
-                low_stock_materials.append(material_with_calc)
-        
-        return low_stock_materials 
\ No newline at end of file
+        stocks = await MaterialService.load_stocks(db, Material.is_active == True, statuses=["low", "critical"])
+        return [MaterialService.to_schema(stock) for stock in stocks]
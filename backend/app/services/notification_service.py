@@ -0,0 +1,137 @@
+from datetime import datetime, timezone
+from typing import NamedTuple, Optional
+from sqlalchemy import and_, case, func
+from sqlalchemy.orm import Session
+from ..core.config import settings
+from ..core.database import advisory_lock, dialect_insert
+from ..core.notifications import configured_channels, deliver
+from ..models.material import Material
+from ..models.stock_alert_state import StockAlertState
+from .stock_engine import MaterialStock, StockEngine
+
+# Ključ advisory locka: satni i dnevni raspored se preklapaju u 9:00
+NOTIFICATION_LOCK_KEY = 7_201_011
+
+# Materijal bez zapisa stanja smatra se normalnim
+DEFAULT_STATUS = "normal"
+STATUS_LABELS = {"critical": "kritično", "low": "nisko", "normal": "normalno"}
+STATUS_ORDER = {"critical": 0, "low": 1, "normal": 2}
+
+
+class StockTransition(NamedTuple):
+    stock: MaterialStock
+    previous_status: str
+
+
+def format_transition(transition: StockTransition) -> str:
+    stock = transition.stock
+    material = stock.material
+    change = f"{STATUS_LABELS[transition.previous_status]} -> {STATUS_LABELS[stock.stock_status]}"
+    if stock.stock_status == "normal":
+        return f"- {material.code}: {material.name} ({change})\n  Trenutna zaliha: {stock.current_stock} {material.unit}\n"
+    return (
+        f"- {material.code}: {material.name} ({change})\n"
+        f"  Trenutna zaliha: {stock.current_stock} {material.unit}\n"
+        f"  Sigurnosna zaliha: {material.safety_stock} {material.unit}\n"
+        f"  Preporučena narudžba: {stock.recommended_po} {material.unit}\n"
+    )
+
+
+def digest(transitions: list[StockTransition], part: int, parts: int) -> tuple[str, str]:
+    """Naslov i tekst jedne poruke sažetka"""
+    subject = "ZenCore - Promjene statusa zaliha"
+    if parts > 1:
+        subject += f" ({part}/{parts})"
+    counts = {status: 0 for status in STATUS_ORDER}
+    for transition in transitions:
+        counts[transition.stock.stock_status] += 1
+    header = ", ".join(f"{STATUS_LABELS[status]}: {count}" for status, count in counts.items() if count)
+    body = f"Promjene statusa od prethodne obavijesti ({header}):\n\n"
+    body += "\n".join(format_transition(transition) for transition in transitions)
+    return subject, body
+
+
+class NotificationService:
+    """Obavijesti o promjenama statusa zaliha.
+
+    Tablica stock_alert_states čuva, po kanalu, zadnji status za koji je
+    obavijest poslana, pa se šalju samo materijali kojima se status od tada
+    promijenio. Stanje kanala upisuje se tek nakon što je poruka kroz njega
+    poslana; ono što nije poslano ostaje za sljedeći pokušaj tog kanala, a
+    kanali koji su poruku već isporučili ne šalju je ponovno.
+    """
+
+    @staticmethod
+    def transitions(db: Session, channel: str, limit: Optional[int] = None) -> list[StockTransition]:
+        """Aktivni materijali čiji se status razlikuje od zadnjeg obaviještenog kroz kanal (jedan upit)"""
+        query, _, stock_status = StockEngine._build()
+        previous_status = func.coalesce(StockAlertState.stock_status, DEFAULT_STATUS)
+        query = (
+            query.add_columns(previous_status.label("previous_status"))
+            .outerjoin(StockAlertState, and_(
+                StockAlertState.material_id == Material.id, StockAlertState.channel == channel
+            ))
+            .where(Material.is_active == True, stock_status != previous_status)
+            .order_by(case(STATUS_ORDER, value=stock_status), Material.id)
+        )
+        if limit is not None:
+            query = query.limit(limit)
+        return [StockTransition(StockEngine._evaluate(row), row.previous_status) for row in db.execute(query)]
+
+    @staticmethod
+    def mark_notified(db: Session, channel: str, transitions: list[StockTransition]) -> None:
+        """Upisuje status za koji je obavijest poslana kroz kanal"""
+        now = datetime.now(timezone.utc)
+        values = [
+            {
+                "material_id": transition.stock.material.id,
+                "channel": channel,
+                "stock_status": transition.stock.stock_status,
+                "current_stock": transition.stock.current_stock,
+                "notified_at": now,
+            }
+            for transition in transitions
+        ]
+        statement = dialect_insert(db, StockAlertState)
+        if statement is None:
+            for value in values:
+                db.merge(StockAlertState(**value))
+            return
+        statement = statement.on_conflict_do_update(
+            index_elements=["material_id", "channel"],
+            set_={field: statement.excluded[field] for field in ("stock_status", "current_stock", "notified_at")},
+        )
+        db.execute(statement, values)
+
+    @staticmethod
+    def notify_transitions(db: Session, chunk_size: Optional[int] = None) -> dict:
+        """Šalje promjene statusa u porukama po chunk_size materijala"""
+        chunk_size = chunk_size or settings.notification_chunk_size
+        channels = configured_channels()
+        if not channels:
+            return {"status": "skipped", "message": "No notification channels configured"}
+
+        with advisory_lock(NOTIFICATION_LOCK_KEY, db.get_bind()) as acquired:
+            if not acquired:
+                return {"status": "skipped", "message": "Notifications already running"}
+
+            summary = {"transitions": 0, "notified": 0, "pending": 0, "messages": 0, "channels": {}}
+            for channel in channels:
+                # Svaki kanal ima svoje stanje: kanal koji je poruku isporučio ne šalje je ponovno
+                transitions = NotificationService.transitions(db, channel.name)
+                chunks = [transitions[i:i + chunk_size] for i in range(0, len(transitions), chunk_size)]
+                sent = 0
+                for part, chunk in enumerate(chunks, start=1):
+                    subject, body = digest(chunk, part, len(chunks))
+                    if not deliver(channel, subject, body):
+                        break
+                    NotificationService.mark_notified(db, channel.name, chunk)
+                    db.commit()
+                    sent += len(chunk)
+                summary["channels"][channel.name] = {"notified": sent, "pending": len(transitions) - sent}
+                summary["transitions"] += len(transitions)
+                summary["notified"] += sent
+                summary["pending"] += len(transitions) - sent
+                summary["messages"] += len(chunks)
+
+        return {"status": "success" if not summary["pending"] else "partial", **summary}
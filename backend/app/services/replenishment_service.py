@@ -0,0 +1,106 @@
+from typing import Optional
+from sqlalchemy import case, func, or_, select
+from sqlalchemy.orm import Session
+from ..models.material import Material
+from .stock_engine import RECOMMENDED_PO_BUFFER, StockEngine
+
+# Mjesečni forecast pretvara se u dnevnu potrošnju
+DAYS_PER_MONTH = 30.0
+# Pokrivenost materijala bez potrošnje (sortira se iza svih ostalih)
+NO_DEMAND_COVER_DAYS = 99999.0
+
+# Redoslijed stupaca u stavci plana
+PLAN_FIELDS = (
+    "material_id", "material_code", "material_name", "unit", "current_stock", "safety_stock",
+    "reorder_point", "recommended_po", "order_quantity", "order_value", "lead_time_days",
+    "days_of_cover", "priority",
+)
+
+
+class ReplenishmentService:
+    """Plan nabave za cijeli katalog.
+
+    Sve veličine plana računaju se kao izrazi nad stupcima materijala i salda,
+    pa baza izračuna, filtrira i rangira sve materijale u jednom prolazu, a
+    aplikacija čita samo traženu stranicu plana.
+
+    Točka narudžbe = sigurnosna zaliha + potrošnja tijekom roka isporuke.
+    Materijal ulazi u plan kad je zaliha na ili ispod točke narudžbe; količina
+    pokriva točku narudžbe i mjesečni forecast (uz buffer) i zaokružuje se
+    naviše na višekratnik minimalne količine narudžbe.
+    """
+
+    @staticmethod
+    def plan_query(*criteria):
+        """Vraća (upit plana, sortiranja za paginaciju)"""
+        query, current_stock, stock_status = StockEngine._build()
+
+        safety_stock = func.coalesce(Material.safety_stock, 0.0)
+        monthly_forecast = func.coalesce(Material.monthly_forecast, 0.0)
+        lead_time_days = func.coalesce(Material.delivery_time_days, 0)
+        daily_demand = monthly_forecast / DAYS_PER_MONTH
+        reorder_point = safety_stock + daily_demand * lead_time_days
+
+        recommended = (safety_stock + monthly_forecast - current_stock) * RECOMMENDED_PO_BUFFER
+        recommended_po = case((recommended < 0, 0.0), else_=recommended)
+        quantity = (reorder_point + monthly_forecast - current_stock) * RECOMMENDED_PO_BUFFER
+        moq = func.coalesce(Material.minimum_order_quantity, 0.0)
+        order_quantity = case((moq > 0, func.ceil(quantity / moq) * moq), else_=quantity)
+        order_value = order_quantity * func.coalesce(Material.unit_price, 0.0)
+
+        # Dani do nestanka zalihe; manje od roka isporuke znači da narudžba kasni
+        days_of_cover = case((daily_demand > 0, current_stock / daily_demand), else_=NO_DEMAND_COVER_DAYS)
+        slack_days = days_of_cover - lead_time_days
+        urgent = or_(stock_status == "critical", slack_days <= 0)
+        priority_rank = case((urgent, 0), else_=1)
+
+        query = query.with_only_columns(
+            Material.id.label("material_id"),
+            Material.code.label("material_code"),
+            Material.name.label("material_name"),
+            Material.unit,
+            current_stock.label("current_stock"),
+            Material.safety_stock,
+            reorder_point.label("reorder_point"),
+            recommended_po.label("recommended_po"),
+            order_quantity.label("order_quantity"),
+            order_value.label("order_value"),
+            Material.delivery_time_days.label("lead_time_days"),
+            days_of_cover.label("days_of_cover"),
+            case((urgent, "high"), else_="medium").label("priority"),
+        ).where(current_stock <= reorder_point, quantity > 0)
+        if criteria:
+            query = query.where(*criteria)
+
+        sorts = {
+            "urgency": (priority_rank, slack_days),
+            "quantity": (order_quantity,),
+            "value": (order_value,),
+        }
+        return query, sorts
+
+    @staticmethod
+    def to_item(row) -> dict:
+        """Stavka plana iz retka upita"""
+        item = dict(zip(PLAN_FIELDS, row))
+        if item["days_of_cover"] >= NO_DEMAND_COVER_DAYS:
+            item["days_of_cover"] = None
+        for field in ("current_stock", "reorder_point", "recommended_po", "order_quantity", "order_value", "days_of_cover"):
+            if item[field] is not None:
+                item[field] = round(float(item[field]), 3)
+        return item
+
+    @staticmethod
+    def plan(db: Session, *criteria, limit: Optional[int] = None) -> list[dict]:
+        """Rangirani plan nabave (najhitnije prvo), jedan upit"""
+        query, sorts = ReplenishmentService.plan_query(*criteria)
+        query = query.order_by(*sorts["urgency"], Material.id)
+        if limit is not None:
+            query = query.limit(limit)
+        return [ReplenishmentService.to_item(row) for row in db.execute(query)]
+
+    @staticmethod
+    def count(db: Session, *criteria) -> int:
+        """Broj stavki plana"""
+        query, _ = ReplenishmentService.plan_query(*criteria)
+        return db.scalar(select(func.count()).select_from(query.subquery())) or 0
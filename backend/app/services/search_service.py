@@ -0,0 +1,187 @@
+import re
+import threading
+import time
+from bisect import bisect_left
+from typing import Optional
+from sqlalchemy import Float, case, cast, event, false, func, inspect, literal_column, or_, select
+from sqlalchemy.orm import Session
+from ..models.material import Material
+
+# Folding hrvatskih znakova, isto kao SQL funkcija zc_fold
+FOLD_TABLE = str.maketrans("čćšžđ", "ccszd")
+TOKEN_PATTERN = re.compile(r"[^\W_]+")
+
+# Bodovi za kod koji odgovara upitu (kodovi se traže po prefiksu)
+CODE_EXACT_BOOST = 2.0
+CODE_PREFIX_BOOST = 1.0
+
+# Memorijski indeks se gradi ponovno najkasnije nakon ovoliko sekundi
+# (promjene iz drugih procesa ne invalidiraju lokalni indeks)
+MEMORY_INDEX_MAX_AGE = 60.0
+
+# Težine polja u memorijskom indeksu (kao težine A/B/C u ts_rank)
+FIELD_WEIGHTS = (
+    ("code", 1.0),
+    ("name", 1.0),
+    ("material_component", 0.4),
+    ("service_description", 0.4),
+    ("description", 0.2),
+)
+
+SEARCH_VECTOR = literal_column("materials.search_vector")
+SEARCH_TEXT = literal_column("materials.search_text")
+
+
+def fold(text: Optional[str]) -> str:
+    """Mala slova bez dijakritika (č/ć -> c, š -> s, ž -> z, đ -> d)"""
+    return (text or "").lower().translate(FOLD_TABLE)
+
+
+def tokenize(text: Optional[str]) -> list[str]:
+    return TOKEN_PATTERN.findall(fold(text))
+
+
+def _like_pattern(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class InMemorySearchIndex:
+    """Invertirani indeks materijala u memoriji procesa.
+
+    Koristi se na SQLite-u (testovi) i na bazama bez migracije 0005. Gradi se
+    lijeno pri prvoj pretrazi i ponovno nakon svake promjene materijala u
+    ovom procesu, odnosno nakon MEMORY_INDEX_MAX_AGE sekundi.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._dirty = True
+        self._built_at = 0.0
+        self._vocabulary: list[str] = []
+        self._postings: dict[str, dict[int, float]] = {}
+        self._texts: dict[int, str] = {}
+        self._codes: dict[int, str] = {}
+
+    def invalidate(self, *args) -> None:
+        self._dirty = True
+
+    def _stale(self) -> bool:
+        return self._dirty or time.monotonic() - self._built_at > MEMORY_INDEX_MAX_AGE
+
+    def ensure(self, db: Session) -> None:
+        if not self._stale():
+            return
+        with self._lock:
+            if not self._stale():
+                return
+            self._dirty = False
+            fields = [name for name, _ in FIELD_WEIGHTS]
+            rows = db.execute(select(Material.id, *[getattr(Material, name) for name in fields])).all()
+
+            postings: dict[str, dict[int, float]] = {}
+            texts, codes = {}, {}
+            for row in rows:
+                values = dict(zip(fields, row[1:]))
+                for name, weight in FIELD_WEIGHTS:
+                    for token in tokenize(values[name]):
+                        scores = postings.setdefault(token, {})
+                        scores[row.id] = max(scores.get(row.id, 0.0), weight)
+                texts[row.id] = " ".join(fold(values[name]) for name in fields)
+                codes[row.id] = fold(values["code"])
+
+            self._postings = postings
+            self._vocabulary = sorted(postings)
+            self._texts = texts
+            self._codes = codes
+            self._built_at = time.monotonic()
+
+    def _prefix_matches(self, token: str) -> dict[int, float]:
+        scores: dict[int, float] = {}
+        start = bisect_left(self._vocabulary, token)
+        for word in self._vocabulary[start:]:
+            if not word.startswith(token):
+                break
+            for material_id, weight in self._postings[word].items():
+                scores[material_id] = max(scores.get(material_id, 0.0), weight)
+        return scores
+
+    def search(self, term: str) -> dict[int, float]:
+        """Vraća {material_id: relevantnost} za sve pogotke"""
+        folded = fold(term).strip()
+        scores: dict[int, float] = {}
+
+        # Svi tokeni upita moraju se pojaviti (kao prefiks riječi)
+        tokens = tokenize(term)
+        if tokens:
+            matches = [self._prefix_matches(token) for token in tokens]
+            for material_id in set.intersection(*[set(match) for match in matches]):
+                scores[material_id] = sum(match[material_id] for match in matches)
+
+        # Podniz bilo gdje u tekstu, kao LIKE '%...%'
+        for material_id, text in self._texts.items():
+            if material_id not in scores and folded in text:
+                scores[material_id] = 0.0
+
+        for material_id in scores:
+            code = self._codes[material_id]
+            if code == folded:
+                scores[material_id] += CODE_EXACT_BOOST
+            elif code.startswith(folded):
+                scores[material_id] += CODE_PREFIX_BOOST
+        return scores
+
+
+memory_index = InMemorySearchIndex()
+for _event in ("after_insert", "after_update", "after_delete"):
+    event.listen(Material, _event, memory_index.invalidate)
+
+
+class MaterialSearch:
+    """Pretraživanje materijala s rangiranjem po relevantnosti.
+
+    Na PostgreSQL-u s migracijom 0005 koristi tsvector (prefiksi riječi) i
+    folded tekst za podnizove, oboje indeksirano. Inače koristi memorijski
+    indeks s istim pravilima.
+    """
+
+    _postgres_ready: dict[str, bool] = {}
+
+    @staticmethod
+    def uses_database_index(db: Session) -> bool:
+        bind = db.get_bind()
+        key = str(bind.url)
+        if key not in MaterialSearch._postgres_ready:
+            ready = bind.dialect.name == "postgresql" and any(
+                column["name"] == "search_vector"
+                for column in inspect(db.connection()).get_columns("materials")
+            )
+            MaterialSearch._postgres_ready[key] = ready
+        return MaterialSearch._postgres_ready[key]
+
+    @staticmethod
+    def criteria(db: Session, term: str):
+        """Vraća (uvjet pretrage, izraz relevantnosti) za upit nad Material"""
+        if not MaterialSearch.uses_database_index(db):
+            memory_index.ensure(db)
+            scores = memory_index.search(term)
+            if not scores:
+                return false(), cast(0.0, Float)
+            rank = case(scores, value=Material.id, else_=0.0)
+            return Material.id.in_(list(scores)), cast(rank, Float)
+
+        folded = fold(term).strip()
+        tokens = tokenize(term)
+        code = func.zc_fold(Material.code)
+        code_boost = case(
+            (code == folded, CODE_EXACT_BOOST),
+            (code.like(f"{_like_pattern(folded)}%", escape="\\"), CODE_PREFIX_BOOST),
+            else_=0.0,
+        )
+        substring = SEARCH_TEXT.like(f"%{_like_pattern(folded)}%", escape="\\")
+        if not tokens:
+            return substring, cast(code_boost, Float)
+
+        ts_query = func.to_tsquery("simple", " & ".join(f"{token}:*" for token in tokens))
+        match = or_(SEARCH_VECTOR.op("@@")(ts_query), substring)
+        rank = func.ts_rank(SEARCH_VECTOR, ts_query) + code_boost
+        return match, cast(rank, Float)
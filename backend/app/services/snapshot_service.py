@@ -0,0 +1,155 @@
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Optional
+from sqlalchemy import and_, delete, exists, func, insert, literal, or_, select
+from sqlalchemy.orm import Session, aliased
+from ..core.database import id_range_filter
+from ..models.material import Material
+from ..models.stock_balance import StockBalance
+from ..models.stock_snapshot import StockSnapshot
+from .stock_balance_service import StockBalanceService
+from .stock_engine import classify_stock, recommend_order
+
+# Stupci koji se kopiraju iz prethodnog snimka za materijale bez promjena
+SNAPSHOT_VALUE_FIELDS = (
+    "material_id", "received_quantity", "consumed_quantity", "current_stock",
+    "safety_stock", "recommended_po", "stock_status", "computed_at",
+)
+
+
+# Promjene upisane dok je prethodni snimak nastajao ne smiju promaknuti
+CHANGE_DETECTION_OVERLAP = timedelta(minutes=5)
+
+
+def snapshot_cutoff(snapshot_date: date) -> datetime:
+    """Snimak za dan D uključuje stavke knjige datirane prije D+1 00:00"""
+    return datetime.combine(snapshot_date + timedelta(days=1), time.min)
+
+
+class StockSnapshotService:
+    """Dnevni snimci stanja zaliha.
+
+    Snimak za dan sadrži red za svaki aktivni materijal. Ponovno se računaju
+    samo materijali s aktivnošću od prethodnog snimka (promjena salda ili
+    materijala, ili stavka datirana nakon prethodnog snimka); ostali redovi
+    kopiraju se iz prethodnog snimka jednim INSERT ... SELECT.
+    """
+
+    @staticmethod
+    def previous_snapshot(db: Session, snapshot_date: date) -> tuple[Optional[date], Optional[datetime]]:
+        """Datum i vrijeme zadnjeg izračuna prethodnog snimka"""
+        previous_date = db.scalar(
+            select(func.max(StockSnapshot.snapshot_date)).where(StockSnapshot.snapshot_date < snapshot_date)
+        )
+        if previous_date is None:
+            return None, None
+        created_at = db.scalar(
+            select(func.max(StockSnapshot.created_at)).where(StockSnapshot.snapshot_date == previous_date)
+        )
+        return previous_date, created_at
+
+    @staticmethod
+    def _changed_material_ids(
+        db: Session, previous_date: Optional[date], previous_run: Optional[datetime], id_range: Optional[tuple] = None
+    ):
+        """Upit za aktivne materijale koje treba ponovno izračunati"""
+        query = select(Material.id).where(Material.is_active == True, *id_range_filter(Material.id, id_range))
+        if previous_date is None:
+            return query
+
+        previous = aliased(StockSnapshot)
+        previous_cutoff = snapshot_cutoff(previous_date)
+        changed_since = previous_run - CHANGE_DETECTION_OVERLAP
+        return query.outerjoin(StockBalance, StockBalance.material_id == Material.id).where(or_(
+            ~exists().where(and_(previous.material_id == Material.id, previous.snapshot_date == previous_date)),
+            Material.updated_at > changed_since,
+            StockBalance.updated_at > changed_since,
+            StockBalance.last_receipt_date >= previous_cutoff,
+            StockBalance.last_consumption_date >= previous_cutoff,
+        ))
+
+    @staticmethod
+    def build(
+        db: Session,
+        snapshot_date: Optional[date] = None,
+        full: bool = False,
+        id_range: Optional[tuple] = None,
+        previous: Optional[tuple] = None,
+    ) -> dict:
+        """Gradi (ili ponovno gradi) snimak za zadani dan, vraća sažetak.
+
+        S id_range gradi samo materijale iz raspona (dio paralelnog izračuna),
+        a previous je tada (datum, vrijeme) prethodnog snimka utvrđen jednom
+        za sve dijelove.
+        """
+        snapshot_date = snapshot_date or datetime.utcnow().date()
+        now = datetime.now(timezone.utc)
+        if full:
+            previous_date, previous_run = None, None
+        elif previous is not None:
+            previous_date, previous_run = previous
+        else:
+            previous_date, previous_run = StockSnapshotService.previous_snapshot(db, snapshot_date)
+
+        db.execute(delete(StockSnapshot).where(
+            StockSnapshot.snapshot_date == snapshot_date, *id_range_filter(StockSnapshot.material_id, id_range)
+        ))
+
+        # Podupit se koristi unutar upita koji i sami čitaju materials, pa se ne korelira
+        changed = StockSnapshotService._changed_material_ids(db, previous_date, previous_run, id_range).correlate(None)
+
+        copied = 0
+        if previous_date is not None:
+            previous = aliased(StockSnapshot)
+            source = (
+                select(
+                    literal(snapshot_date, StockSnapshot.snapshot_date.type),
+                    *[getattr(previous, field) for field in SNAPSHOT_VALUE_FIELDS],
+                )
+                .join(Material, Material.id == previous.material_id)
+                .where(
+                    previous.snapshot_date == previous_date,
+                    *id_range_filter(previous.material_id, id_range),
+                    Material.is_active == True,
+                    previous.material_id.not_in(changed),
+                )
+            )
+            copied = db.execute(
+                insert(StockSnapshot).from_select(["snapshot_date", *SNAPSHOT_VALUE_FIELDS], source)
+            ).rowcount
+
+        # Izračun iz knjige samo za promijenjene materijale
+        ledger = StockBalanceService.ledger_query(snapshot_cutoff(snapshot_date), changed).subquery()
+        rows = db.execute(
+            select(Material, ledger.c.received_quantity, ledger.c.consumed_quantity)
+            .join(ledger, ledger.c.material_id == Material.id)
+            .where(Material.id.in_(changed))
+        ).all()
+
+        records = []
+        for row in rows:
+            material = row.Material
+            received = float(row.received_quantity or 0.0)
+            consumed = float(row.consumed_quantity or 0.0)
+            current_stock = max(0.0, (material.opening_stock or 0.0) + received - consumed)
+            records.append({
+                "snapshot_date": snapshot_date,
+                "material_id": material.id,
+                "received_quantity": received,
+                "consumed_quantity": consumed,
+                "current_stock": current_stock,
+                "safety_stock": material.safety_stock,
+                "recommended_po": recommend_order(current_stock, material.safety_stock, material.monthly_forecast),
+                "stock_status": classify_stock(current_stock, material.safety_stock),
+                "computed_at": now,
+            })
+        if records:
+            db.execute(insert(StockSnapshot), records)
+        db.commit()
+
+        return {
+            "snapshot_date": snapshot_date.isoformat(),
+            "previous_snapshot_date": previous_date.isoformat() if previous_date else None,
+            "recomputed": len(records),
+            "copied": copied,
+            "total_materials": len(records) + copied,
+        }
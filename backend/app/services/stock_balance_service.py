@@ -0,0 +1,258 @@
+from datetime import datetime
+from typing import Iterable, NamedTuple, Optional
+from sqlalchemy.orm import Session
+from sqlalchemy import case, func, select, delete, insert
+from ..core.database import dialect_insert
+from ..models.material import Material
+from ..models.receipt import Receipt
+from ..models.consumption import Consumption
+from ..models.stock_balance import StockBalance
+from .ledger_rollup_service import LedgerRollupService
+
+# Dopušteno odstupanje salda od knjige zbog zbrajanja floatova
+BALANCE_TOLERANCE = 1e-6
+
+
+class LedgerEntry(NamedTuple):
+    """Stavka knjige (prijem ili utrošak) bitna za saldo i dnevne zbrojeve"""
+    material_id: int
+    quantity: float
+    date: datetime
+    value: Optional[float] = None  # None: vrednuje se cijenom materijala
+
+
+class _Ledger(NamedTuple):
+    model: type
+    date_column: object
+    quantity_field: str
+    last_date_field: str
+
+
+LEDGERS = {
+    "receipt": _Ledger(Receipt, Receipt.receipt_date, "received_quantity", "last_receipt_date"),
+    "consumption": _Ledger(Consumption, Consumption.consumption_date, "consumed_quantity", "last_consumption_date"),
+}
+
+
+def receipt_entry(receipt: Receipt) -> LedgerEntry:
+    return LedgerEntry(receipt.material_id, receipt.quantity, receipt.receipt_date, receipt.total_amount)
+
+
+def consumption_entry(consumption: Consumption) -> LedgerEntry:
+    return LedgerEntry(consumption.material_id, consumption.quantity, consumption.consumption_date, consumption.total_value)
+
+
+def _insert_missing(db: Session):
+    """INSERT koji preskače postojeći saldo (izbjegava utrku pri prvom knjiženju)"""
+    statement = dialect_insert(db, StockBalance)
+    if statement is None:
+        return None
+    return statement.on_conflict_do_nothing(index_elements=["material_id"])
+
+
+class StockBalanceService:
+    """Održavanje materijaliziranog salda zaliha (i dnevnih zbrojeva knjige).
+
+    Pozivatelj knjiži promjene u istoj transakciji u kojoj mijenja prijeme i
+    utroške; commit ostaje na pozivatelju.
+    """
+
+    @staticmethod
+    def _lock(db: Session, material_id: int) -> StockBalance:
+        """Dohvaća (i po potrebi kreira) saldo materijala zaključan za izmjenu"""
+        query = db.query(StockBalance).filter(StockBalance.material_id == material_id).with_for_update()
+        balance = query.first()
+        if balance is None:
+            statement = _insert_missing(db)
+            if statement is not None:
+                db.execute(statement.values(material_id=material_id))
+                balance = query.first()
+            else:
+                balance = StockBalance(material_id=material_id, received_quantity=0.0, consumed_quantity=0.0)
+                db.add(balance)
+        return balance
+
+    @staticmethod
+    def apply(
+        db: Session,
+        kind: str,
+        added: Optional[LedgerEntry] = None,
+        removed: Optional[LedgerEntry] = None
+    ) -> None:
+        """Knjiži dodanu i/ili uklonjenu stavku knjige na saldo i dnevne zbrojeve.
+
+        Kod uklanjanja stavka mora već biti flushana iz knjige, jer se zadnji
+        datum tada po potrebi ponovno čita iz tablice.
+        """
+        StockBalanceService._apply_balance(db, kind, added, removed)
+        LedgerRollupService.apply(db, kind, [
+            (entry, sign) for entry, sign in ((added, 1), (removed, -1)) if entry is not None
+        ])
+
+    @staticmethod
+    def _apply_balance(
+        db: Session,
+        kind: str,
+        added: Optional[LedgerEntry] = None,
+        removed: Optional[LedgerEntry] = None
+    ) -> None:
+        ledger = LEDGERS[kind]
+        material_ids = sorted({entry.material_id for entry in (added, removed) if entry is not None})
+
+        # Zaključavanje uvijek istim redom da se izbjegne deadlock
+        for material_id in material_ids:
+            balance = StockBalanceService._lock(db, material_id)
+            quantity = getattr(balance, ledger.quantity_field) or 0.0
+            last_date = getattr(balance, ledger.last_date_field)
+            refresh_date = False
+
+            if removed is not None and removed.material_id == material_id:
+                quantity -= removed.quantity
+                if last_date is not None and removed.date >= last_date:
+                    refresh_date = True
+
+            if added is not None and added.material_id == material_id:
+                quantity += added.quantity
+                if last_date is None or added.date > last_date:
+                    last_date = added.date
+
+            if refresh_date:
+                last_date = db.query(func.max(ledger.date_column)).filter(
+                    ledger.model.material_id == material_id
+                ).scalar()
+
+            setattr(balance, ledger.quantity_field, quantity)
+            setattr(balance, ledger.last_date_field, last_date)
+
+    @staticmethod
+    def apply_many(db: Session, kind: str, entries: Iterable[LedgerEntry]) -> None:
+        """Knjiži veći broj novih stavki jednim upsertom po tablici (skupni uvoz)"""
+        ledger = LEDGERS[kind]
+        entries = list(entries)
+        LedgerRollupService.apply(db, kind, [(entry, 1) for entry in entries])
+        totals: dict[int, list] = {}
+        for entry in entries:
+            total = totals.setdefault(entry.material_id, [0.0, entry.date])
+            total[0] += entry.quantity
+            if entry.date > total[1]:
+                total[1] = entry.date
+        if not totals:
+            return
+
+        statement = dialect_insert(db, StockBalance)
+        if statement is None:
+            for material_id, (quantity, last_date) in sorted(totals.items()):
+                StockBalanceService._apply_balance(db, kind, added=LedgerEntry(material_id, quantity, last_date))
+            return
+
+        # Redci idu sortirani po materijalu, isti redoslijed zaključavanja kao apply
+        statement = statement.values([
+            {"material_id": material_id, ledger.quantity_field: quantity, ledger.last_date_field: last_date}
+            for material_id, (quantity, last_date) in sorted(totals.items())
+        ])
+        quantity_column = getattr(StockBalance, ledger.quantity_field)
+        last_date_column = getattr(StockBalance, ledger.last_date_field)
+        new_last_date = getattr(statement.excluded, ledger.last_date_field)
+        db.execute(statement.on_conflict_do_update(
+            index_elements=["material_id"],
+            set_={
+                ledger.quantity_field: quantity_column + getattr(statement.excluded, ledger.quantity_field),
+                ledger.last_date_field: case(
+                    (last_date_column.is_(None), new_last_date),
+                    (new_last_date > last_date_column, new_last_date),
+                    else_=last_date_column,
+                ),
+                "updated_at": func.now(),
+            },
+        ))
+
+    @staticmethod
+    def _ledger_totals(kind: str, until: Optional[datetime] = None, material_ids=None):
+        ledger = LEDGERS[kind]
+        query = select(
+            ledger.model.material_id.label("material_id"),
+            func.sum(ledger.model.quantity).label("quantity"),
+            func.max(ledger.date_column).label("last_date"),
+        ).group_by(ledger.model.material_id)
+        if until is not None:
+            query = query.where(ledger.date_column < until)
+        if material_ids is not None:
+            query = query.where(ledger.model.material_id.in_(material_ids))
+        return query.subquery()
+
+    @staticmethod
+    def ledger_query(until: Optional[datetime] = None, material_ids=None):
+        """Saldo izračunat iz knjige po materijalu (opcionalno samo stavke prije `until`)"""
+        receipts = StockBalanceService._ledger_totals("receipt", until, material_ids)
+        consumptions = StockBalanceService._ledger_totals("consumption", until, material_ids)
+        return (
+            select(
+                Material.id.label("material_id"),
+                func.coalesce(receipts.c.quantity, 0.0).label("received_quantity"),
+                func.coalesce(consumptions.c.quantity, 0.0).label("consumed_quantity"),
+                receipts.c.last_date.label("last_receipt_date"),
+                consumptions.c.last_date.label("last_consumption_date"),
+            )
+            .outerjoin(receipts, receipts.c.material_id == Material.id)
+            .outerjoin(consumptions, consumptions.c.material_id == Material.id)
+        )
+
+    @staticmethod
+    def rebuild(db: Session) -> int:
+        """Ponovno gradi sve salde iz knjige (set-based), vraća broj salda"""
+        ledger = StockBalanceService.ledger_query().subquery()
+        db.execute(delete(StockBalance))
+        db.execute(
+            insert(StockBalance).from_select(
+                ["material_id", "received_quantity", "consumed_quantity", "last_receipt_date", "last_consumption_date"],
+                select(
+                    ledger.c.material_id,
+                    ledger.c.received_quantity,
+                    ledger.c.consumed_quantity,
+                    ledger.c.last_receipt_date,
+                    ledger.c.last_consumption_date,
+                )
+            )
+        )
+        db.commit()
+        return db.query(func.count(StockBalance.material_id)).scalar()
+
+    @staticmethod
+    def verify(db: Session) -> list[dict]:
+        """Uspoređuje salde s knjigom, vraća listu odstupanja"""
+        ledger = StockBalanceService.ledger_query().subquery()
+        rows = db.execute(
+            select(ledger, StockBalance).outerjoin(
+                StockBalance, StockBalance.material_id == ledger.c.material_id
+            )
+        )
+
+        mismatches = []
+        for row in rows:
+            balance = row.StockBalance
+            expected = {
+                "received_quantity": float(row.received_quantity),
+                "consumed_quantity": float(row.consumed_quantity),
+                "last_receipt_date": row.last_receipt_date,
+                "last_consumption_date": row.last_consumption_date,
+            }
+            if balance is None:
+                actual = {
+                    "received_quantity": 0.0,
+                    "consumed_quantity": 0.0,
+                    "last_receipt_date": None,
+                    "last_consumption_date": None,
+                }
+            else:
+                actual = {field: getattr(balance, field) for field in expected}
+
+            differs = any(
+                abs((actual[field] or 0.0) - expected[field]) > BALANCE_TOLERANCE
+                for field in ("received_quantity", "consumed_quantity")
+            ) or any(
+                actual[field] != expected[field]
+                for field in ("last_receipt_date", "last_consumption_date")
+            )
+            if differs:
+                mismatches.append({"material_id": row.material_id, "expected": expected, "actual": actual})
+        return mismatches
@@ -0,0 +1,139 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable, Optional
+from sqlalchemy.orm import Session
+from sqlalchemy import func, case, select
+from ..models.material import Material
+from ..models.stock_balance import StockBalance
+
+# Zaliha na ili ispod ovog udjela sigurnosne zalihe je kritična
+CRITICAL_STOCK_RATIO = 0.5
+# Buffer za sigurnost na preporučenu narudžbu (20%)
+RECOMMENDED_PO_BUFFER = 1.2
+
+
+@dataclass
+class MaterialStock:
+    """Materijal s izračunatim stanjem zaliha"""
+    material: Material
+    current_stock: float
+    recommended_po: float
+    stock_status: str
+    last_receipt_date: Optional[datetime] = None
+    last_consumption_date: Optional[datetime] = None
+
+
+def classify_stock(current_stock: float, safety_stock: Optional[float]) -> str:
+    """Određuje status zaliha (normal, low, critical)"""
+    safety_stock = safety_stock or 0.0
+    if current_stock <= safety_stock * CRITICAL_STOCK_RATIO:
+        return "critical"
+    elif current_stock <= safety_stock:
+        return "low"
+    return "normal"
+
+
+def recommend_order(current_stock: float, safety_stock: Optional[float], monthly_forecast: Optional[float]) -> float:
+    """Preporučena narudžba = (sigurnosna zaliha + mjesečni forecast - trenutna zaliha) * buffer"""
+    recommended = (safety_stock or 0.0) + (monthly_forecast or 0.0) - current_stock
+    return max(0.0, recommended * RECOMMENDED_PO_BUFFER)
+
+
+class StockEngine:
+    """Skupni izračun zaliha za proizvoljan skup materijala.
+
+    Zalihe se čitaju iz materijaliziranog salda (stock_balances) spojenog na
+    materijale, pa je broj upita konstantan bez obzira na broj materijala i
+    duljinu knjige prijema i utrošaka.
+    """
+
+    @staticmethod
+    def _build(material_ids: Optional[Iterable[int]] = None):
+        """Vraća (upit, izraz trenutne zalihe, izraz statusa)"""
+        # Trenutna zaliha = početna zaliha + prijemi - utrošak (ne može biti negativna)
+        raw_stock = (
+            func.coalesce(Material.opening_stock, 0.0)
+            + func.coalesce(StockBalance.received_quantity, 0.0)
+            - func.coalesce(StockBalance.consumed_quantity, 0.0)
+        )
+        current_stock = case((raw_stock < 0, 0.0), else_=raw_stock)
+
+        safety_stock = func.coalesce(Material.safety_stock, 0.0)
+        stock_status = case(
+            (current_stock <= safety_stock * CRITICAL_STOCK_RATIO, "critical"),
+            (current_stock <= safety_stock, "low"),
+            else_="normal",
+        )
+
+        query = select(
+            Material,
+            current_stock.label("current_stock"),
+            StockBalance.last_receipt_date,
+            StockBalance.last_consumption_date,
+        ).outerjoin(StockBalance, StockBalance.material_id == Material.id)
+        if material_ids is not None:
+            query = query.where(Material.id.in_(list(material_ids)))
+        return query, current_stock, stock_status
+
+    @staticmethod
+    def _evaluate(row) -> MaterialStock:
+        material = row.Material
+        current_stock = float(row.current_stock)
+        return MaterialStock(
+            material=material,
+            current_stock=current_stock,
+            recommended_po=recommend_order(current_stock, material.safety_stock, material.monthly_forecast),
+            stock_status=classify_stock(current_stock, material.safety_stock),
+            last_receipt_date=row.last_receipt_date,
+            last_consumption_date=row.last_consumption_date,
+        )
+
+    @staticmethod
+    def load(
+        db: Session,
+        *criteria,
+        material_ids: Optional[Iterable[int]] = None,
+        statuses: Optional[Iterable[str]] = None,
+    ) -> list[MaterialStock]:
+        """Vraća zalihe za materijale koji zadovoljavaju kriterije (jedan upit)"""
+        query, _, stock_status = StockEngine._build(material_ids)
+        if criteria:
+            query = query.where(*criteria)
+        if statuses is not None:
+            query = query.where(stock_status.in_(list(statuses)))
+        query = query.order_by(Material.id)
+        return [StockEngine._evaluate(row) for row in db.execute(query)]
+
+    @staticmethod
+    def get(db: Session, material_id: int) -> Optional[MaterialStock]:
+        """Vraća zalihu jednog materijala"""
+        stocks = StockEngine.load(db, material_ids=[material_id])
+        return stocks[0] if stocks else None
+
+    @staticmethod
+    def count(db: Session, *criteria, statuses: Optional[Iterable[str]] = None) -> int:
+        """Broji materijale po kriterijima i statusu zaliha (jedan upit)"""
+        query, _, stock_status = StockEngine._build()
+        query = query.with_only_columns(func.count(Material.id))
+        if criteria:
+            query = query.where(*criteria)
+        if statuses is not None:
+            query = query.where(stock_status.in_(list(statuses)))
+        return db.execute(query).scalar() or 0
+
+    @staticmethod
+    def count_by_status(db: Session, *criteria, group_by=None) -> list:
+        """Broj materijala po statusu zaliha (i opcionalno po stupcu), jedan GROUP BY upit.
+
+        Vraća retke (status, count) ili (group, status, count).
+        """
+        query, _, stock_status = StockEngine._build()
+        status_column = stock_status.label("stock_status")
+        columns = [status_column, func.count(Material.id).label("count")]
+        if group_by is not None:
+            columns.insert(0, group_by)
+        query = query.with_only_columns(*columns)
+        if criteria:
+            query = query.where(*criteria)
+        query = query.group_by(*([group_by] if group_by is not None else []), status_column)
+        return db.execute(query).all()
@@ -1,157 +1,192 @@
-import httpx
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from datetime import datetime
+from datetime import date, datetime
+from celery import chord
+from celery.exceptions import MaxRetriesExceededError
 from sqlalchemy.orm import Session
 from .celery_app import celery_app
-from .core.database import SessionLocal
+from .core.database import SessionLocal, id_ranges
 from .core.config import settings
-from .services.material_service import MaterialService
+from .core.cache import response_cache, TAG_MATERIALS
 from .models.material import Material
+from .services.forecast_service import ForecastService
+from .services.snapshot_service import StockSnapshotService
+
+
+def _merge_summaries(summaries: list[dict]) -> dict:
+    """Zbraja brojeve iz sažetaka dijelova; ostale vrijednosti uzima iz prvog"""
+    merged: dict = {}
+    for summary in summaries:
+        for key, value in summary.items():
+            if isinstance(value, dict):
+                merged[key] = _merge_summaries([merged.get(key, {}), value])
+            elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                merged[key] = merged.get(key, 0) + value
+            else:
+                merged.setdefault(key, value)
+    return merged
+
+
+def _merge_chunks(results: list[dict]) -> dict:
+    """Rezultat chorda: spojeni sažeci uspješnih dijelova i greške ostalih"""
+    errors = [result["message"] for result in results if result["status"] == "error"]
+    data = _merge_summaries([result["data"] for result in results if result["status"] == "success"])
+    if not errors:
+        return {"status": "success", "chunks": len(results), "data": data}
+    status = "partial" if len(errors) < len(results) else "error"
+    return {"status": status, "chunks": len(results), "failed": len(errors), "message": errors[0], "data": data}
 
 
 @celery_app.task
-def sync_with_erp():
-    """Noćna sync funkcija prema ERP sustavu (placeholder)"""
+def sync_with_erp(full: bool = False):
+    """Noćna sinkronizacija dobavljača, materijala i cijena iz ERP-a"""
+    # httpx i pydantic sheme feeda učitavaju se tek pri prvoj sinkronizaciji
+    from .services.erp_sync_service import ErpSyncService
+
+    db = SessionLocal()
     try:
-        # Placeholder za ERP sync
-        # U stvarnoj implementaciji ovdje bi bio kod za povezivanje s ERP sustavom
-        
-        # Simuliraj API poziv prema ERP-u
-        erp_endpoint = "https://erp.company.com/api/materials/sync"
-        
-        # Ovdje bi bio stvarni kod za sync
-        # response = httpx.get(erp_endpoint, timeout=30)
-        
-        print(f"ERP sync completed at {datetime.utcnow()}")
-        return {"status": "success", "message": "ERP sync completed"}
-        
+        result = ErpSyncService.run(db, full=full)
     except Exception as e:
         print(f"ERP sync failed: {str(e)}")
         return {"status": "error", "message": str(e)}
+    finally:
+        db.close()
+
+    if any(result.get("changed", {}).values()):
+        response_cache.invalidate_blocking(TAG_MATERIALS)
+    if result["status"] == "partial":
+        # Vremenski budžet je potrošen; nastavak od spremljenog watermarka
+        sync_with_erp.delay()
+
+    print(f"ERP sync {result['status']} at {datetime.utcnow()}: {result.get('changed', result.get('message'))}")
+    return result
 
 
 @celery_app.task
-def send_low_stock_notifications():
-    """Dnevno slanje obavijesti za materijale ispod sigurnosne zalihe"""
+def update_demand_forecasts(today: str = None):
+    """Forecast potrošnje iz knjige utrošaka, upisuje se u monthly_forecast.
+
+    Materijali se dijele na raspone od catalogue_chunk_size koji se računaju
+    paralelno na heavy workerima; forecasts_completed spaja sažetke.
+    """
+    today = today or datetime.utcnow().date().isoformat()
+    db = SessionLocal()
     try:
-        db = SessionLocal()
-        
-        # Dohvati materijale s niskim zalihama
-        low_stock_materials = MaterialService.get_low_stock_materials(db)
-        
-        if not low_stock_materials:
-            print("No low stock materials found")
-            return {"status": "success", "message": "No notifications sent"}
-        
-        # Pripremi poruku
-        message = "Materijali s niskim zalihama:\n\n"
-        for material in low_stock_materials:
-            message += f"- {material.code}: {material.name}\n"
-            message += f"  Trenutna zaliha: {material.current_stock} {material.unit}\n"
-            message += f"  Sigurnosna zaliha: {material.safety_stock} {material.unit}\n"
-            message += f"  Preporučena narudžba: {material.recommended_po} {material.unit}\n\n"
-        
-        # Pošalji e-mail obavijest (ako je konfiguriran)
-        if settings.smtp_server:
-            send_email_notification(message)
-        
-        # Pošalji Slack obavijest (ako je konfiguriran)
-        if settings.slack_webhook_url:
-            send_slack_notification(message)
-        
-        print(f"Low stock notifications sent for {len(low_stock_materials)} materials")
-        return {
-            "status": "success", 
-            "message": f"Notifications sent for {len(low_stock_materials)} materials"
-        }
-        
+        ranges = id_ranges(db, Material.id, settings.catalogue_chunk_size)
     except Exception as e:
-        print(f"Low stock notifications failed: {str(e)}")
+        print(f"Demand forecast failed: {str(e)}")
         return {"status": "error", "message": str(e)}
     finally:
         db.close()
 
+    chord(forecast_chunk.s(today, list(id_range)) for id_range in ranges)(forecasts_completed.s())
+    return {"status": "scheduled", "chunks": len(ranges)}
+
 
-def send_email_notification(message: str):
-    """Pošalji e-mail obavijest"""
+@celery_app.task(acks_late=True)
+def forecast_chunk(today: str, id_range: list):
+    """Forecast za jedan raspon materijala (ponovno izvođenje je sigurno)"""
+    db = SessionLocal()
     try:
-        msg = MIMEMultipart()
-        msg['From'] = settings.smtp_username
-        msg['To'] = "admin@company.com"  # U produkciji bi bio dinamički
-        msg['Subject'] = "ZenCore - Obavijest o niskim zalihama"
-        
-        msg.attach(MIMEText(message, 'plain'))
-        
-        server = smtplib.SMTP(settings.smtp_server, settings.smtp_port)
-        server.starttls()
-        server.login(settings.smtp_username, settings.smtp_password)
-        server.send_message(msg)
-        server.quit()
-        
-        print("Email notification sent successfully")
-        
+        return {"status": "success", "data": ForecastService.run(db, date.fromisoformat(today), tuple(id_range))}
     except Exception as e:
-        print(f"Email notification failed: {str(e)}")
+        db.rollback()
+        print(f"Demand forecast {id_range} failed: {str(e)}")
+        return {"status": "error", "message": str(e)}
+    finally:
+        db.close()
 
 
-def send_slack_notification(message: str):
-    """Pošalji Slack obavijest"""
+@celery_app.task
+def forecasts_completed(results: list):
+    result = _merge_chunks(results)
+    summary = result["data"]
+    if summary.get("updated_materials"):
+        response_cache.invalidate_blocking(TAG_MATERIALS)
+    print(
+        f"Demand forecast {result['status']} ({result['chunks']} chunks): {summary.get('forecasted_materials', 0)} forecasted, "
+        f"{summary.get('skipped_materials', 0)} skipped, {summary.get('updated_materials', 0)} materials updated"
+    )
+    return result
+
+
+@celery_app.task(bind=True, max_retries=settings.notification_task_retries)
+def send_low_stock_notifications(self):
+    """Obavijesti o promjenama statusa zaliha od prethodnog slanja"""
+    # smtplib, email i httpx (Slack) učitavaju se tek pri slanju
+    from .services.notification_service import NotificationService
+
+    db = SessionLocal()
     try:
-        slack_data = {
-            "text": f"🚨 *ZenCore - Obavijest o niskim zalihama*\n\n{message}"
-        }
-        
-        response = httpx.post(
-            settings.slack_webhook_url,
-            json=slack_data,
-            timeout=10
-        )
-        
-        if response.status_code == 200:
-            print("Slack notification sent successfully")
-        else:
-            print(f"Slack notification failed: {response.status_code}")
-            
+        result = NotificationService.notify_transitions(db)
     except Exception as e:
-        print(f"Slack notification failed: {str(e)}")
+        db.rollback()
+        print(f"Low stock notifications failed: {str(e)}")
+        return {"status": "error", "message": str(e)}
+    finally:
+        db.close()
+
+    print(f"Low stock notifications: {result}")
+    if result.get("pending"):
+        # Neposlani materijali ostaju u stanju za ponovni pokušaj
+        try:
+            raise self.retry(countdown=60 * 2 ** self.request.retries)
+        except MaxRetriesExceededError:
+            return result
+    return result
 
 
 @celery_app.task
-def daily_report():
-    """Dnevni izvještaj o stanju zaliha"""
+def daily_report(snapshot_date: str = None, full: bool = False):
+    """Dnevni snimak stanja zaliha (inkrementalno, od prethodnog snimka).
+
+    Prethodni snimak utvrđuje se jednom, a aktivni materijali dijele na
+    raspone koji se grade paralelno; snapshot_completed spaja sažetke.
+    """
+    db = SessionLocal()
     try:
-        db = SessionLocal()
-        
-        # Dohvati sve aktivne materijale
-        materials = db.query(Material).filter(Material.is_active == True).all()
-        
-        report_data = {
-            "date": datetime.utcnow().isoformat(),
-            "total_materials": len(materials),
-            "materials_summary": []
-        }
-        
-        for material in materials:
-            current_stock = MaterialService.calculate_current_stock(db, material.id)
-            stock_status = MaterialService.get_stock_status(db, material.id)
-            
-            report_data["materials_summary"].append({
-                "code": material.code,
-                "name": material.name,
-                "current_stock": current_stock,
-                "safety_stock": material.safety_stock,
-                "status": stock_status
-            })
-        
-        # Ovdje bi se report spremio u bazu ili poslao na e-mail
-        print(f"Daily report generated for {len(materials)} materials")
-        
-        return {"status": "success", "data": report_data}
-        
+        day = date.fromisoformat(snapshot_date) if snapshot_date else datetime.utcnow().date()
+        previous_date, previous_run = (None, None) if full else StockSnapshotService.previous_snapshot(db, day)
+        ranges = id_ranges(db, Material.id, settings.catalogue_chunk_size, Material.is_active == True)
     except Exception as e:
         print(f"Daily report failed: {str(e)}")
         return {"status": "error", "message": str(e)}
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+    previous = [value.isoformat() if value else None for value in (previous_date, previous_run)]
+    chord(
+        build_snapshot_chunk.s(day.isoformat(), full, previous, list(id_range)) for id_range in ranges
+    )(snapshot_completed.s())
+    return {"status": "scheduled", "snapshot_date": day.isoformat(), "chunks": len(ranges)}
+
+
+@celery_app.task(acks_late=True)
+def build_snapshot_chunk(snapshot_date: str, full: bool, previous: list, id_range: list):
+    """Dnevni snimak za jedan raspon materijala (ponovno izvođenje je sigurno)"""
+    previous_date, previous_run = previous
+    db = SessionLocal()
+    try:
+        summary = StockSnapshotService.build(
+            db, date.fromisoformat(snapshot_date), full=full, id_range=tuple(id_range),
+            previous=(
+                date.fromisoformat(previous_date) if previous_date else None,
+                datetime.fromisoformat(previous_run) if previous_run else None,
+            ),
+        )
+        return {"status": "success", "data": summary}
+    except Exception as e:
+        db.rollback()
+        print(f"Daily report {id_range} failed: {str(e)}")
+        return {"status": "error", "message": str(e)}
+    finally:
+        db.close()
+
+
+@celery_app.task
+def snapshot_completed(results: list):
+    result = _merge_chunks(results)
+    summary = result["data"]
+    print(
+        f"Daily report {summary.get('snapshot_date')} {result['status']} ({result['chunks']} chunks): "
+        f"{summary.get('recomputed', 0)} recomputed, {summary.get('copied', 0)} copied from {summary.get('previous_snapshot_date')}"
+    )
+    return result
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Benchmark API-ja nad sintetičkim podacima
+
+    python benchmark.py seed --materials 10000 --receipts 1000000 --consumptions 2000000 [--reset]
+    python benchmark.py run [--router dashboard] [--scenario materials_search] [--iterations 50]
+    python benchmark.py run --url http://localhost:8000   # pokrenuti server (SERVER_TIMING_HEADER=true)
+    python benchmark.py compare benchmarks/results/stari.json benchmarks/results/novi.json
+    python benchmark.py startup [--runs 5] [--profile]
+
+`run` izvodi scenarije za svaki router (bez --url unutar procesa, bez
+mreže i bez response cachea osim uz --cache) i sprema p50/p95/p99 i broj
+SQL upita po zahtjevu u JSON. `compare` vraća izlazni kod 1 ako je neki
+scenarij sporiji od praga ili radi više upita. `startup` mjeri cold start:
+import API-ja i Celery workera te vrijeme od pokretanja uvicorna do prvog
+odgovora, uz raspodjelu vremena importa po paketima i modulima.
+"""
+
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import os
+from datetime import datetime
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import httpx
+from app.core.auth import create_access_token
+from app.core.config import settings
+from app.core.database import SessionLocal
+from benchmarks.dataset import BENCH_USERNAME, DatasetSpec, ensure_user, generate, reset
+from benchmarks.runner import compare, run_scenario, summarize
+from benchmarks.scenarios import Context, select_scenarios
+from benchmarks.startup import STARTUP_MODULES, first_request_seconds, import_profile, import_seconds, summarize_profile
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks", "results")
+
+
+def seed(args) -> int:
+    spec = DatasetSpec(
+        materials=args.materials, vendors=args.vendors, receipts=args.receipts,
+        consumptions=args.consumptions, days=args.days, seed=args.seed,
+    )
+    db = SessionLocal()
+    try:
+        if args.reset:
+            reset(db)
+        counts = generate(db, spec)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        db.close()
+    print(f"✅ Sintetički podaci upisani: {counts}")
+    return 0
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def _run(args, scenarios, context: Context) -> dict:
+    token = args.token or create_access_token({"sub": BENCH_USERNAME})
+    headers = {"Authorization": f"Bearer {token}"}
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, headers=headers, timeout=args.timeout)
+    else:
+        from app.core.cache import response_cache
+        from app.main import app
+
+        settings.server_timing_header = True
+        settings.slow_request_ms = 0
+        response_cache.enabled = args.cache
+        # Greške aplikacije vraćaju se kao 500 i broje u scenariju
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        client = httpx.AsyncClient(transport=transport, base_url="http://benchmark", headers=headers, timeout=args.timeout)
+
+    results = {}
+    async with client:
+        for scenario in scenarios:
+            result = await run_scenario(
+                client, scenario, context, args.iterations,
+                concurrency=args.concurrency, warmup=args.warmup, seed=args.seed,
+            )
+            results[scenario.name] = {"router": scenario.router, **result}
+            print(
+                f"{scenario.name:<38} p50 {result['p50_ms']:>8} ms  p95 {result['p95_ms']:>8} ms  "
+                f"p99 {result['p99_ms']:>8} ms  upiti {result['queries_per_request']}  greške {result['errors']}"
+            )
+    return results
+
+
+def run(args) -> int:
+    try:
+        scenarios = select_scenarios(args.scenario, args.router, writes=not args.read_only)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+
+    db = SessionLocal()
+    try:
+        context = Context.load(db)
+        dataset = Context.dataset(db)
+        ensure_user(db)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        db.close()
+
+    started_at = datetime.utcnow()
+    results = asyncio.run(_run(args, scenarios, context))
+    report = {
+        "meta": {
+            "started_at": started_at.isoformat(),
+            "commit": _git_commit(),
+            "target": args.url or "in-process",
+            "response_cache": args.cache if not args.url else None,
+            "iterations": args.iterations,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+            "dataset": dataset,
+        },
+        "scenarios": results,
+    }
+
+    _save(report, args.output or os.path.join(RESULTS_DIR, f"{started_at:%Y%m%d-%H%M%S}.json"))
+    return 0
+
+
+def _save(report: dict, output: str) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"✅ Rezultati spremljeni u {output}")
+
+
+def startup(args) -> int:
+    started_at = datetime.utcnow()
+    measurements = {f"startup_{name}_import": [] for name in STARTUP_MODULES}
+    measurements["startup_api_first_request"] = []
+    failures = 0
+    for _ in range(args.runs):
+        for name, module in STARTUP_MODULES.items():
+            measurements[f"startup_{name}_import"].append(import_seconds(module) * 1000)
+        seconds = first_request_seconds(timeout=args.timeout)
+        if seconds is None:
+            failures += 1
+        else:
+            measurements["startup_api_first_request"].append(seconds * 1000)
+
+    results = {}
+    for name, latencies in measurements.items():
+        statuses = {200: len(latencies)}
+        if name == "startup_api_first_request" and failures:
+            statuses[503] = failures
+        results[name] = {"router": "startup", **summarize(latencies, [], statuses, sum(latencies) / 1000)}
+        print(f"{name:<38} p50 {results[name]['p50_ms']:>8} ms  max {results[name]['max_ms']:>8} ms")
+    if failures:
+        print(f"⚠️ Server nije odgovorio u {failures} od {args.runs} pokretanja")
+
+    profiles = {}
+    if args.profile:
+        for name, module in STARTUP_MODULES.items():
+            profiles[name] = summarize_profile(import_profile(module), args.top)
+            print(f"\nImport {module}: {profiles[name]['total_ms']} ms")
+            for package, ms in profiles[name]["packages"].items():
+                print(f"  {package:<36} {ms:>8} ms")
+            print("  moduli aplikacije (ukupno s ovisnostima):")
+            for module_name, ms in profiles[name]["app_modules"].items():
+                print(f"  {module_name:<36} {ms:>8} ms")
+
+    report = {
+        "meta": {"started_at": started_at.isoformat(), "commit": _git_commit(), "target": "startup", "runs": args.runs},
+        "scenarios": results,
+        "import_profile": profiles,
+    }
+    _save(report, args.output or os.path.join(RESULTS_DIR, f"startup-{started_at:%Y%m%d-%H%M%S}.json"))
+    return 1 if failures == args.runs else 0
+
+
+def compare_results(args) -> int:
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.current, encoding="utf-8") as f:
+        current = json.load(f)
+
+    rows, regressed = compare(baseline, current, args.threshold)
+    for row in rows:
+        if row["status"] == "new":
+            print(f"{row['scenario']:<38} novi scenarij")
+            continue
+        (old_p95, new_p95), (old_queries, new_queries) = row["p95_ms"], row["queries_per_request"]
+        print(
+            f"{row['scenario']:<38} p95 {old_p95:>8} -> {new_p95:>8} ms ({row['p95_change']:+.0%})  "
+            f"upiti {old_queries} -> {new_queries}  {row['status']}"
+        )
+    if regressed:
+        print("⚠️ Pronađene regresije")
+        return 1
+    print("✅ Nema regresija")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark API-ja nad sintetičkim podacima")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    seed_parser = commands.add_parser("seed", help="generiraj sintetičke podatke")
+    defaults = DatasetSpec()
+    seed_parser.add_argument("--materials", type=int, default=defaults.materials)
+    seed_parser.add_argument("--vendors", type=int, default=defaults.vendors)
+    seed_parser.add_argument("--receipts", type=int, default=defaults.receipts)
+    seed_parser.add_argument("--consumptions", type=int, default=defaults.consumptions)
+    seed_parser.add_argument("--days", type=int, default=defaults.days, help="dana povijesti knjige")
+    seed_parser.add_argument("--seed", type=int, default=defaults.seed)
+    seed_parser.add_argument("--reset", action="store_true", help="prvo obriši materijale, dobavljače i knjigu")
+
+    run_parser = commands.add_parser("run", help="izvedi scenarije i spremi rezultate")
+    run_parser.add_argument("--url", help="URL pokrenutog servera (bez toga unutar procesa)")
+    run_parser.add_argument("--token", help="JWT token (bez toga se izdaje za bench_admin)")
+    run_parser.add_argument("--scenario", action="append", help="samo navedeni scenariji (može više puta)")
+    run_parser.add_argument("--router", action="append", help="samo scenariji navedenog routera")
+    run_parser.add_argument("--read-only", action="store_true", help="bez scenarija upisa")
+    run_parser.add_argument("--iterations", type=int, default=50)
+    run_parser.add_argument("--warmup", type=int, default=2)
+    run_parser.add_argument("--concurrency", type=int, default=1)
+    run_parser.add_argument("--cache", action="store_true", help="response cache ostaje uključen")
+    run_parser.add_argument("--timeout", type=float, default=60.0)
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--output", help="JSON datoteka rezultata")
+
+    compare_parser = commands.add_parser("compare", help="usporedi dva rezultata")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.2, help="dopušteni rast p95 (0.2 = 20%%)")
+
+    startup_parser = commands.add_parser("startup", help="izmjeri cold start API-ja i workera")
+    startup_parser.add_argument("--runs", type=int, default=5)
+    startup_parser.add_argument("--profile", action="store_true", help="raspodjela vremena importa po modulima")
+    startup_parser.add_argument("--top", type=int, default=20, help="broj paketa i modula u profilu")
+    startup_parser.add_argument("--timeout", type=float, default=60.0, help="sekunde čekanja na prvi odgovor")
+    startup_parser.add_argument("--output", help="JSON datoteka rezultata")
+
+    args = parser.parse_args()
+    handlers = {"seed": seed, "run": run, "compare": compare_results, "startup": startup}
+    sys.exit(handlers[args.command](args))
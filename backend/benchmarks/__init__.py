@@ -0,0 +1 @@
+"""Benchmark API-ja: sintetički podaci (dataset) i scenariji po routerima (scenarios), pokreće ih benchmark.py"""
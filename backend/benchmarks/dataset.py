@@ -0,0 +1,235 @@
+import csv
+import io
+import random
+import time
+from datetime import date, datetime, timedelta
+from typing import Callable, Iterator, NamedTuple
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.orm import Session
+from app.core.auth import get_password_hash
+from app.models import Consumption, Material, Offer, PurchaseOrder, Receipt, User, Vendor
+from app.models.material import Category, Form, ItemType, RegulatoryStatus
+
+# Korisnik kojim se benchmark prijavljuje
+BENCH_USERNAME = "bench_admin"
+BENCH_PASSWORD = "bench_admin"
+
+# Redaka po jednom COPY / INSERT-u
+CHUNK_SIZE = 50_000
+
+COMPONENTS = (
+    "ashwagandha", "rhodiola", "magnezij", "cink", "selen", "željezo", "kalcij", "vitamin C", "vitamin D3",
+    "vitamin B12", "omega-3", "kurkuma", "ginseng", "kolagen", "lecitin", "kofein", "melatonin", "koenzim Q10",
+    "spirulina", "maca", "bacopa", "lavanda", "menta", "naranča", "limun",
+)
+QUALIFIERS = ("ekstrakt", "prah", "standardizirani", "organski", "mikronizirani", "liposomalni", "citrat", "glicinat")
+UNITS = ("kg", "g", "kom", "l")
+
+# Tablice koje generator puni, redoslijed brisanja (ovisne prve)
+TABLES = (
+    "ledger_category_rollups", "ledger_daily_rollups", "stock_balances", "demand_forecasts", "stock_snapshots",
+    "consumptions", "receipts", "purchase_orders", "offers", "materials", "vendors",
+)
+
+
+class DatasetSpec(NamedTuple):
+    materials: int = 10_000
+    vendors: int = 200
+    receipts: int = 1_000_000
+    consumptions: int = 2_000_000
+    days: int = 730  # povijest knjige do jučer
+    seed: int = 42
+
+
+def _hot_index(rnd: random.Random, count: int) -> int:
+    """Neravnomjerna raspodjela: mali dio materijala ima većinu prometa"""
+    return int(count * rnd.random() ** 3)
+
+
+def _vendors(spec: DatasetSpec, rnd: random.Random) -> Iterator[dict]:
+    for i in range(1, spec.vendors + 1):
+        yield {
+            "id": i, "code": f"V{i:05d}", "name": f"Dobavljač {i}", "contact_person": f"Kontakt {i}",
+            "email": f"nabava{i}@dobavljac.hr", "phone": f"+385 1 {rnd.randint(1000000, 9999999)}",
+            "is_active": rnd.random() > 0.05,
+        }
+
+
+def _materials(spec: DatasetSpec, rnd: random.Random) -> Iterator[dict]:
+    categories, forms, statuses = list(Category), list(Form), list(RegulatoryStatus)
+    for i in range(1, spec.materials + 1):
+        component = rnd.choice(COMPONENTS)
+        qualifier = rnd.choice(QUALIFIERS)
+        moq = rnd.choice((None, 1.0, 5.0, 25.0))
+        yield {
+            "id": i, "code": f"M{i:06d}", "name": f"{component.capitalize()} {qualifier} {i}",
+            "item_type": ItemType.SERVICE if rnd.random() < 0.1 else ItemType.MATERIAL,
+            "material_component": component, "category": rnd.choice(categories), "form": rnd.choice(forms),
+            "description": f"{qualifier} {component}, serija {rnd.randint(1, 99)}", "unit": rnd.choice(UNITS),
+            "opening_stock": float(rnd.randint(0, 200)), "unit_price": round(rnd.uniform(0.5, 250.0), 2),
+            "vendor_id": rnd.randint(1, spec.vendors), "has_coa": rnd.random() < 0.6,
+            "minimum_order_quantity": moq, "safety_stock": float(rnd.randint(0, 100)),
+            "monthly_forecast": float(rnd.randint(0, 300)), "delivery_time_days": rnd.choice((None, 7, 14, 30, 45)),
+            "regulatory_status": rnd.choice(statuses), "is_active": rnd.random() > 0.03,
+        }
+
+
+def _receipts(spec: DatasetSpec, rnd: random.Random, start: datetime) -> Iterator[dict]:
+    seconds = spec.days * 86400
+    for i in range(1, spec.receipts + 1):
+        quantity = float(rnd.randint(1, 500))
+        unit_price = round(rnd.uniform(0.5, 250.0), 2)
+        yield {
+            "id": i, "receipt_number": f"R{i:09d}", "material_id": _hot_index(rnd, spec.materials) + 1,
+            "vendor_id": rnd.randint(1, spec.vendors), "quantity": quantity, "unit_price": unit_price,
+            "total_amount": round(quantity * unit_price, 2),
+            "receipt_date": start + timedelta(seconds=rnd.randrange(seconds)),
+            "batch_number": f"B{rnd.randint(1, 99999):05d}",
+        }
+
+
+def _consumptions(spec: DatasetSpec, rnd: random.Random, start: datetime) -> Iterator[dict]:
+    seconds = spec.days * 86400
+    for i in range(1, spec.consumptions + 1):
+        yield {
+            "id": i, "consumption_number": f"C{i:09d}", "material_id": _hot_index(rnd, spec.materials) + 1,
+            "quantity": float(rnd.randint(1, 120)),
+            "consumption_date": start + timedelta(seconds=rnd.randrange(seconds)),
+            "project": f"RN-{rnd.randint(1, 500)}", "cost_center": f"CT{rnd.randint(1, 20)}",
+        }
+
+
+def _offers(spec: DatasetSpec, rnd: random.Random, start: datetime) -> Iterator[dict]:
+    for i in range(1, spec.materials // 2 + 1):
+        yield {
+            "id": i, "offer_number": f"O{i:07d}", "material_id": rnd.randint(1, spec.materials),
+            "vendor_id": rnd.randint(1, spec.vendors), "unit_price": round(rnd.uniform(0.5, 250.0), 2),
+            "quantity": float(rnd.randint(10, 1000)), "status": rnd.choice(("active", "expired", "accepted")),
+            "valid_until": start + timedelta(days=spec.days + rnd.randint(-60, 60)),
+        }
+
+
+def _purchase_orders(spec: DatasetSpec, rnd: random.Random, start: datetime) -> Iterator[dict]:
+    for i in range(1, spec.materials + 1):
+        quantity = float(rnd.randint(10, 1000))
+        unit_price = round(rnd.uniform(0.5, 250.0), 2)
+        order_date = start + timedelta(days=rnd.randrange(spec.days))
+        yield {
+            "id": i, "po_number": f"PO{i:07d}", "material_id": _hot_index(rnd, spec.materials) + 1,
+            "vendor_id": rnd.randint(1, spec.vendors), "quantity": quantity, "unit_price": unit_price,
+            "total_amount": round(quantity * unit_price, 2), "order_date": order_date,
+            "expected_delivery": order_date + timedelta(days=rnd.choice((7, 14, 30))),
+            "status": rnd.choice(("pending", "confirmed", "delivered", "cancelled")),
+        }
+
+
+def _chunks(rows: Iterator[dict], size: int) -> Iterator[list[dict]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _copy(db: Session, table, rows: list[dict]) -> None:
+    """COPY FROM STDIN (PostgreSQL); vrijednosti prolaze bind procesore stupaca (npr. enum)"""
+    columns = list(rows[0])
+    dialect = db.get_bind().dialect
+    processors = [table.c[column].type.bind_processor(dialect) for column in columns]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        values = []
+        for column, processor in zip(columns, processors):
+            value = row[column]
+            if processor is not None and value is not None:
+                value = processor(value)
+            values.append(value)
+        writer.writerow(values)
+    buffer.seek(0)
+    cursor = db.connection().connection.driver_connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+
+
+def _load(db: Session, model, rows: Iterator[dict], log: Callable[[str], None]) -> int:
+    table = model.__table__
+    postgres = db.get_bind().dialect.name == "postgresql"
+    total = 0
+    start = time.perf_counter()
+    for chunk in _chunks(rows, CHUNK_SIZE):
+        if postgres:
+            _copy(db, table, chunk)
+        else:
+            db.execute(insert(table), chunk)
+        total += len(chunk)
+    if postgres:
+        # Eksplicitni id-evi: sekvenca nastavlja iza njih
+        db.execute(text(f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), (SELECT max(id) FROM {table.name}))"))
+    log(f"{table.name}: {total} redaka ({time.perf_counter() - start:.1f}s)")
+    return total
+
+
+def reset(db: Session) -> None:
+    """Briše podatke koje generator puni (korisnici ostaju)"""
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text(f"TRUNCATE {', '.join(TABLES)} RESTART IDENTITY CASCADE"))
+    else:
+        for table in TABLES:
+            db.execute(text(f"DELETE FROM {table}"))
+    db.commit()
+
+
+def ensure_user(db: Session) -> None:
+    if db.scalar(select(User.id).where(User.username == BENCH_USERNAME)) is None:
+        db.add(User(
+            username=BENCH_USERNAME, email=f"{BENCH_USERNAME}@zencore.hr",
+            hashed_password=get_password_hash(BENCH_PASSWORD), role="admin", is_superuser=True,
+        ))
+        db.commit()
+
+
+def generate(db: Session, spec: DatasetSpec, today: date = None, log: Callable[[str], None] = print) -> dict:
+    """Puni bazu sintetičkim podacima; isti seed i isti dan daju iste retke.
+
+    Knjiga se upisuje direktno (COPY na PostgreSQL-u), a saldi i dnevni
+    zbrojevi se zatim grade set-based, kao `stock_balances.py rebuild`.
+    """
+    from app.services.ledger_rollup_service import LedgerRollupService
+    from app.services.stock_balance_service import StockBalanceService
+
+    if db.scalar(select(func.count()).select_from(Material)):
+        raise ValueError("Baza već sadrži materijale; za ponovno punjenje koristi --reset")
+
+    today = today or datetime.utcnow().date()
+    start = datetime.combine(today - timedelta(days=spec.days), datetime.min.time())
+    # Svaka tablica ima svoj generator, pa promjena broja jednih ne mijenja druge
+    streams = (
+        (Vendor, _vendors(spec, random.Random(f"{spec.seed}:vendors"))),
+        (Material, _materials(spec, random.Random(f"{spec.seed}:materials"))),
+        (Offer, _offers(spec, random.Random(f"{spec.seed}:offers"), start)),
+        (PurchaseOrder, _purchase_orders(spec, random.Random(f"{spec.seed}:purchase_orders"), start)),
+        (Receipt, _receipts(spec, random.Random(f"{spec.seed}:receipts"), start)),
+        (Consumption, _consumptions(spec, random.Random(f"{spec.seed}:consumptions"), start)),
+    )
+    counts = {}
+    for model, rows in streams:
+        counts[model.__tablename__] = _load(db, model, rows, log)
+    db.commit()
+
+    phase = time.perf_counter()
+    StockBalanceService.rebuild(db)
+    LedgerRollupService.rebuild(db)
+    db.commit()
+    log(f"saldi i dnevni zbrojevi ({time.perf_counter() - phase:.1f}s)")
+    ensure_user(db)
+
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("ANALYZE"))
+        db.commit()
+    return counts
@@ -0,0 +1,104 @@
+import asyncio
+import math
+import random
+import re
+import time
+from typing import Optional
+import httpx
+from .scenarios import Context, Scenario
+
+# Broj upita iz Server-Timing headera (app.core.request_metrics.server_timing)
+QUERIES_PATTERN = re.compile(r'desc="(\d+) queries"')
+
+# Promjene p95 manje od ovoga (ms) su šum, ne regresija
+NOISE_FLOOR_MS = 5.0
+
+
+def percentile(values: list[float], fraction: float) -> Optional[float]:
+    """Percentil metodom najbližeg ranga"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def summarize(latencies: list[float], queries: list[int], statuses: dict[int, int], elapsed: float) -> dict:
+    """Sažetak jednog scenarija (latencije u ms)"""
+    count = len(latencies)
+    errors = sum(count for status, count in statuses.items() if status >= 400)
+    return {
+        "requests": count,
+        "errors": errors,
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "throughput_rps": round(count / elapsed, 2) if elapsed else None,
+        "mean_ms": round(sum(latencies) / count, 2) if count else None,
+        "p50_ms": round(percentile(latencies, 0.50), 2) if count else None,
+        "p95_ms": round(percentile(latencies, 0.95), 2) if count else None,
+        "p99_ms": round(percentile(latencies, 0.99), 2) if count else None,
+        "max_ms": round(max(latencies), 2) if count else None,
+        "queries_per_request": round(sum(queries) / len(queries), 2) if queries else None,
+        "max_queries": max(queries) if queries else None,
+    }
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    context: Context,
+    iterations: int,
+    concurrency: int = 1,
+    warmup: int = 2,
+    seed: int = 0,
+) -> dict:
+    """Izvodi scenarij `iterations` puta s `concurrency` istovremenih zahtjeva"""
+    rnd = random.Random(f"{seed}:{scenario.name}")
+    latencies: list[float] = []
+    queries: list[int] = []
+    statuses: dict[int, int] = {}
+    counter = iter(range(warmup + iterations))
+
+    async def request(n: int) -> tuple[int, float, Optional[int]]:
+        body = scenario.body(rnd, context, n) if scenario.body else None
+        path = scenario.path(rnd, context)
+        start = time.perf_counter()
+        response = await client.request(scenario.method, path, json=body)
+        latency = (time.perf_counter() - start) * 1000
+        match = QUERIES_PATTERN.search(response.headers.get("server-timing", ""))
+        return response.status_code, latency, int(match.group(1)) if match else None
+
+    for n in range(warmup):
+        await request(next(counter))
+
+    async def worker() -> None:
+        for n in counter:
+            status, latency, query_count = await request(n)
+            latencies.append(latency)
+            statuses[status] = statuses.get(status, 0) + 1
+            if query_count is not None:
+                queries.append(query_count)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    return summarize(latencies, queries, statuses, time.perf_counter() - start)
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.2) -> tuple[list[dict], bool]:
+    """Usporedba dvaju rezultata po scenariju; regresija je rast p95 iznad praga ili više upita"""
+    rows, regressed = [], False
+    for name, new in current["scenarios"].items():
+        old = baseline["scenarios"].get(name)
+        if old is None or old.get("p95_ms") is None or new.get("p95_ms") is None:
+            rows.append({"scenario": name, "status": "new"})
+            continue
+        change = (new["p95_ms"] - old["p95_ms"]) / old["p95_ms"] if old["p95_ms"] else 0.0
+        slower = change > threshold and new["p95_ms"] - old["p95_ms"] > NOISE_FLOOR_MS
+        more_queries = (new.get("queries_per_request") or 0) > (old.get("queries_per_request") or 0) + 0.5
+        status = "regression" if slower or more_queries else ("improved" if change < -threshold else "ok")
+        regressed = regressed or status == "regression"
+        rows.append({
+            "scenario": name, "status": status,
+            "p50_ms": (old["p50_ms"], new["p50_ms"]), "p95_ms": (old["p95_ms"], new["p95_ms"]),
+            "p95_change": round(change, 3),
+            "queries_per_request": (old.get("queries_per_request"), new.get("queries_per_request")),
+        })
+    return rows, regressed
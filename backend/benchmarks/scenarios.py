@@ -0,0 +1,131 @@
+import random
+from datetime import datetime
+from typing import Callable, NamedTuple, Optional
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from app.models import Material, Vendor
+from app.models.material import Category, RegulatoryStatus
+from .dataset import COMPONENTS
+
+
+class Context(NamedTuple):
+    """Granice podataka u bazi iz kojih scenariji biraju id-eve"""
+    material_ids: tuple
+    vendor_ids: tuple
+    run_id: str
+
+    @staticmethod
+    def load(db: Session) -> "Context":
+        material_ids = db.scalars(select(Material.id).where(Material.is_active == True).order_by(Material.id)).all()
+        vendor_ids = db.scalars(select(Vendor.id).order_by(Vendor.id)).all()
+        if not material_ids or not vendor_ids:
+            raise ValueError("Baza nema materijala ni dobavljača; prvo pokreni `benchmark.py seed`")
+        return Context(tuple(material_ids), tuple(vendor_ids), datetime.utcnow().strftime("%Y%m%d%H%M%S"))
+
+    @staticmethod
+    def dataset(db: Session) -> dict:
+        """Veličine tablica za metapodatke rezultata"""
+        from app.models import Consumption, Receipt
+        return {
+            model.__tablename__: db.scalar(select(func.count()).select_from(model)) or 0
+            for model in (Material, Vendor, Receipt, Consumption)
+        }
+
+
+class Scenario(NamedTuple):
+    name: str
+    router: str
+    method: str
+    path: Callable[[random.Random, Context], str]
+    body: Optional[Callable[[random.Random, Context, int], dict]] = None
+
+    @property
+    def writes(self) -> bool:
+        return self.method != "GET"
+
+
+def _get(name: str, router: str, path) -> Scenario:
+    return Scenario(name, router, "GET", path if callable(path) else (lambda rnd, ctx: path))
+
+
+def _material(rnd: random.Random, ctx: Context) -> int:
+    return rnd.choice(ctx.material_ids)
+
+
+def _receipt(rnd: random.Random, ctx: Context, n: int) -> dict:
+    quantity = float(rnd.randint(1, 100))
+    return {
+        "receipt_number": f"BENCH-R-{ctx.run_id}-{n}", "material_id": _material(rnd, ctx),
+        "vendor_id": rnd.choice(ctx.vendor_ids), "quantity": quantity, "unit_price": 10.0,
+        "total_amount": quantity * 10.0, "receipt_date": datetime.utcnow().isoformat(),
+    }
+
+
+def _consumption(rnd: random.Random, ctx: Context, n: int) -> dict:
+    return {
+        "consumption_number": f"BENCH-C-{ctx.run_id}-{n}", "material_id": _material(rnd, ctx),
+        "quantity": float(rnd.randint(1, 20)), "consumption_date": datetime.utcnow().isoformat(),
+    }
+
+
+def _vendor(rnd: random.Random, ctx: Context, n: int) -> dict:
+    return {"code": f"BENCH-V-{ctx.run_id}-{n}", "name": f"Benchmark dobavljač {n}"}
+
+
+SCENARIOS = (
+    # Dashboard
+    _get("dashboard_summary", "dashboard", "/dashboard/summary"),
+    _get("dashboard_stock_status", "dashboard", "/dashboard/stock-status"),
+    _get("dashboard_recommendations", "dashboard", "/dashboard/recommendations?limit=100"),
+    _get("dashboard_recommendations_by_value", "dashboard", "/dashboard/recommendations?limit=100&sort=-value"),
+    _get("dashboard_trends_30d", "dashboard", "/dashboard/trends"),
+    _get("dashboard_trends_year_by_category", "dashboard", "/dashboard/trends?days=365&granularity=month&by_category=true"),
+    # Materijali
+    _get("materials_list", "materials", "/materials/?limit=100"),
+    _get("materials_list_filtered", "materials", lambda rnd, ctx: (
+        f"/materials/?limit=100&category={rnd.choice(list(Category)).name}&has_coa=true"
+    )),
+    _get("materials_list_expand_vendor", "materials", "/materials/?limit=100&expand=vendor"),
+    _get("materials_list_by_vendor", "materials", lambda rnd, ctx: f"/materials/?limit=100&vendor_id={rnd.choice(ctx.vendor_ids)}"),
+    _get("materials_search", "materials", lambda rnd, ctx: f"/materials/?limit=20&search={rnd.choice(COMPONENTS)}"),
+    _get("materials_search_prefix", "materials", lambda rnd, ctx: f"/materials/?limit=20&search=M{rnd.randint(0, 9)}{rnd.randint(0, 9)}"),
+    _get("material_detail", "materials", lambda rnd, ctx: f"/materials/{_material(rnd, ctx)}"),
+    _get("material_current_stock", "materials", lambda rnd, ctx: f"/materials/{_material(rnd, ctx)}/current-stock"),
+    _get("material_recommended_po", "materials", lambda rnd, ctx: f"/materials/{_material(rnd, ctx)}/recommended-po"),
+    _get("materials_statistics", "materials", "/materials/statistics/summary"),
+    _get("materials_by_category", "materials", lambda rnd, ctx: f"/materials/categories/{rnd.choice(list(Category)).name}/items?limit=100"),
+    _get("materials_by_regulatory_status", "materials", lambda rnd, ctx: (
+        f"/materials/regulatory/{rnd.choice(list(RegulatoryStatus)).name}/items?limit=100"
+    )),
+    # Ostali routeri
+    _get("vendors_list", "vendors", "/vendors/?limit=100"),
+    _get("vendor_detail", "vendors", lambda rnd, ctx: f"/vendors/{rnd.choice(ctx.vendor_ids)}"),
+    _get("offers_list", "offers", "/offers/?limit=100"),
+    _get("offers_list_expanded", "offers", "/offers/?limit=100&expand=material,vendor"),
+    _get("purchase_orders_list", "purchase_orders", "/purchase-orders/?limit=100&sort=-date"),
+    _get("receipts_list", "receipts", "/receipts/?limit=100&sort=-date"),
+    _get("receipts_list_expanded", "receipts", "/receipts/?limit=100&sort=-date&expand=material,vendor,purchase_order,user"),
+    _get("consumptions_list", "consumptions", "/consumptions/?limit=100&sort=-date"),
+    _get("stock_snapshots_list", "reports", "/reports/stock-snapshots?limit=100"),
+    _get("auth_me", "auth", "/auth/me"),
+    _get("health", "health", "/health"),
+    # Upisi (ostavljaju BENCH-* retke u bazi)
+    Scenario("receipt_create", "receipts", "POST", lambda rnd, ctx: "/receipts/", _receipt),
+    Scenario("consumption_create", "consumptions", "POST", lambda rnd, ctx: "/consumptions/", _consumption),
+    Scenario("vendor_create", "vendors", "POST", lambda rnd, ctx: "/vendors/", _vendor),
+    Scenario("material_update", "materials", "PUT", lambda rnd, ctx: f"/materials/{_material(rnd, ctx)}",
+             lambda rnd, ctx, n: {"notes": f"benchmark {ctx.run_id}-{n}"}),
+)
+
+
+def select_scenarios(names: Optional[list[str]] = None, routers: Optional[list[str]] = None, writes: bool = True) -> list[Scenario]:
+    """Scenariji po imenu ili routeru (bez filtera svi)"""
+    unknown = set(names or []) - {scenario.name for scenario in SCENARIOS}
+    if unknown:
+        raise ValueError(f"Nepoznati scenariji: {', '.join(sorted(unknown))}")
+    return [
+        scenario for scenario in SCENARIOS
+        if (not names or scenario.name in names)
+        and (not routers or scenario.router in routers)
+        and (writes or not scenario.writes)
+    ]
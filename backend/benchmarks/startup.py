@@ -0,0 +1,100 @@
+import os
+import re
+import socket
+import subprocess
+import sys
+import time
+from typing import NamedTuple, Optional
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Moduli čiji se cold start mjeri: API i Celery worker
+STARTUP_MODULES = {"api": "app.main", "worker": "app.tasks"}
+
+# "import time:  self [us] | cumulative | imported package" (python -X importtime)
+IMPORT_TIME_PATTERN = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+class ImportTime(NamedTuple):
+    module: str
+    self_ms: float
+    cumulative_ms: float
+    depth: int
+
+
+def parse_import_times(output: str) -> list[ImportTime]:
+    entries = []
+    for line in output.splitlines():
+        match = IMPORT_TIME_PATTERN.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            entries.append(ImportTime(module, int(self_us) / 1000, int(cumulative_us) / 1000, (len(indent) - 1) // 2))
+    return entries
+
+
+def import_profile(module: str) -> list[ImportTime]:
+    """Vrijeme importa svakog modula pri importu `module` u novom procesu"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+    )
+    return parse_import_times(result.stderr)
+
+
+def summarize_profile(entries: list[ImportTime], top: int = 20) -> dict:
+    """Vlastito vrijeme po paketu i najskuplji moduli aplikacije (ms)"""
+    packages: dict[str, float] = {}
+    for entry in entries:
+        package = entry.module.split(".")[0]
+        packages[package] = packages.get(package, 0.0) + entry.self_ms
+    app_modules = sorted(
+        (entry for entry in entries if entry.module == "app" or entry.module.startswith("app.")),
+        key=lambda entry: entry.cumulative_ms, reverse=True,
+    )
+    return {
+        "total_ms": round(sum(entry.self_ms for entry in entries), 1),
+        "packages": {
+            name: round(ms, 1) for name, ms in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+        },
+        "app_modules": {entry.module: round(entry.cumulative_ms, 1) for entry in app_modules[:top]},
+    }
+
+
+def import_seconds(module: str) -> float:
+    """Vrijeme importa `module` u svježem interpreteru"""
+    code = f"import time; start = time.perf_counter(); import {module}; print(time.perf_counter() - start)"
+    result = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, capture_output=True, text=True, check=True)
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def first_request_seconds(path: str = "/health", timeout: float = 60.0) -> Optional[float]:
+    """Od pokretanja uvicorn procesa do prvog uspješnog odgovora (None ako ne odgovori)"""
+    port = _free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=1.0) as client:
+            while time.perf_counter() - started < timeout and process.poll() is None:
+                try:
+                    if client.get(path).status_code == 200:
+                        return time.perf_counter() - started
+                except httpx.TransportError:
+                    pass
+                time.sleep(0.01)
+        return None
+    finally:
+        process.terminate()
+        try:
+            process.wait(10)
+        except subprocess.TimeoutExpired:
+            process.kill()
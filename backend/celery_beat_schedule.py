@@ -9,6 +9,12 @@ celery_app.conf.beat_schedule = {
         'schedule': crontab(hour=2, minute=0),
     },
     
+    # Forecast potrošnje - svaki dan u 3:00 (nakon ERP synca, koji može prepisati monthly_forecast)
+    'update-demand-forecasts-daily': {
+        'task': 'app.tasks.update_demand_forecasts',
+        'schedule': crontab(hour=3, minute=0),
+    },
+    
     # Dnevne obavijesti o niskim zalihama - svaki dan u 9:00
     'send-low-stock-notifications-daily': {
         'task': 'app.tasks.send_low_stock_notifications',
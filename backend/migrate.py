@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Skripta za pripremu baze prije pokretanja API workera i Celeryja
+
+    python migrate.py            # alembic upgrade head (nova baza: create_all + stamp)
+    python migrate.py --init-db  # i testni podaci (init_db.py)
+
+Više istovremenih pokretanja (replike) čeka na isti advisory lock, pa
+migracije izvodi samo prvo; ostala samo potvrde da je shema na zadnjoj verziji.
+"""
+
+import argparse
+import logging
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.startup import prepare_database
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Migracije baze prije pokretanja")
+    parser.add_argument("--init-db", action="store_true", help="nakon migracija učitaj testne podatke")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s [%(name)s] %(message)s")
+
+    try:
+        timer = prepare_database(init=True if args.init_db else None)
+    except Exception as e:
+        print(f"❌ Greška pri migracijama: {e}")
+        return 1
+    print(f"✅ Baza spremna: {timer.summary()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Lokalni mock ERP feeda za razvoj i testove ERP sinkronizacije
+
+    python mock_erp_server.py --materials 200000 --port 8765
+    ERP_SYNC_URL=http://localhost:8765/feed celery -A app.celery_app call app.tasks.sync_with_erp
+
+Feed je NDJSON (dobavljači, materijali i cijene) poredan po modified_at,
+generira se deterministički i šalje u dijelovima, a `?since=` vraća samo
+zapise od zadanog trenutka.
+"""
+
+import argparse
+import json
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator, Optional
+from urllib.parse import parse_qs, urlparse
+
+FEED_START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+CATEGORIES = ("adaptogen", "nootropik", "vitamin", "mineral", "fosfolipid", "aroma", "pomoćna_tvar")
+
+
+def generate_feed(materials: int, vendors: int, revision: int = 0) -> Iterator[dict]:
+    """Zapisi feeda; promjena `revision` mijenja cijenu svakog desetog materijala"""
+    step = timedelta(seconds=1)
+    moment = FEED_START
+    for number in range(vendors):
+        moment += step
+        yield {
+            "type": "vendor", "modified_at": moment.isoformat(),
+            "code": f"ERP-V{number:05d}", "name": f"Dobavljač {number}",
+            "email": f"nabava{number}@dobavljac.hr",
+        }
+    for number in range(materials):
+        moment += step
+        yield {
+            "type": "material", "modified_at": moment.isoformat(),
+            "code": f"ERP-M{number:07d}", "name": f"Materijal {number}",
+            "category": CATEGORIES[number % len(CATEGORIES)], "unit": "kg",
+            "safety_stock": float(number % 50), "monthly_forecast": float(number % 30),
+            "vendor_code": f"ERP-V{number % vendors:05d}" if vendors else None,
+        }
+    for number in range(materials):
+        moment += step
+        price = 10.0 + number % 100
+        if revision and number % 10 == 0:
+            price += revision
+        yield {
+            "type": "price", "modified_at": moment.isoformat(),
+            "material_code": f"ERP-M{number:07d}", "unit_price": price,
+        }
+
+
+def feed_lines(materials: int, vendors: int, revision: int = 0, since: Optional[str] = None) -> Iterator[bytes]:
+    since_value = datetime.fromisoformat(since) if since else None
+    for record in generate_feed(materials, vendors, revision):
+        if since_value is None or datetime.fromisoformat(record["modified_at"]) >= since_value:
+            yield (json.dumps(record, ensure_ascii=False) + "\n").encode()
+
+
+def make_handler(materials: int, vendors: int):
+    class FeedHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query)
+            since = query.get("since", [None])[0]
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            buffer = []
+            for line in feed_lines(materials, vendors, self.server.revision, since):
+                buffer.append(line)
+                if len(buffer) >= 500:
+                    self._write_chunk(b"".join(buffer))
+                    buffer = []
+            if buffer:
+                self._write_chunk(b"".join(buffer))
+            self.wfile.write(b"0\r\n\r\n")
+            self.close_connection = True
+
+        def _write_chunk(self, data: bytes) -> None:
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+
+        def log_message(self, format, *args):
+            pass
+
+    return FeedHandler
+
+
+def create_server(materials: int, vendors: int, port: int = 0, revision: int = 0) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(materials, vendors))
+    server.revision = revision
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock ERP feed")
+    parser.add_argument("--materials", type=int, default=10000)
+    parser.add_argument("--vendors", type=int, default=100)
+    parser.add_argument("--revision", type=int, default=0, help="Mijenja dio cijena (simulira promjene u ERP-u)")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    server = create_server(args.materials, args.vendors, args.port, args.revision)
+    print(f"🚀 Mock ERP feed na http://127.0.0.1:{server.server_port}/feed ({args.materials} materijala)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+import logging
+import os
+import sys
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s [%(name)s] %(message)s")
+
+    # Get port with fallback
+    try:
+        port = int(os.environ.get("PORT", 8000))
+    except ValueError as e:
+        print(f"Error parsing PORT: {e}")
+        port = 8000
+    print(f"Using port: {port}")
+
+    # Migracije jednom, prije nego gunicorn pokrene workere (app.main ne radi DDL)
+    from app.core.config import settings
+    if settings.migrate_on_startup:
+        from app.core.startup import prepare_database
+        try:
+            prepare_database()
+        except Exception as e:
+            print(f"⚠️ Greška pri migracijama: {e}")
+            sys.exit(1)
+
+    print("=== STARTING APP ===")
+
+    # Više workera (gunicorn + uvicorn), app se učitava prije forka
+    from app.core.server import serve
+    serve(port)
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Skripta za provjeru i ponovnu izgradnju salda zaliha (stock_balances) i dnevnih
+zbrojeva (ledger_daily_rollups) iz knjige prijema i utrošaka
+
+    python stock_balances.py verify    # samo provjera salda, izlazni kod 1 ako ima odstupanja
+    python stock_balances.py rebuild   # ponovna izgradnja svih salda i dnevnih zbrojeva
+"""
+
+import argparse
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.database import SessionLocal
+from app.services.stock_balance_service import StockBalanceService
+from app.services.ledger_rollup_service import LedgerRollupService
+
+
+def verify() -> int:
+    db = SessionLocal()
+    try:
+        mismatches = StockBalanceService.verify(db)
+    finally:
+        db.close()
+    
+    if not mismatches:
+        print("✅ Saldi zaliha odgovaraju knjizi prijema i utrošaka")
+        return 0
+    
+    print(f"⚠️ Pronađeno {len(mismatches)} odstupanja:")
+    for mismatch in mismatches:
+        print(f"- materijal {mismatch['material_id']}: očekivano {mismatch['expected']}, saldo {mismatch['actual']}")
+    return 1
+
+
+def rebuild() -> int:
+    db = SessionLocal()
+    try:
+        count = StockBalanceService.rebuild(db)
+        rollups = LedgerRollupService.rebuild(db)
+    finally:
+        db.close()
+    
+    print(f"✅ Saldi zaliha ponovno izgrađeni za {count} materijala")
+    print(f"✅ Dnevni zbrojevi knjige ponovno izgrađeni ({rollups} redaka)")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Provjera i izgradnja salda zaliha")
+    parser.add_argument("command", choices=["verify", "rebuild"])
+    args = parser.parse_args()
+    
+    sys.exit(verify() if args.command == "verify" else rebuild())
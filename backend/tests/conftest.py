@@ -0,0 +1,40 @@
+import asyncio
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from app.core.request_metrics import instrument_engine
+from app.models import Base
+
+
+@pytest.fixture
+def db():
+    """Sesija nad praznom SQLite bazom u memoriji sa svim tablicama"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+@pytest.fixture
+def run_async():
+    """Pokreće `scenario(sessions)` nad praznom async SQLite bazom (aiosqlite).
+
+    aiosqlite konekcija veže se uz event loop, pa se baza stvara unutar
+    istog asyncio.run kao i scenarij. Upiti se broje (instrument_engine).
+    """
+    def run(scenario):
+        async def main():
+            engine = create_async_engine("sqlite+aiosqlite://")
+            instrument_engine(engine.sync_engine)
+            async with engine.begin() as connection:
+                await connection.run_sync(Base.metadata.create_all)
+            try:
+                return await scenario(async_sessionmaker(engine))
+            finally:
+                await engine.dispose()
+
+        return asyncio.run(main())
+
+    return run
@@ -0,0 +1,58 @@
+import subprocess
+import sys
+from datetime import date, datetime
+from sqlalchemy import func, select
+from app.models import Consumption, Receipt, StockBalance
+from benchmarks.dataset import DatasetSpec, generate, reset
+from benchmarks.runner import compare, percentile
+from benchmarks.startup import BACKEND_DIR, parse_import_times, summarize_profile
+
+
+def test_generator_is_deterministic(db):
+    """Test da isti seed daje iste retke i da se saldi grade iz knjige"""
+    spec = DatasetSpec(materials=20, vendors=3, receipts=200, consumptions=300, days=60, seed=7)
+    counts = generate(db, spec, today=date(2026, 10, 1), log=lambda message: None)
+    assert counts["receipts"] == 200 and counts["consumptions"] == 300
+    assert db.scalar(select(func.count()).select_from(StockBalance)) > 0
+    first = db.execute(select(Receipt.material_id, Receipt.quantity, Receipt.receipt_date).order_by(Receipt.id)).all()
+
+    reset(db)
+    generate(db, spec, today=date(2026, 10, 1), log=lambda message: None)
+    again = db.execute(select(Receipt.material_id, Receipt.quantity, Receipt.receipt_date).order_by(Receipt.id)).all()
+    assert first == again
+    assert db.scalar(select(func.max(Consumption.consumption_date))) < datetime(2026, 10, 1)
+
+
+def test_compare_flags_slower_and_chattier_scenarios():
+    """Test percentila i usporedbe rezultata (sporije ili više upita je regresija)"""
+    assert percentile([5.0, 1.0, 3.0, 2.0, 4.0], 0.5) == 3.0
+    assert percentile(list(range(1, 101)), 0.99) == 99
+
+    def result(p95, queries):
+        return {"p50_ms": p95 / 2, "p95_ms": p95, "queries_per_request": queries}
+
+    baseline = {"scenarios": {"summary": result(40.0, 8.0), "list": result(10.0, 1.0), "detail": result(2.0, 1.0)}}
+    current = {"scenarios": {"summary": result(80.0, 8.0), "list": result(10.5, 12.0), "detail": result(3.0, 1.0)}}
+    rows, regressed = compare(baseline, current)
+    assert regressed
+    # detail je 50 % sporiji, ali ispod praga šuma od 5 ms
+    assert {row["scenario"]: row["status"] for row in rows} == {"summary": "regression", "list": "regression", "detail": "ok"}
+
+
+def test_import_profile_and_lazy_worker_imports():
+    """Test raspodjele importa i da Celery worker ne učitava FastAPI, httpx ni smtplib"""
+    output = "\n".join([
+        "import time: self [us] | cumulative | imported package",
+        "import time:       300 |        300 |     sqlalchemy.sql",
+        "import time:       200 |        500 |   sqlalchemy",
+        "import time:      1000 |       1500 | app.models",
+    ])
+    entries = parse_import_times(output)
+    assert [(entry.module, entry.depth) for entry in entries] == [("sqlalchemy.sql", 2), ("sqlalchemy", 1), ("app.models", 0)]
+    profile = summarize_profile(entries)
+    assert profile["packages"] == {"app": 1.0, "sqlalchemy": 0.5}
+    assert profile["app_modules"] == {"app.models": 1.5}
+
+    code = "import sys, app.tasks; print(sorted(m for m in ('fastapi', 'httpx', 'smtplib') if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
@@ -0,0 +1,96 @@
+import asyncio
+from app.core.cache import ResponseCache
+
+
+def test_cache_falls_back_when_redis_unavailable():
+    """Test da se odgovor računa direktno kad Redis nije dostupan"""
+    cache = ResponseCache("redis://127.0.0.1:1/0")
+
+    async def compute():
+        return {"value": 42}
+
+    result = asyncio.run(cache.get_or_compute("test", compute, tags=["stock"], ttl=10))
+    assert result == {"value": 42}
+
+    snapshot = cache.snapshot()
+    assert snapshot["available"] is False
+    assert snapshot["entries"]["test"]["misses"] == 1
+    assert snapshot["entries"]["test"]["errors"] == 1
+
+
+class _FakeRedis:
+    """Podskup Redis naredbi koje koristi ResponseCache; `down` simulira prekid veze"""
+
+    def __init__(self):
+        self.data: dict[str, str] = {}
+        self.down = False
+
+    def _check(self):
+        if self.down:
+            raise ConnectionError("Redis down")
+
+    async def mget(self, keys):
+        self._check()
+        return [self.data.get(key) for key in keys]
+
+    async def get(self, key):
+        self._check()
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self._check()
+        self.data[key] = value
+
+    def pipeline(self, transaction=True):
+        redis = self
+
+        class Pipeline:
+            def __init__(self):
+                self.tags = []
+
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+            def incr(self, key):
+                self.tags.append(key)
+
+            async def execute(self):
+                redis._check()
+                for key in self.tags:
+                    redis.data[key] = str(int(redis.data.get(key, 0)) + 1)
+
+        return Pipeline()
+
+
+def test_invalidation_bumps_generation_and_survives_outage():
+    """Test da invalidacija taga vodi na ponovni izračun i da se propuštena primijeni kad se Redis vrati"""
+    cache = ResponseCache("redis://unused", retry_after=0)
+    redis = cache._client = _FakeRedis()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return {"calls": len(calls)}
+
+    async def run():
+        get = lambda: cache.get_or_compute("stats", compute, tags=["stock", "materials"], ttl=10)
+        results = [await get(), await get()]
+        await cache.invalidate("stock")
+        results.append(await get())
+
+        # Invalidacija dok Redis ne radi čeka u redu i primjenjuje se pri sljedećem pristupu
+        redis.down = True
+        await cache.invalidate("materials")
+        pending = set(cache._pending_tags)
+        redis.down = False
+        results += [await get(), await get()]
+        return results, pending
+
+    results, pending = asyncio.run(run())
+    assert [result["calls"] for result in results] == [1, 1, 2, 3, 3]
+    assert pending == {"materials"} and not cache._pending_tags
+    assert redis.data["zencore:cache:tag:materials"] == "1"
+    assert cache.snapshot()["entries"]["stats"]["hits"] == 2
@@ -0,0 +1,65 @@
+import json
+import threading
+import httpx
+from sqlalchemy import func, select
+from app.models import Material, Vendor, ErpSyncState
+from app.services.erp_sync_service import ErpSyncService
+from mock_erp_server import create_server
+
+
+def test_erp_sync_applies_only_changed_rows(db):
+    """Test ERP synca: prvi upis, bez promjena, promjena cijena i nastavak od watermarka"""
+    server = create_server(materials=50, vendors=3)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/feed"
+    try:
+        result = ErpSyncService.run(db, url, chunk_size=20)
+        assert result["changed"] == {"vendor": 3, "material": 50, "price": 50}
+        assert db.scalar(select(func.count(Material.id))) == 50
+        material = db.scalar(select(Material).where(Material.code == "ERP-M0000004"))
+        assert material.unit_price == 14.0
+        assert material.vendor_id == db.scalar(select(Vendor.id).where(Vendor.code == "ERP-V00001"))
+
+        result = ErpSyncService.run(db, url, full=True, chunk_size=20)
+        assert result["changed"] == {"vendor": 0, "material": 0, "price": 0}
+        assert result["unchanged"] == 103
+
+        server.revision = 1
+        result = ErpSyncService.run(db, url, full=True, chunk_size=20)
+        assert result["changed"] == {"vendor": 0, "material": 0, "price": 5}
+
+        # Od watermarka dolazi samo zadnji zapis (since je uključiv)
+        result = ErpSyncService.run(db, url, chunk_size=20)
+        assert result["rows_seen"] == 1
+        assert db.get(ErpSyncState, "erp").last_status == "success"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_rejected_row_is_read_again_on_next_run(db):
+    """Test da watermark ne prelazi materijal čiji dobavljač stiže tek u kasnijem syncu"""
+    feed = [
+        {"type": "vendor", "code": "V-1", "name": "Prvi", "modified_at": "2026-10-01T08:00:00"},
+        {"type": "material", "code": "M-1", "name": "Ašvaganda", "category": "adaptogen", "unit": "kg",
+         "vendor_code": "V-2", "modified_at": "2026-10-02T08:00:00"},
+        {"type": "vendor", "code": "V-3", "name": "Treći", "modified_at": "2026-10-03T08:00:00"},
+    ]
+
+    def handler(request):
+        since = request.url.params.get("since")
+        rows = [row for row in feed if since is None or row["modified_at"] >= since]
+        return httpx.Response(200, text="\n".join(json.dumps(row) for row in rows))
+
+    client = httpx.Client(transport=httpx.MockTransport(handler))
+    result = ErpSyncService.run(db, "http://erp/feed", chunk_size=2, client=client)
+    assert result["errors"] == ["line 2: vendor_code: V-2 does not exist"]
+    assert result["watermark"] == "2026-10-02T08:00:00"
+
+    feed.append({"type": "vendor", "code": "V-2", "name": "Drugi", "modified_at": "2026-10-04T08:00:00"})
+    result = ErpSyncService.run(db, "http://erp/feed", chunk_size=10, client=client)
+    assert result["since"] == "2026-10-02T08:00:00" and result["rows_seen"] == 3
+    assert result["changed"] == {"vendor": 1, "material": 1, "price": 0} and result["failed"] == 0
+    assert result["watermark"] == "2026-10-04T08:00:00"
+    material = db.scalar(select(Material).where(Material.code == "M-1"))
+    assert material.vendor_id == db.scalar(select(Vendor.id).where(Vendor.code == "V-2"))
@@ -0,0 +1,73 @@
+from datetime import datetime
+import pytest
+from fastapi import HTTPException, Request, Response
+from sqlalchemy import select
+from app.core.expand import expand_options, expand_param
+from app.core.pagination import PageParams, paginate
+from app.core.request_metrics import RequestStats, _current
+from app.models import Material, Receipt, Vendor
+from app.models.material import Category
+from app.schemas.material import MaterialSummary
+from app.schemas.receipt import ReceiptResponse
+from app.schemas.vendor import VendorSummary
+
+RELATIONS = {"material": MaterialSummary, "vendor": VendorSummary}
+
+
+def _page(limit: int) -> PageParams:
+    request = Request({
+        "type": "http", "scheme": "http", "server": ("test", 80),
+        "path": "/receipts/", "query_string": b"", "headers": [],
+    })
+    return PageParams(request, Response(), cursor=None, limit=limit, sort=None, include_total=True, skip=0)
+
+
+def test_expand_uses_fixed_number_of_queries(run_async):
+    """Test da ?expand ne ovisi o veličini stranice i da neučitana relacija ostaje null"""
+    async def scenario(sessions):
+        async with sessions() as db:
+            vendors = [Vendor(code=f"V{i}", name=f"Dobavljač {i}") for i in range(5)]
+            materials = [
+                Material(code=f"M{i}", name=f"Materijal {i}", category=Category.VITAMIN, unit="kg", vendor=vendors[i % 5])
+                for i in range(10)
+            ]
+            db.add_all(materials)
+            await db.flush()
+            db.add_all([
+                Receipt(receipt_number=f"R{i}", material_id=materials[i % 10].id, vendor_id=vendors[i % 5].id,
+                        quantity=1.0, unit_price=2.0, total_amount=2.0, receipt_date=datetime(2026, 10, 1))
+                for i in range(30)
+            ])
+            await db.commit()
+
+        results = {}
+        for limit in (5, 30):
+            async with sessions() as db:
+                stats = RequestStats()
+                token = _current.set(stats)
+                try:
+                    query = select(Receipt).options(*expand_options(Receipt, {"material", "vendor"}, RELATIONS))
+                    receipts = await paginate(db, query, _page(limit), Receipt)
+                    responses = [ReceiptResponse.model_validate(receipt) for receipt in receipts]
+                finally:
+                    _current.reset(token)
+                results[limit] = (stats.query_count, responses)
+        return results
+
+    results = run_async(scenario)
+    # total, stranica, materijali, dobavljači
+    assert results[5][0] == results[30][0] == 4
+    responses = results[30][1]
+    assert len(responses) == 30
+    assert responses[0].material.code == "M0" and responses[0].vendor.code == "V0"
+    assert responses[0].purchase_order is None and responses[0].user is None
+
+
+def test_expand_rejects_unknown_relation():
+    """Test da nepoznata relacija vraća 400"""
+    dependency = expand_param(RELATIONS)
+    assert dependency(expand=" vendor,material ,") == {"vendor", "material"}
+    assert dependency(expand=None) == set()
+    with pytest.raises(HTTPException) as error:
+        dependency(expand="vendor,offers")
+    assert error.value.status_code == 400
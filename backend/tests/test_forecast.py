@@ -0,0 +1,50 @@
+from datetime import date, datetime
+from sqlalchemy import select
+from app.models import Consumption, DemandForecast, Material
+from app.models.material import Category
+from app.services.forecast_service import (
+    EXPONENTIAL_SMOOTHING, MOVING_AVERAGE, SEASONAL_NAIVE, ForecastService, fit_methods, select_method,
+)
+
+
+def test_seasonal_series_selects_seasonal_naive():
+    """Test odabira metode: sezonski niz najbolje prati sezonska naivna metoda"""
+    series = [10.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0] * 2
+    fits = fit_methods(series, window=3, alpha=0.3)
+    assert set(fits) == {MOVING_AVERAGE, EXPONENTIAL_SMOOTHING, SEASONAL_NAIVE}
+    assert fits[SEASONAL_NAIVE].mae == 0.0 and fits[SEASONAL_NAIVE].forecast == 10.0
+    assert select_method(fits) == SEASONAL_NAIVE
+    assert fit_methods([5.0] * 6, window=3, alpha=0.3)[MOVING_AVERAGE] == (5.0, 0.0, 0.0)
+
+
+def test_run_writes_forecasts_and_monthly_forecast(db):
+    """Test batch forecasta: mjesečna agregacija, upis metrika i monthly_forecast"""
+    steady = Material(code="STEADY", name="Steady", category=Category.VITAMIN, unit="kg", monthly_forecast=1.0)
+    short = Material(code="SHORT", name="Short", category=Category.VITAMIN, unit="kg", monthly_forecast=7.0)
+    db.add_all([steady, short])
+    db.flush()
+    number = 0
+    for month in range(1, 7):
+        for day in (3, 17):
+            number += 1
+            db.add(Consumption(consumption_number=f"C-{number}", material_id=steady.id, quantity=4.0,
+                               consumption_date=datetime(2026, month, day)))
+    db.add(Consumption(consumption_number="C-short", material_id=short.id, quantity=3.0,
+                       consumption_date=datetime(2026, 6, 5)))
+    # Tekući mjesec nije završen i ne ulazi u povijest
+    db.add(Consumption(consumption_number="C-july", material_id=steady.id, quantity=100.0,
+                       consumption_date=datetime(2026, 7, 2)))
+    db.commit()
+
+    summary = ForecastService.run(db, date(2026, 7, 15))
+    assert (summary["forecasted_materials"], summary["skipped_materials"], summary["updated_materials"]) == (1, 1, 1)
+
+    db.expire_all()
+    assert (db.get(Material, steady.id).monthly_forecast, db.get(Material, short.id).monthly_forecast) == (8.0, 7.0)
+    rows = db.scalars(select(DemandForecast).where(DemandForecast.material_id == steady.id)).all()
+    assert {row.method for row in rows} == {MOVING_AVERAGE, EXPONENTIAL_SMOOTHING}
+    assert all(row.history_months == 6 and row.mae == 0.0 for row in rows)
+    assert sum(row.selected for row in rows) == 1
+
+    # Ponovni izračun bez promjene ne dira materijale
+    assert ForecastService.run(db, date(2026, 7, 15))["updated_materials"] == 0
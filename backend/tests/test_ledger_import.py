@@ -0,0 +1,118 @@
+import io
+import json
+from datetime import date, datetime
+import pytest
+from sqlalchemy import event, insert, select
+from app.models import LedgerDailyRollup, Material, Receipt, StockBalance, Vendor
+from app.models.material import Category
+from app.services.import_service import LedgerImportService, _Row, detect_format, iter_rows
+from app.services.stock_balance_service import StockBalanceService
+
+
+def test_detect_format():
+    """Test prepoznavanja formata uvoza"""
+    assert detect_format("prijemi.CSV", None) == "csv"
+    assert detect_format("utrosak.jsonl", None) == "jsonl"
+    assert detect_format("upload", "application/x-ndjson") == "jsonl"
+    assert detect_format("upload.txt", None, "csv") == "csv"
+    with pytest.raises(ValueError):
+        detect_format("upload.txt", "text/plain")
+
+
+def test_iter_rows_reports_line_numbers():
+    """Test čitanja CSV i JSONL redaka s brojevima redaka"""
+    csv_file = io.BytesIO("﻿receipt_number,quantity,notes\nR-1,5,\nR-2,3,x,y\n".encode())
+    rows = list(iter_rows(csv_file, "csv"))
+    assert rows[0].line == 2 and rows[0].data == {"receipt_number": "R-1", "quantity": "5"}
+    assert rows[1].line == 3 and rows[1].error
+
+    jsonl_file = io.BytesIO(b'{"consumption_number": "C-1"}\n\n[1]\n{bad\n')
+    rows = list(iter_rows(jsonl_file, "jsonl"))
+    assert [(row.line, row.error is None) for row in rows] == [(1, True), (3, False), (4, False)]
+
+
+def _jsonl(*rows: dict) -> io.BytesIO:
+    return io.BytesIO("\n".join(json.dumps(row) for row in rows).encode())
+
+
+def _receipt(number: str, material_id: int = 1, vendor_id: int = 1, day: int = 1, quantity: float = 5.0) -> dict:
+    return {"receipt_number": number, "material_id": material_id, "vendor_id": vendor_id, "quantity": quantity,
+            "unit_price": 2.0, "total_amount": quantity * 2.0, "receipt_date": f"2026-10-{day:02d}T10:00:00"}
+
+
+async def _seed(sessions) -> None:
+    async with sessions() as db:
+        db.add_all([Vendor(code="V1", name="Dobavljač"),
+                    Material(code="M-1", name="Materijal", category=Category.VITAMIN, unit="kg")])
+        await db.flush()
+        db.add(Receipt(**{**_receipt("R-OLD"), "receipt_date": datetime(2026, 9, 1)}, created_by=1))
+        await db.flush()
+        await db.run_sync(StockBalanceService.rebuild)
+        await db.commit()
+
+
+def test_import_reports_row_errors_and_updates_balances(run_async):
+    """Test uvoza: nepostojeće reference, duplikati u datoteci i bazi, saldo i dnevni rollup"""
+    async def scenario(sessions):
+        await _seed(sessions)
+        async with sessions() as db:
+            file = _jsonl(
+                _receipt("R-1", day=2), _receipt("R-2", day=5, quantity=3.0), _receipt("R-3", material_id=99),
+                _receipt("R-4", vendor_id=99), _receipt("R-1"), _receipt("R-OLD"),
+            )
+            result = await LedgerImportService.run(db, "receipt", file, "jsonl", user_id=1)
+            balance = await db.get(StockBalance, 1)
+            days = (await db.execute(
+                select(LedgerDailyRollup.day, LedgerDailyRollup.received_quantity).order_by(LedgerDailyRollup.day)
+            )).all()
+            mismatches = await db.run_sync(StockBalanceService.verify)
+        return result, balance, days, mismatches
+
+    result, balance, days, mismatches = run_async(scenario)
+    assert (result.total_rows, result.inserted, result.failed) == (6, 2, 4)
+    assert [(error.row, error.errors) for error in result.errors] == [
+        (3, ["material_id: 99 does not exist"]),
+        (4, ["vendor_id: 99 does not exist"]),
+        (5, ["receipt_number: duplicate in file"]),
+        (6, ["receipt_number: already exists"]),
+    ]
+    assert balance.received_quantity == 13.0 and balance.last_receipt_date == datetime(2026, 10, 5, 10)
+    assert days == [(date(2026, 10, 2), 5.0), (date(2026, 10, 5), 3.0)]
+    assert mismatches == []
+
+
+def test_atomic_import_with_errors_writes_nothing(run_async):
+    """Test da atomic uvoz s ijednom greškom ne upisuje ni stavke ni salde"""
+    async def scenario(sessions):
+        await _seed(sessions)
+        async with sessions() as db:
+            file = _jsonl(_receipt("R-1"), _receipt("R-2", material_id=99))
+            result = await LedgerImportService.run(db, "receipt", file, "jsonl", user_id=1, atomic=True)
+        async with sessions() as db:
+            numbers = (await db.scalars(select(Receipt.receipt_number))).all()
+            balance = await db.get(StockBalance, 1)
+        return result, numbers, balance
+
+    result, numbers, balance = run_async(scenario)
+    assert (result.inserted, result.failed) == (0, 1)
+    assert numbers == ["R-OLD"] and balance.received_quantity == 5.0
+
+
+def test_number_inserted_concurrently_is_a_row_error(db):
+    """Test da broj upisan između provjere duplikata i INSERT-a postaje greška retka, ne 500"""
+    db.add_all([Vendor(code="V1", name="Dobavljač"),
+                Material(code="M-1", name="Materijal", category=Category.VITAMIN, unit="kg")])
+    db.commit()
+
+    @event.listens_for(db, "do_orm_execute")
+    def concurrent_import(state):
+        # Drugi uvoz upisuje R-2 neposredno prije INSERT-a ovog chunka
+        if state.is_insert and not db.info.get("raced"):
+            db.info["raced"] = True
+            db.connection().execute(insert(Receipt).values({**_receipt("R-2"), "receipt_date": datetime(2026, 10, 1)}))
+
+    rows = [_Row(1, _receipt("R-1")), _Row(2, _receipt("R-2"))]
+    inserted, errors = LedgerImportService._process_chunk(db, "receipt", rows, 1, write=True)
+    assert inserted == 1
+    assert [(error.row, error.errors) for error in errors] == [(2, ["receipt_number: already exists"])]
+    assert db.get(StockBalance, 1).received_quantity == 5.0
@@ -0,0 +1,109 @@
+from datetime import date, datetime
+from sqlalchemy import select
+from app.api.consumptions import create_consumption, delete_consumption, update_consumption
+from app.core.cache import response_cache
+from app.models import Consumption, LedgerCategoryRollup, LedgerDailyRollup, Material, Receipt, User, Vendor
+from app.models.material import Category
+from app.schemas.consumption import ConsumptionCreate, ConsumptionUpdate
+from app.services.ledger_rollup_service import LedgerRollupService, period_start
+from app.services.stock_balance_service import StockBalanceService, consumption_entry, receipt_entry
+
+
+def test_period_start():
+    """Test početka tjedna (ponedjeljak) i mjeseca"""
+    assert period_start(date(2026, 3, 19), "week") == date(2026, 3, 16)
+    assert period_start(date(2026, 3, 19), "month") == date(2026, 3, 1)
+    assert period_start(date(2026, 3, 19), "day") == date(2026, 3, 19)
+
+
+def test_rollup_follows_ledger_and_matches_rebuild(db):
+    """Test održavanja dnevnih zbrojeva pri knjiženju i usporedbe s ponovnom izgradnjom"""
+    vendor = Vendor(code="V1", name="Dobavljač")
+    ash = Material(code="ASH", name="Ašvaganda", category=Category.ADAPTOGEN, unit="kg", unit_price=2.0)
+    vit = Material(code="VIT", name="Vitamin C", category=Category.VITAMIN, unit="kg", unit_price=5.0)
+    db.add_all([vendor, ash, vit])
+    db.flush()
+
+    receipt = Receipt(receipt_number="R-1", material_id=ash.id, vendor_id=vendor.id, quantity=10.0,
+                      unit_price=2.5, total_amount=25.0, receipt_date=datetime(2026, 3, 16, 8))
+    used = Consumption(consumption_number="C-1", material_id=ash.id, quantity=4.0,
+                       consumption_date=datetime(2026, 3, 18, 9))
+    removed = Consumption(consumption_number="C-2", material_id=vit.id, quantity=1.0,
+                          consumption_date=datetime(2026, 3, 23, 9))
+    db.add_all([receipt, used, removed])
+    db.flush()
+    StockBalanceService.apply(db, "receipt", added=receipt_entry(receipt))
+    StockBalanceService.apply(db, "consumption", added=consumption_entry(used))
+    StockBalanceService.apply(db, "consumption", added=consumption_entry(removed))
+    db.delete(removed)
+    db.flush()
+    StockBalanceService.apply(db, "consumption", removed=consumption_entry(removed))
+    db.commit()
+
+    def rollups():
+        rows = db.scalars(select(LedgerDailyRollup).order_by(LedgerDailyRollup.material_id, LedgerDailyRollup.day))
+        return [(row.material_id, row.day, row.received_quantity, row.received_value,
+                 row.consumed_quantity, row.consumed_value) for row in rows if row.received_quantity or row.consumed_quantity]
+
+    def category_rollups():
+        rows = db.scalars(select(LedgerCategoryRollup).order_by(LedgerCategoryRollup.day))
+        return [(row.day, row.category, row.received_value, row.consumed_value)
+                for row in rows if row.received_quantity or row.consumed_quantity]
+
+    incremental = rollups(), category_rollups()
+    assert incremental == ([
+        (ash.id, date(2026, 3, 16), 10.0, 25.0, 0.0, 0.0),
+        (ash.id, date(2026, 3, 18), 0.0, 0.0, 4.0, 8.0),
+    ], [
+        (date(2026, 3, 16), "adaptogen", 25.0, 0.0),
+        (date(2026, 3, 18), "adaptogen", 0.0, 8.0),
+    ])
+    LedgerRollupService.rebuild(db)
+    assert (rollups(), category_rollups()) == incremental
+
+    weekly = LedgerRollupService.trend(db, date(2026, 3, 1), granularity="week", by_category=True)
+    assert [(row["date"], row["category"], row["received_value"], row["consumed_quantity"]) for row in weekly] == [
+        (date(2026, 3, 16), "adaptogen", 25.0, 4.0),
+    ]
+    daily = LedgerRollupService.trend(db, date(2026, 3, 17), material_id=ash.id)
+    assert [(row["date"], row["consumed_value"]) for row in daily] == [(date(2026, 3, 18), 8.0)]
+
+
+def test_consumption_value_survives_price_change(run_async, monkeypatch):
+    """Test da izmjena i brisanje utroška nakon promjene cijene oduzimaju knjiženu vrijednost"""
+    async def no_invalidation(*tags):
+        pass
+
+    monkeypatch.setattr(response_cache, "invalidate", no_invalidation)
+    user = User(id=1, username="skladiste")
+
+    async def scenario(sessions):
+        async with sessions() as db:
+            db.add(Material(code="ASH", name="Ašvaganda", category=Category.ADAPTOGEN, unit="kg", unit_price=2.0))
+            await db.commit()
+            first = (await create_consumption(ConsumptionCreate(
+                consumption_number="C-1", material_id=1, quantity=4.0, consumption_date=datetime(2026, 3, 18, 9),
+            ), db=db, current_user=user)).id
+            second = (await create_consumption(ConsumptionCreate(
+                consumption_number="C-2", material_id=1, quantity=1.0, consumption_date=datetime(2026, 3, 18, 11),
+            ), db=db, current_user=user)).id
+            material = await db.get(Material, 1)
+            material.unit_price = 5.0
+            await db.commit()
+
+            # Izmjena knjiži novu količinu po novoj cijeni, brisanje vraća knjiženih 2.0
+            await update_consumption(first, ConsumptionUpdate(quantity=3.0), db=db, current_user=user)
+            await delete_consumption(second, db=db, current_user=user)
+
+            def values(session):
+                daily = session.scalar(select(LedgerDailyRollup.consumed_value))
+                category = session.scalar(select(LedgerCategoryRollup.consumed_value))
+                return daily, category
+
+            incremental = await db.run_sync(values)
+            await db.run_sync(LedgerRollupService.rebuild)
+            return incremental, await db.run_sync(values)
+
+    incremental, rebuilt = run_async(scenario)
+    assert incremental == (15.0, 15.0)
+    assert rebuilt == incremental
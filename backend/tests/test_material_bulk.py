@@ -0,0 +1,114 @@
+from sqlalchemy import select, update
+from app.core.request_metrics import RequestStats, _current
+from app.models import Material, Vendor
+from app.models.material import Category
+from app.schemas.material import MaterialCreate, MaterialBulkUpdate
+from app.services.material_bulk_service import MaterialBulkService
+from app.services.search_service import MaterialSearch
+
+
+async def _seed(sessions) -> None:
+    async with sessions() as db:
+        db.add_all([Vendor(code="V1", name="Dobavljač"),
+                    Material(code="OLD-1", name="Postojeći", category=Category.VITAMIN, unit="kg")])
+        await db.commit()
+
+
+def _new(code: str, **fields) -> MaterialCreate:
+    return MaterialCreate(code=code, name=f"Materijal {code}", category="adaptogen", unit="kg", **fields)
+
+
+def test_bulk_create_best_effort_and_atomic(run_async):
+    """Test skupnog unosa: fiksan broj upita, greške po stavci, atomic ne upisuje ništa"""
+    async def scenario(sessions):
+        await _seed(sessions)
+        items = [_new(f"M-{i}", vendor_id=1) for i in range(50)]
+        items += [_new("OLD-1"), _new("M-1"), _new("X-1", vendor_id=99)]
+        async with sessions() as db:
+            stats = RequestStats()
+            token = _current.set(stats)
+            try:
+                result = await MaterialBulkService.create(db, items)
+            finally:
+                _current.reset(token)
+        async with sessions() as db:
+            atomic = await MaterialBulkService.create(db, [_new("A-1"), _new("OLD-1")], atomic=True)
+            count = len((await db.scalars(select(Material.code))).all())
+            category = await db.scalar(select(Material.category).where(Material.code == "M-0"))
+        return stats.query_count, result, atomic, count, category
+
+    query_count, result, atomic, count, category = run_async(scenario)
+    # postojeći kodovi, dobavljači, INSERT s RETURNING
+    assert query_count == 3
+    assert (result.total, result.created, result.failed) == (53, 50, 3)
+    assert result.results[0].status == "created" and result.results[0].id is not None
+    assert [entry.errors for entry in result.results[50:]] == [
+        ["code: already exists"], ["code: duplicate in request"], ["vendor_id: 99 does not exist"],
+    ]
+    assert category == Category.ADAPTOGEN
+    assert (atomic.created, atomic.failed) == (0, 1)
+    assert [entry.status for entry in atomic.results] == ["skipped", "failed"]
+    assert count == 51
+
+
+def test_bulk_update_checks_codes_and_nulls(run_async):
+    """Test skupne izmjene: samo poslana polja, sukob kodova, null u obaveznom polju i svjež indeks pretrage"""
+    async def scenario(sessions):
+        await _seed(sessions)
+        async with sessions() as db:
+            await MaterialBulkService.create(db, [_new("M-1"), _new("M-2"), _new("M-3")])
+        async with sessions() as db:
+            # Memorijski indeks pretrage izgrađen prije izmjene
+            await db.run_sync(MaterialSearch.criteria, "rodiola")
+            result = await MaterialBulkService.update(db, [
+                MaterialBulkUpdate(id=3, name="Rodiola"),
+                MaterialBulkUpdate(id=2, safety_stock=4.0, regulatory_status="odobreno"),
+                MaterialBulkUpdate(id=4, code="OLD-1"),
+                MaterialBulkUpdate(id=4, name=None),
+                MaterialBulkUpdate(id=42, name="Nema"),
+            ])
+            match, _ = await db.run_sync(MaterialSearch.criteria, "rodiola")
+            found = (await db.scalars(select(Material.code).where(match))).all()
+            rows = (await db.execute(
+                select(Material.code, Material.name, Material.safety_stock).order_by(Material.id)
+            )).all()
+        return result, rows, found
+
+    result, rows, found = run_async(scenario)
+    assert (result.updated, result.failed) == (2, 3)
+    assert found == ["M-2"]
+    assert [entry.errors for entry in result.results[2:]] == [
+        ["code: already exists"], ["name: cannot be null"], ["id: 42 does not exist"],
+    ]
+    assert rows[1] == ("M-1", "Materijal M-1", 4.0)
+    assert rows[2] == ("M-2", "Rodiola", 0.0)
+
+
+def test_bulk_update_code_taken_concurrently_is_item_error(run_async, monkeypatch):
+    """Test da kod koji drugi zahtjev zauzme između provjere i UPDATE-a postaje greška stavke, ne 500"""
+    missing_vendors = MaterialBulkService._missing_vendors
+
+    def concurrent_rename(db, items):
+        # Drugi zahtjev preimenuje OLD-1 u NEW-1 nakon provjere kodova, prije UPDATE-a
+        db.execute(update(Material).where(Material.code == "OLD-1").values(code="NEW-1"))
+        return missing_vendors(db, items)
+
+    async def scenario(sessions):
+        await _seed(sessions)
+        async with sessions() as db:
+            await MaterialBulkService.create(db, [_new("M-1"), _new("M-2")])
+        monkeypatch.setattr(MaterialBulkService, "_missing_vendors", staticmethod(concurrent_rename))
+        async with sessions() as db:
+            result = await MaterialBulkService.update(db, [
+                MaterialBulkUpdate(id=2, code="NEW-1"),
+                MaterialBulkUpdate(id=3, name="Preimenovan"),
+            ])
+            rows = (await db.execute(select(Material.code, Material.name).order_by(Material.id))).all()
+        return result, rows
+
+    result, rows = run_async(scenario)
+    assert (result.updated, result.failed) == (1, 1)
+    assert [(entry.status, entry.errors) for entry in result.results] == [
+        ("failed", ["code: already exists"]), ("updated", []),
+    ]
+    assert rows == [("NEW-1", "Postojeći"), ("M-1", "Materijal M-1"), ("M-2", "Preimenovan")]
@@ -0,0 +1,61 @@
+import sqlite3
+from app.core.config import settings
+from app.core.database import InstrumentedAsyncQueuePool, InstrumentedQueuePool, engine_options, instrument_pool, pool_stats
+from app.core.metrics import Counter, Histogram
+
+
+def test_counter_increments():
+    """Test brojača"""
+    counter = Counter()
+    counter.inc()
+    counter.inc(2)
+    assert counter.value == 3
+
+
+def test_histogram_buckets_are_cumulative():
+    """Test kumulativnih bucketa histograma"""
+    histogram = Histogram((0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value)
+
+    snapshot = histogram.snapshot()
+    assert snapshot["buckets"] == {"0.1": 2, "1.0": 3, "+Inf": 4}
+    assert snapshot["count"] == 4
+    assert abs(snapshot["sum"] - 2.65) < 1e-9
+
+
+def test_engine_options_for_postgres(monkeypatch):
+    """Test postavki poola i statement_timeouta za psycopg i asyncpg"""
+    monkeypatch.setattr(settings, "db_pool_size", 7)
+    monkeypatch.setattr(settings, "db_max_overflow", 3)
+    monkeypatch.setattr(settings, "db_statement_timeout_ms", 5000)
+
+    options = engine_options("postgresql://user@db/zencore")
+    assert options["poolclass"] is InstrumentedQueuePool
+    assert (options["pool_size"], options["max_overflow"]) == (7, 3)
+    assert options["connect_args"] == {"options": "-c statement_timeout=5000"}
+
+    options = engine_options("postgresql+asyncpg://user@db/zencore", async_driver=True)
+    assert options["poolclass"] is InstrumentedAsyncQueuePool
+    assert options["connect_args"] == {"server_settings": {"statement_timeout": "5000"}}
+
+    monkeypatch.setattr(settings, "db_statement_timeout_ms", 0)
+    assert "connect_args" not in engine_options("postgresql://user@db/zencore")
+    assert engine_options("sqlite://") == {}
+
+
+def test_pool_stats_on_instrumented_pool():
+    """Test stanja poola, overflowa i brojača konekcija"""
+    pool = InstrumentedQueuePool(lambda: sqlite3.connect(":memory:"), pool_size=2, max_overflow=1, timeout=5)
+    metrics = instrument_pool(pool)
+    connections = [pool.connect() for _ in range(3)]
+    stats = pool_stats(pool, metrics)
+    assert (stats["size"], stats["checkedout"], stats["overflow"], stats["max_overflow"]) == (2, 3, 1, 1)
+
+    connections[0].invalidate()
+    for connection in connections[1:]:
+        connection.close()
+    stats = pool_stats(pool, metrics)
+    assert (stats["checkedout"], stats["checkedin"], stats["overflow"]) == (0, 2, 0)
+    assert (stats["checkouts"], stats["connections_opened"], stats["connections_invalidated"]) == (3, 3, 1)
+    assert stats["wait_time_seconds"]["count"] == 3
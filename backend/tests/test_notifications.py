@@ -0,0 +1,86 @@
+from app.core.config import settings
+from app.core.notifications import PermanentDeliveryError, deliver
+from app.models import Material, StockBalance
+from app.models.material import Category
+from app.services import notification_service
+from app.services.notification_service import NotificationService, digest
+
+
+class FlakyChannel:
+    def __init__(self, failures, error=ConnectionError, name="test"):
+        self.name = name
+        self.failures = failures
+        self.error = error
+        self.sent = []
+
+    def send(self, subject, body):
+        if self.failures:
+            self.failures -= 1
+            raise self.error("unavailable")
+        self.sent.append(subject)
+
+
+def test_deliver_retries_transient_errors_only(monkeypatch):
+    """Test ponavljanja slanja: privremene greške se ponavljaju, trajne ne"""
+    monkeypatch.setattr(settings, "notification_retry_backoff", 0.0)
+    channel = FlakyChannel(failures=2)
+    assert deliver(channel, "subject", "body", attempts=3) is True
+    assert channel.sent == ["subject"]
+
+    channel = FlakyChannel(failures=1, error=PermanentDeliveryError)
+    assert deliver(channel, "subject", "body", attempts=3) is False
+    assert channel.failures == 0 and channel.sent == []
+
+
+def test_transitions_are_notified_once(db):
+    """Test obavijesti samo o promjenama statusa od zadnjeg slanja"""
+    low = Material(code="ASH-001", name="Ašvaganda", category=Category.ADAPTOGEN, unit="kg",
+                   opening_stock=4.0, safety_stock=5.0)
+    ok = Material(code="RHO-01", name="Rodiola", category=Category.ADAPTOGEN, unit="kg",
+                  opening_stock=50.0, safety_stock=5.0)
+    db.add_all([low, ok])
+    db.commit()
+
+    transitions = NotificationService.transitions(db, "email")
+    assert [(t.stock.material.code, t.previous_status, t.stock.stock_status) for t in transitions] == [
+        ("ASH-001", "normal", "low")
+    ]
+    subject, body = digest(transitions, 1, 2)
+    assert subject.endswith("(1/2)") and "ASH-001" in body and "RHO-01" not in body
+
+    NotificationService.mark_notified(db, "email", transitions)
+    db.commit()
+    assert NotificationService.transitions(db, "email") == []
+
+    db.add(StockBalance(material_id=low.id, received_quantity=10.0, consumed_quantity=0.0))
+    db.commit()
+    transitions = NotificationService.transitions(db, "email")
+    assert [(t.previous_status, t.stock.stock_status) for t in transitions] == [("low", "normal")]
+
+
+def test_failed_channel_is_retried_alone(db, monkeypatch):
+    """Test da se nakon pada jednog kanala ponovno šalje samo kroz taj kanal"""
+    monkeypatch.setattr(settings, "notification_retry_backoff", 0.0)
+    monkeypatch.setattr(settings, "notification_max_attempts", 1)
+    email = FlakyChannel(failures=0, name="email")
+    slack = FlakyChannel(failures=2, name="slack")
+    monkeypatch.setattr(notification_service, "configured_channels", lambda: [email, slack])
+    db.add_all([
+        Material(code=f"ASH-00{i}", name="Ašvaganda", category=Category.ADAPTOGEN, unit="kg",
+                 opening_stock=1.0, safety_stock=5.0)
+        for i in range(3)
+    ])
+    db.commit()
+
+    first = NotificationService.notify_transitions(db, chunk_size=2)
+    assert first["status"] == "partial"
+    assert first["channels"] == {"email": {"notified": 3, "pending": 0}, "slack": {"notified": 0, "pending": 3}}
+    assert len(email.sent) == 2 and slack.sent == []
+
+    # Slack se oporavlja nakon drugog neuspjeha: email ne šalje ništa ponovno
+    second = NotificationService.notify_transitions(db, chunk_size=2)
+    third = NotificationService.notify_transitions(db, chunk_size=2)
+    assert second["channels"]["slack"] == {"notified": 0, "pending": 3}
+    assert third["status"] == "success"
+    assert third["channels"] == {"email": {"notified": 0, "pending": 0}, "slack": {"notified": 3, "pending": 0}}
+    assert len(email.sent) == 2 and len(slack.sent) == 2
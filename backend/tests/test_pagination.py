@@ -0,0 +1,57 @@
+from datetime import datetime
+import pytest
+from fastapi import HTTPException, Request, Response
+from sqlalchemy import select
+from app.core.pagination import PageParams, encode_cursor, decode_cursor, paginate
+from app.models import Vendor
+from app.models.receipt import Receipt
+
+
+def test_cursor_roundtrip():
+    """Test kodiranja i dekodiranja kursora"""
+    columns = [Receipt.receipt_date, Receipt.id]
+    cursor = encode_cursor("-date", [datetime(2026, 10, 1, 8, 30), 42], backwards=True)
+
+    position = decode_cursor(cursor, "-date", columns)
+    assert position.values == [datetime(2026, 10, 1, 8, 30), 42]
+    assert position.backwards is True
+
+
+def test_cursor_rejects_other_sort_and_garbage():
+    """Test da se kursor ne može koristiti s drugim sortiranjem"""
+    cursor = encode_cursor("id", [42])
+    with pytest.raises(HTTPException):
+        decode_cursor(cursor, "date", [Receipt.receipt_date, Receipt.id])
+    with pytest.raises(HTTPException):
+        decode_cursor("not-a-cursor", "id", [Receipt.id])
+
+
+def test_cursor_rejects_values_of_wrong_type():
+    """Test da ispravno kodiran kursor s vrijednošću krivog tipa vraća 400, a ne grešku baze"""
+    for values in (["abc"], [True], [1.5]):
+        with pytest.raises(HTTPException) as error:
+            decode_cursor(encode_cursor("id", values), "id", [Receipt.id])
+        assert error.value.status_code == 400
+    with pytest.raises(HTTPException):
+        decode_cursor(encode_cursor("date", [7, 1]), "date", [Receipt.receipt_date, Receipt.id])
+    assert decode_cursor(encode_cursor("q", [3, 1]), "q", [Receipt.quantity, Receipt.id]).values == [3.0, 1]
+
+
+def test_paginate_returns_entities_and_rows(run_async):
+    """Test da upit s entitetom vraća entitete, a upit sa stupcima retke"""
+    async def scenario(sessions):
+        async with sessions() as db:
+            db.add_all([Vendor(code="V1", name="Prvi"), Vendor(code="V2", name="Drugi")])
+            await db.commit()
+            request = Request({
+                "type": "http", "scheme": "http", "server": ("test", 80),
+                "path": "/vendors/", "query_string": b"", "headers": [],
+            })
+            page = PageParams(request, Response(), cursor=None, limit=1, sort=None, include_total=False, skip=0)
+            vendors = await paginate(db, select(Vendor), page, Vendor)
+            rows = await paginate(db, select(Vendor.code, Vendor.name), page, Vendor)
+        return vendors, rows
+
+    vendors, rows = run_async(scenario)
+    assert [vendor.code for vendor in vendors] == ["V1"]
+    assert rows == [("V1", "Prvi")]
@@ -0,0 +1,92 @@
+import asyncio
+import threading
+import pytest
+from fastapi import HTTPException
+from passlib.context import CryptContext
+from app.core.passwords import PasswordHasher
+
+
+def test_verify_rehashes_outdated_hash():
+    """Test da se hash sa starijim brojem rundi obnavlja uz ispravnu lozinku"""
+    old = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4)
+    current = CryptContext(schemes=["bcrypt"], bcrypt__default_rounds=5, bcrypt__min_rounds=5)
+    hasher = PasswordHasher(current, workers=2)
+    hashed = old.hash("tajna")
+
+    async def run():
+        return await hasher.verify("kriva", hashed), await hasher.verify("tajna", hashed)
+
+    (wrong, wrong_hash), (valid, new_hash) = asyncio.run(run())
+    assert not wrong and wrong_hash is None
+    assert valid and new_hash is not None and "$05$" in new_hash
+    assert hasher.rehashed.value == 1
+    assert asyncio.run(hasher.verify("tajna", new_hash)) == (True, None)
+
+
+def test_queue_is_bounded_and_loop_stays_free():
+    """Test da hashiranje ne blokira event loop i da pun red vraća 503"""
+    hasher = PasswordHasher(workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def run():
+        started = threading.Event()
+
+        def blocking():
+            started.set()
+            release.wait(5)
+
+        running = asyncio.ensure_future(hasher._run(blocking))
+        while not started.is_set():
+            await asyncio.sleep(0.001)
+        queued = asyncio.ensure_future(hasher._run(lambda: None))
+        await asyncio.sleep(0)
+        # Loop i dalje obrađuje druge korutine dok thread radi
+        ticks = 0
+        for _ in range(5):
+            await asyncio.sleep(0.001)
+            ticks += 1
+        assert (hasher.in_flight, hasher.queued, ticks) == (1, 1, 5)
+        with pytest.raises(HTTPException) as error:
+            await hasher._run(lambda: None)
+        release.set()
+        await asyncio.gather(running, queued)
+        return error.value.status_code
+
+    assert asyncio.run(run()) == 503
+    snapshot = hasher.snapshot()
+    assert snapshot["rejected"] == 1 and snapshot["queued"] == 0 and snapshot["in_flight"] == 0
+    assert snapshot["hash_time"]["count"] == 2
+
+
+def test_cancelled_call_releases_queue_slot():
+    """Test da otkazani poziv koji još čeka na thread oslobađa mjesto u redu"""
+    hasher = PasswordHasher(workers=1, max_queue=1)
+    release = threading.Event()
+    calls = []
+
+    async def run():
+        started = threading.Event()
+
+        def blocking():
+            started.set()
+            release.wait(5)
+
+        running = asyncio.ensure_future(hasher._run(blocking))
+        while not started.is_set():
+            await asyncio.sleep(0.001)
+        waiting = asyncio.ensure_future(hasher._run(calls.append, "otkazan"))
+        await asyncio.sleep(0)
+        assert hasher.queued == 1
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        queued_after_cancel = hasher.queued
+        # Oslobođeno mjesto prima novi poziv umjesto 503
+        following = asyncio.ensure_future(hasher._run(calls.append, "sljedeći"))
+        release.set()
+        await asyncio.gather(running, following)
+        return queued_after_cancel
+
+    assert asyncio.run(run()) == 0
+    assert calls == ["sljedeći"]
+    assert (hasher.queued, hasher.in_flight, hasher.rejected.value) == (0, 0, 0)
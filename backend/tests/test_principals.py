@@ -0,0 +1,31 @@
+import asyncio
+import time
+from app.core.principals import PrincipalCache
+
+
+def test_principal_cache_evicts_least_recently_used():
+    """Test LRU izbacivanja korisnika iz cachea"""
+    cache = PrincipalCache(maxsize=2, ttl=60)
+
+    async def scenario():
+        await cache.set("a", {"id": 1})
+        await cache.set("b", {"id": 2})
+        await cache.get("a")
+        await cache.set("c", {"id": 3})
+        return [await cache.get(subject) for subject in ("a", "b", "c")]
+
+    assert asyncio.run(scenario()) == [{"id": 1}, None, {"id": 3}]
+
+
+def test_principal_cache_respects_token_expiry_and_invalidation():
+    """Test da unos ne nadživi token i da invalidacija briše korisnika"""
+    cache = PrincipalCache(maxsize=10, ttl=60)
+
+    async def scenario():
+        await cache.set("expired", {"id": 1}, token_expires_at=time.time() - 1)
+        await cache.set("user", {"id": 2}, token_expires_at=time.time() + 30)
+        before = await cache.get("user")
+        await cache.invalidate("user")
+        return await cache.get("expired"), before, await cache.get("user")
+
+    assert asyncio.run(scenario()) == (None, {"id": 2}, None)
@@ -0,0 +1,27 @@
+from app.models import Material
+from app.models.material import Category
+from app.services.replenishment_service import ReplenishmentService
+
+
+def test_plan_rounds_to_moq_and_ranks_by_urgency(db):
+    """Test točke narudžbe s rokom isporuke, zaokruživanja na MOQ i rangiranja"""
+    common = {"category": Category.VITAMIN, "unit": "kg", "safety_stock": 10.0, "monthly_forecast": 30.0}
+    db.add_all([
+        # 15 > sigurnosna zaliha, ali 10 dana isporuke troši 10 -> točka narudžbe 20
+        Material(code="LEAD", name="Lead", opening_stock=15.0, delivery_time_days=10, minimum_order_quantity=25.0, **common),
+        Material(code="CRIT", name="Crit", opening_stock=2.0, delivery_time_days=2, **common),
+        Material(code="OK", name="Ok", opening_stock=50.0, delivery_time_days=5, **common),
+        Material(code="IDLE", name="Idle", opening_stock=0.0, category=Category.VITAMIN, unit="kg"),
+    ])
+    db.commit()
+
+    plan = ReplenishmentService.plan(db, Material.is_active == True)
+    assert [item["material_code"] for item in plan] == ["CRIT", "LEAD"]
+    assert ReplenishmentService.count(db, Material.is_active == True) == 2
+
+    critical, lead = plan
+    assert critical["priority"] == "high" and critical["order_quantity"] == round((12.0 + 30.0 - 2.0) * 1.2, 3)
+    assert lead["priority"] == "medium" and lead["days_of_cover"] == 15.0
+    # (20 + 30 - 15) * 1.2 = 42 -> 50 (višekratnik od 25)
+    assert lead["reorder_point"] == 20.0 and lead["order_quantity"] == 50.0
+    assert lead["recommended_po"] == round((10.0 + 30.0 - 15.0) * 1.2, 3)
@@ -0,0 +1,34 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from app.core.request_metrics import RequestMetrics, RequestMetricsMiddleware, instrument_engine, render_prometheus
+
+
+def test_queries_are_attributed_to_route():
+    """Test brojanja SQL upita po ruti i Prometheus izlaza"""
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    metrics = RequestMetrics()
+    app = FastAPI()
+    app.add_middleware(RequestMetricsMiddleware, metrics=metrics)
+
+    @app.get("/items/{item_id}")
+    def get_item(item_id: int):
+        with engine.connect() as connection:
+            for _ in range(item_id):
+                connection.execute(text("SELECT 1"))
+        return {"id": item_id}
+
+    client = TestClient(app)
+    assert client.get("/items/3").status_code == 200
+    assert client.get("/items/5").status_code == 200
+    # Upit izvan zahtjeva se ne broji
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+    route = metrics.snapshot()["GET /items/{item_id}"]
+    assert route["requests"] == 2 and route["avg_queries"] == 4.0
+
+    output = render_prometheus(metrics)
+    assert 'zencore_http_request_queries_bucket{method="GET",route="/items/{item_id}",le="5"} 2' in output
+    assert 'zencore_http_request_queries_sum{method="GET",route="/items/{item_id}"} 8' in output
@@ -0,0 +1,27 @@
+from sqlalchemy import select
+from app.models import Material
+from app.models.material import Category
+from app.services.search_service import MaterialSearch, fold
+
+
+def test_fold_croatian_characters():
+    """Test foldinga hrvatskih znakova"""
+    assert fold("Čaj od Ašvagande, ćevapi, Žele, Đumbir") == "caj od asvagande, cevapi, zele, dumbir"
+
+
+def test_in_memory_search_on_sqlite(db):
+    """Test memorijskog indeksa na SQLite-u: folding, prefiksi i rang koda"""
+    db.add_all([
+        Material(code="ASH-001", name="Ašvaganda ekstrakt", category=Category.ADAPTOGEN, unit="kg"),
+        Material(code="RHO-01", name="Rodiola", description="Mješavina s ašvagandom", category=Category.ADAPTOGEN, unit="kg"),
+        Material(code="ZEL-1", name="Žele bombon", category=Category.OTHER, unit="kom"),
+    ])
+    db.commit()
+
+    assert not MaterialSearch.uses_database_index(db)
+    match, relevance = MaterialSearch.criteria(db, "asvag")
+    codes = db.scalars(select(Material.code).where(match).order_by(relevance.desc(), Material.id)).all()
+    assert codes == ["ASH-001", "RHO-01"]
+
+    match, _ = MaterialSearch.criteria(db, "zel")
+    assert db.scalars(select(Material.code).where(match)).all() == ["ZEL-1"]
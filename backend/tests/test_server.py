@@ -0,0 +1,24 @@
+from app.core.server import cpu_limit, gunicorn_options, memory_limit, worker_count
+
+
+def test_limits_from_cgroup_v2(tmp_path):
+    """Test čitanja CPU kvote i limita memorije kontejnera (cgroup v2)"""
+    (tmp_path / "cpu.max").write_text("200000 100000\n")
+    (tmp_path / "memory.max").write_text(str(1024 * 1024 * 1024))
+    assert cpu_limit(str(tmp_path)) <= 2.0
+    assert memory_limit(str(tmp_path)) == 1024 * 1024 * 1024
+
+    (tmp_path / "memory.max").write_text("max\n")
+    assert memory_limit(str(tmp_path)) is None
+
+
+def test_worker_count_and_options():
+    """Test da broj workera prati jezgre i stane u memoriju"""
+    assert worker_count(4, None, 256) == 4
+    assert worker_count(1.5, None, 256) == 2
+    assert worker_count(8, 512 * 1024 * 1024, 256) == 2
+    assert worker_count(0.5, 100 * 1024 * 1024, 256) == 1
+
+    options = gunicorn_options(8000, 3)
+    assert options["workers"] == 3 and options["preload_app"] is True
+    assert options["worker_class"] == "uvicorn.workers.UvicornWorker"
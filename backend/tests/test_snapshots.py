@@ -0,0 +1,64 @@
+from datetime import date, datetime
+from sqlalchemy import select
+from app.models import Material, Receipt, StockSnapshot, Vendor
+from app.models.material import Category
+from app.services.snapshot_service import StockSnapshotService, snapshot_cutoff
+
+
+def test_snapshot_cutoff_includes_whole_day():
+    """Test granice snimka: uključuje cijeli dan snimka"""
+    assert snapshot_cutoff(date(2026, 3, 31)) == datetime(2026, 4, 1)
+
+
+def test_incremental_snapshot_on_sqlite(db):
+    """Test inkrementalnog snimka: nepromijenjeni redovi se kopiraju, novi materijal se računa"""
+    vendor = Vendor(code="V1", name="Dobavljač")
+    first = Material(code="ASH-001", name="Ašvaganda", category=Category.ADAPTOGEN, unit="kg",
+                     opening_stock=2.0, safety_stock=5.0)
+    db.add_all([vendor, first])
+    db.flush()
+    db.add(Receipt(receipt_number="R-1", material_id=first.id, vendor_id=vendor.id, quantity=10.0, unit_price=2.0, total_amount=20.0,
+                   receipt_date=datetime(2026, 3, 30, 12)))
+    db.commit()
+
+    summary = StockSnapshotService.build(db, date(2026, 3, 30))
+    assert (summary["recomputed"], summary["copied"]) == (1, 0)
+
+    db.add(Material(code="RHO-01", name="Rodiola", category=Category.ADAPTOGEN, unit="kg", safety_stock=1.0))
+    db.commit()
+    summary = StockSnapshotService.build(db, date(2026, 3, 31))
+    assert (summary["recomputed"], summary["copied"]) == (1, 1)
+
+    rows = db.scalars(select(StockSnapshot).where(StockSnapshot.snapshot_date == date(2026, 3, 31))
+                      .order_by(StockSnapshot.material_id)).all()
+    assert [(row.current_stock, row.stock_status) for row in rows] == [(12.0, "normal"), (0.0, "critical")]
+
+
+def test_chunked_snapshot_matches_single_build(db):
+    """Test da snimak po rasponima materijala daje iste retke kao jedan prolaz"""
+    from app.core.database import id_ranges
+    from app.tasks import _merge_chunks
+
+    db.add_all([
+        Material(code=f"M-{i:02d}", name=f"Materijal {i}", category=Category.ADAPTOGEN, unit="kg",
+                 opening_stock=float(i), safety_stock=3.0)
+        for i in range(7)
+    ])
+    db.commit()
+    ranges = id_ranges(db, Material.id, 3)
+    assert ranges == [(None, 4), (4, 7), (7, None)]
+
+    single = StockSnapshotService.build(db, date(2026, 3, 30))
+    expected = db.execute(select(StockSnapshot.material_id, StockSnapshot.current_stock, StockSnapshot.stock_status)
+                          .order_by(StockSnapshot.material_id)).all()
+    results = [
+        {"status": "success", "data": StockSnapshotService.build(db, date(2026, 3, 30), id_range=id_range)}
+        for id_range in ranges
+    ]
+    merged = _merge_chunks(results)
+    assert merged["status"] == "success" and merged["data"]["total_materials"] == single["total_materials"] == 7
+    assert db.execute(select(StockSnapshot.material_id, StockSnapshot.current_stock, StockSnapshot.stock_status)
+                      .order_by(StockSnapshot.material_id)).all() == expected
+
+    partial = _merge_chunks([{"status": "success", "data": {"recomputed": 2}}, {"status": "error", "message": "x"}])
+    assert (partial["status"], partial["failed"], partial["data"]["recomputed"]) == ("partial", 1, 2)
@@ -0,0 +1,21 @@
+from sqlalchemy import create_engine, inspect, text
+from app.core.startup import StartupTimer, migrate
+
+
+def test_migrate_creates_then_upgrades(tmp_path):
+    """Test pripreme baze: nova baza dobiva tablice i zadnju reviziju, ponovni poziv samo nadograđuje"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'zc.db'}")
+
+    timer = StartupTimer()
+    assert migrate(timer, engine) == "created"
+    assert inspect(engine).has_table("materials")
+    assert [name for name, _ in timer.phases] == ["lock", "create_all", "backfill"]
+    with engine.connect() as connection:
+        head = connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+    assert head is not None
+
+    timer = StartupTimer()
+    assert migrate(timer, engine) == "upgraded"
+    assert "migrations" in timer.summary()
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT version_num FROM alembic_version")).scalar() == head
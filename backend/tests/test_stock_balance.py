@@ -0,0 +1,70 @@
+from datetime import datetime
+from sqlalchemy import select
+from app.api.consumptions import create_consumption, delete_consumption, update_consumption
+from app.api.receipts import create_receipt, delete_receipt, update_receipt
+from app.core.cache import response_cache
+from app.models import Material, StockBalance, User, Vendor
+from app.models.material import Category
+from app.schemas.consumption import ConsumptionCreate, ConsumptionUpdate
+from app.schemas.receipt import ReceiptCreate, ReceiptUpdate
+from app.services.stock_balance_service import StockBalanceService
+
+
+def _day(day: int) -> datetime:
+    return datetime(2026, 10, day, 10)
+
+
+def test_balances_follow_ledger_writes(run_async, monkeypatch):
+    """Test da saldo prati knjigu nakon unosa, izmjene (materijal i datum) i brisanja"""
+    async def no_invalidation(*tags):
+        pass
+
+    monkeypatch.setattr(response_cache, "invalidate", no_invalidation)
+    user = User(id=1, username="skladiste")
+
+    async def receipt(db, number, material_id, day, quantity):
+        created = await create_receipt(ReceiptCreate(
+            receipt_number=number, material_id=material_id, vendor_id=1, quantity=quantity,
+            unit_price=1.0, total_amount=quantity, receipt_date=_day(day),
+        ), db=db, current_user=user)
+        return created.id
+
+    async def consumption(db, number, day, quantity):
+        created = await create_consumption(ConsumptionCreate(
+            consumption_number=number, material_id=1, quantity=quantity, consumption_date=_day(day),
+        ), db=db, current_user=user)
+        return created.id
+
+    async def scenario(sessions):
+        async with sessions() as db:
+            db.add_all([
+                Vendor(code="V1", name="Dobavljač"),
+                Material(code="M-1", name="Prvi", category=Category.VITAMIN, unit="kg"),
+                Material(code="M-2", name="Drugi", category=Category.VITAMIN, unit="kg"),
+            ])
+            await db.commit()
+
+            await receipt(db, "R-1", 1, 1, 10.0)
+            moved = await receipt(db, "R-2", 1, 5, 4.0)
+            latest = await receipt(db, "R-3", 1, 3, 6.0)
+            first = await consumption(db, "C-1", 2, 2.0)
+            last = await consumption(db, "C-2", 6, 1.0)
+
+            # Prijem prelazi na drugi materijal i kasniji datum, utrošak mijenja količinu
+            await update_receipt(moved, ReceiptUpdate(material_id=2, receipt_date=_day(7)), db=db, current_user=user)
+            await update_consumption(first, ConsumptionUpdate(quantity=3.0), db=db, current_user=user)
+            after_update = await db.run_sync(StockBalanceService.verify)
+
+            await delete_receipt(latest, db=db, current_user=user)
+            await delete_consumption(last, db=db, current_user=user)
+            after_delete = await db.run_sync(StockBalanceService.verify)
+            db.expire_all()
+            balances = {balance.material_id: balance for balance in await db.scalars(select(StockBalance))}
+        return after_update, after_delete, balances
+
+    after_update, after_delete, balances = run_async(scenario)
+    assert after_update == [] and after_delete == []
+    first, second = balances[1], balances[2]
+    assert (first.received_quantity, first.consumed_quantity) == (10.0, 3.0)
+    assert first.last_receipt_date == _day(1) and first.last_consumption_date == _day(2)
+    assert second.received_quantity == 4.0 and second.last_receipt_date == _day(7)
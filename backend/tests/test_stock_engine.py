@@ -0,0 +1,73 @@
+from datetime import datetime
+from app.models import Consumption, Material, Receipt, StockBalance, Vendor
+from app.models.material import Category, ItemType
+from app.services.stock_balance_service import StockBalanceService
+from app.services.stock_engine import StockEngine, classify_stock, recommend_order
+
+
+def test_classify_stock():
+    """Test pragova statusa zaliha"""
+    assert classify_stock(2.5, 5.0) == "critical"
+    assert classify_stock(5.0, 5.0) == "low"
+    assert classify_stock(5.1, 5.0) == "normal"
+    assert classify_stock(0.0, None) == "critical"
+
+
+def test_recommend_order():
+    """Test preporučene narudžbe s bufferom"""
+    assert recommend_order(2.0, 5.0, 8.0) == (5.0 + 8.0 - 2.0) * 1.2
+    assert recommend_order(50.0, 5.0, 8.0) == 0.0
+    assert recommend_order(0.0, None, None) == 0.0
+
+
+def test_count_by_status_matches_classification(db):
+    """Test SQL agregacije statusa po kategoriji i filtera po tipu stavke"""
+    db.add_all([
+        Material(code="A1", name="A1", category=Category.ADAPTOGEN, unit="kg", opening_stock=1.0, safety_stock=4.0),
+        Material(code="A2", name="A2", category=Category.ADAPTOGEN, unit="kg", opening_stock=4.0, safety_stock=4.0),
+        Material(code="V1", name="V1", category=Category.VITAMIN, unit="kg", opening_stock=9.0, safety_stock=4.0),
+        Material(code="S1", name="S1", category=Category.VITAMIN, unit="sat", item_type=ItemType.SERVICE),
+    ])
+    db.flush()
+    db.add(StockBalance(material_id=3, received_quantity=0.0, consumed_quantity=20.0))
+    db.commit()
+
+    rows = StockEngine.count_by_status(db, Material.is_active == True, group_by=Material.category)
+    assert {(category, status): count for category, status, count in rows} == {
+        (Category.ADAPTOGEN, "critical"): 1, (Category.ADAPTOGEN, "low"): 1, (Category.VITAMIN, "critical"): 2,
+    }
+    rows = StockEngine.count_by_status(db, Material.item_type == ItemType.MATERIAL)
+    assert sorted(rows) == [("critical", 2), ("low", 1)]
+
+
+def test_load_computes_stock_from_ledger(db):
+    """Test zaliha iz baze: bez stavki knjige, samo prijemi, negativna zaliha i neaktivni materijali"""
+    db.add_all([
+        Vendor(code="V1", name="Dobavljač"),
+        Material(code="NEW", name="Bez knjige", category=Category.VITAMIN, unit="kg", opening_stock=3.0, safety_stock=4.0),
+        Material(code="REC", name="Samo prijemi", category=Category.VITAMIN, unit="kg", safety_stock=4.0, monthly_forecast=10.0),
+        Material(code="NEG", name="Prekoračen", category=Category.VITAMIN, unit="kg", opening_stock=1.0, safety_stock=2.0),
+        Material(code="OFF", name="Neaktivan", category=Category.VITAMIN, unit="kg", is_active=False),
+    ])
+    db.flush()
+    db.add_all([
+        Receipt(receipt_number=f"R-{day}", material_id=2, vendor_id=1, quantity=6.0, unit_price=1.0, total_amount=6.0,
+                receipt_date=datetime(2026, 10, day))
+        for day in (3, 9)
+    ])
+    db.add(Consumption(consumption_number="C-1", material_id=3, quantity=5.0, consumption_date=datetime(2026, 10, 4)))
+    db.flush()
+    StockBalanceService.rebuild(db)
+    db.commit()
+
+    stocks = {stock.material.code: stock for stock in StockEngine.load(db, Material.is_active == True)}
+    assert sorted(stocks) == ["NEG", "NEW", "REC"]
+    assert (stocks["NEW"].current_stock, stocks["NEW"].stock_status, stocks["NEW"].last_receipt_date) == (3.0, "low", None)
+    assert (stocks["REC"].current_stock, stocks["REC"].stock_status) == (12.0, "normal")
+    assert stocks["REC"].recommended_po == (4.0 + 10.0 - 12.0) * 1.2
+    assert stocks["REC"].last_receipt_date == datetime(2026, 10, 9)
+    assert (stocks["NEG"].current_stock, stocks["NEG"].stock_status) == (0.0, "critical")
+
+    assert StockEngine.get(db, 4).current_stock == 0.0
+    assert [stock.material.code for stock in StockEngine.load(db, Material.is_active == True, statuses=["critical"])] == ["NEG"]
+    assert StockEngine.count(db, Material.is_active == True, statuses=["low", "critical"]) == 2
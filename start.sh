@@ -34,7 +34,7 @@ docker-compose ps
 
 # Pokreni migracije
 echo "🗄️ Pokretanje migracija..."
-docker-compose exec -T backend alembic upgrade head
+docker-compose exec -T backend python migrate.py
 
 # Inicijaliziraj test podatke
 echo "📝 Inicijalizacija test podataka..."